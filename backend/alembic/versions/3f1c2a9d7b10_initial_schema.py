@@ -0,0 +1,155 @@
+"""Initial schema
+
+Baseline matching the tables previously created by Base.metadata.create_all.
+Tables that already exist are left untouched, so databases created before
+migrations were introduced can be upgraded in place.
+
+Revision ID: 3f1c2a9d7b10
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7b10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(name: str) -> bool:
+    if context.is_offline_mode():
+        return False
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if not _table_exists("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("email", sa.String(length=255), nullable=False),
+            sa.Column("username", sa.String(length=50), nullable=False),
+            sa.Column("full_name", sa.String(length=100), nullable=True),
+            sa.Column("hashed_password", sa.String(length=255), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("is_verified", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("last_login", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    if not _table_exists("stocks"):
+        op.create_table(
+            "stocks",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("symbol", sa.String(length=10), nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("description", sa.String(length=1000), nullable=True),
+            sa.Column("sector", sa.String(length=100), nullable=True),
+            sa.Column("exchange", sa.String(length=50), nullable=True),
+            sa.Column("currency", sa.String(length=3), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_stocks_id", "stocks", ["id"])
+        op.create_index("ix_stocks_symbol", "stocks", ["symbol"], unique=True)
+
+    if not _table_exists("stock_profiles"):
+        op.create_table(
+            "stock_profiles",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("stock_id", sa.Integer(), nullable=False),
+            sa.Column("data", sa.JSON(), nullable=False),
+            sa.Column("etag", sa.String(length=64), nullable=False),
+            sa.Column("fetched_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["stock_id"], ["stocks.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("stock_id"),
+        )
+        op.create_index("ix_stock_profiles_id", "stock_profiles", ["id"])
+
+    if not _table_exists("price_bars"):
+        op.create_table(
+            "price_bars",
+            sa.Column("stock_id", sa.Integer(), nullable=False),
+            sa.Column("interval", sa.String(length=5), nullable=False),
+            sa.Column("ts", sa.DateTime(), nullable=False),
+            sa.Column("open", sa.Float(), nullable=False),
+            sa.Column("high", sa.Float(), nullable=False),
+            sa.Column("low", sa.Float(), nullable=False),
+            sa.Column("close", sa.Float(), nullable=False),
+            sa.Column("volume", sa.Float(), nullable=True),
+            sa.ForeignKeyConstraint(["stock_id"], ["stocks.id"]),
+            sa.PrimaryKeyConstraint("stock_id", "interval", "ts"),
+        )
+
+    if not _table_exists("positions"):
+        op.create_table(
+            "positions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("stock_id", sa.Integer(), nullable=False),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column("purchase_price", sa.Float(), nullable=False),
+            sa.Column("purchase_date", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["stock_id"], ["stocks.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_positions_id", "positions", ["id"])
+
+    if not _table_exists("watchlist"):
+        op.create_table(
+            "watchlist",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("stock_id", sa.Integer(), nullable=False),
+            sa.Column("date_added", sa.DateTime(), nullable=False),
+            sa.Column("notes", sa.String(length=500), nullable=True),
+            sa.ForeignKeyConstraint(["stock_id"], ["stocks.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_watchlist_id", "watchlist", ["id"])
+
+    if not _table_exists("trade_history"):
+        op.create_table(
+            "trade_history",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("stock_id", sa.Integer(), nullable=False),
+            sa.Column("trade_type", sa.String(length=10), nullable=False),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column("price_per_share", sa.Float(), nullable=False),
+            sa.Column("total_amount", sa.Float(), nullable=False),
+            sa.Column("trade_date", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("notes", sa.String(length=500), nullable=True),
+            sa.ForeignKeyConstraint(["stock_id"], ["stocks.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_trade_history_id", "trade_history", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("trade_history")
+    op.drop_table("watchlist")
+    op.drop_table("positions")
+    op.drop_table("price_bars")
+    op.drop_table("stock_profiles")
+    op.drop_table("stocks")
+    op.drop_table("users")
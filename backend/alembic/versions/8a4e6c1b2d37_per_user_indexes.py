@@ -0,0 +1,68 @@
+"""Per-user unique and composite indexes
+
+Unique (user_id, stock_id) on positions and watchlist, and
+(user_id, trade_date DESC) on trade_history. Existing duplicate rows are
+merged first so the constraints can be created on live data.
+
+Revision ID: 8a4e6c1b2d37
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e6c1b2d37'
+down_revision: Union[str, None] = '3f1c2a9d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fold duplicate positions into the oldest row, keeping the weighted average purchase price
+    op.execute("""
+        UPDATE positions
+        SET quantity = merged.quantity,
+            purchase_price = COALESCE(merged.purchase_price, positions.purchase_price)
+        FROM (
+            SELECT MIN(id) AS keep_id,
+                   SUM(quantity) AS quantity,
+                   SUM(quantity * purchase_price) / NULLIF(SUM(quantity), 0) AS purchase_price
+            FROM positions
+            GROUP BY user_id, stock_id
+            HAVING COUNT(*) > 1
+        ) AS merged
+        WHERE positions.id = merged.keep_id
+    """)
+    op.execute("""
+        DELETE FROM positions duplicate
+        USING positions keeper
+        WHERE duplicate.user_id = keeper.user_id
+          AND duplicate.stock_id = keeper.stock_id
+          AND duplicate.id > keeper.id
+    """)
+    op.execute("""
+        DELETE FROM watchlist duplicate
+        USING watchlist keeper
+        WHERE duplicate.user_id = keeper.user_id
+          AND duplicate.stock_id = keeper.stock_id
+          AND duplicate.id > keeper.id
+    """)
+
+    op.create_unique_constraint("uq_positions_user_id_stock_id", "positions", ["user_id", "stock_id"])
+    op.create_unique_constraint("uq_watchlist_user_id_stock_id", "watchlist", ["user_id", "stock_id"])
+    op.create_index(
+        "ix_trade_history_user_id_trade_date",
+        "trade_history",
+        ["user_id", sa.text("trade_date DESC")]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trade_history_user_id_trade_date", table_name="trade_history")
+    op.drop_constraint("uq_watchlist_user_id_stock_id", "watchlist", type_="unique")
+    op.drop_constraint("uq_positions_user_id_stock_id", "positions", type_="unique")
@@ -0,0 +1,57 @@
+"""Trade lots
+
+trade_lots holds the shares bought by each BUY trade that sells have not
+consumed yet, and SELL trades gain cost_basis and realized_pnl. Run
+rebuild_trade_lots.py after upgrading to fill them from existing history.
+
+Revision ID: a9d3f7c2e5b4
+Revises: f4c8d2a61e93
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3f7c2e5b4'
+down_revision: Union[str, None] = 'f4c8d2a61e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("trade_history", sa.Column("cost_basis", sa.Float(), nullable=True))
+    op.add_column("trade_history", sa.Column("realized_pnl", sa.Float(), nullable=True))
+
+    op.create_table(
+        "trade_lots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("stock_id", sa.Integer(), nullable=False),
+        sa.Column("buy_trade_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Float(), nullable=False),
+        sa.Column("remaining_quantity", sa.Float(), nullable=False),
+        sa.Column("price_per_share", sa.Float(), nullable=False),
+        sa.Column("opened_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["stock_id"], ["stocks.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["buy_trade_id"], ["trade_history.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("buy_trade_id"),
+    )
+    op.create_index(
+        "ix_trade_lots_open",
+        "trade_lots",
+        ["user_id", "stock_id", "opened_at", "id"],
+        postgresql_where=sa.text("remaining_quantity > 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trade_lots_open", table_name="trade_lots")
+    op.drop_table("trade_lots")
+    op.drop_column("trade_history", "realized_pnl")
+    op.drop_column("trade_history", "cost_basis")
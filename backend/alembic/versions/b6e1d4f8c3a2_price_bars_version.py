@@ -0,0 +1,31 @@
+"""Price bars version
+
+Adds a "price_bars" row to catalog_versions. backfill_bars.py bumps it with
+every backfill so API workers know to drop their cached chart series.
+
+Revision ID: b6e1d4f8c3a2
+Revises: a9d3f7c2e5b4
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1d4f8c3a2'
+down_revision: Union[str, None] = 'a9d3f7c2e5b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "INSERT INTO catalog_versions (name, version, updated_at) VALUES ('price_bars', 1, now()) "
+        "ON CONFLICT (name) DO NOTHING"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM catalog_versions WHERE name = 'price_bars'")
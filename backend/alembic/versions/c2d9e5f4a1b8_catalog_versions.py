@@ -0,0 +1,36 @@
+"""Catalog versions
+
+Version counter per cached catalog (currently only "stocks"), bumped with
+every write so API workers can detect that their in-memory copy is stale.
+
+Revision ID: c2d9e5f4a1b8
+Revises: 8a4e6c1b2d37
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d9e5f4a1b8'
+down_revision: Union[str, None] = '8a4e6c1b2d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_versions",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute("INSERT INTO catalog_versions (name, version, updated_at) VALUES ('stocks', 1, now())")
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_versions")
@@ -0,0 +1,32 @@
+"""Price bars cascade
+
+Deleting a stock removes its price bars in the database, so the API does
+not have to load years of bars into the session to delete them.
+
+Revision ID: d3a7c1e9f2b5
+Revises: b6e1d4f8c3a2
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7c1e9f2b5'
+down_revision: Union[str, None] = 'b6e1d4f8c3a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint("price_bars_stock_id_fkey", "price_bars", type_="foreignkey")
+    op.create_foreign_key(
+        "price_bars_stock_id_fkey", "price_bars", "stocks", ["stock_id"], ["id"], ondelete="CASCADE"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("price_bars_stock_id_fkey", "price_bars", type_="foreignkey")
+    op.create_foreign_key("price_bars_stock_id_fkey", "price_bars", "stocks", ["stock_id"], ["id"])
@@ -0,0 +1,39 @@
+"""Trade history keyset index
+
+Extends the (user_id, trade_date DESC) index with id DESC so trade history
+pages can seek directly to the (trade_date, id) of the previous page's last row.
+
+Revision ID: e7b3a0c95d21
+Revises: c2d9e5f4a1b8
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3a0c95d21'
+down_revision: Union[str, None] = 'c2d9e5f4a1b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_trade_history_user_id_trade_date_id",
+        "trade_history",
+        ["user_id", sa.text("trade_date DESC"), sa.text("id DESC")]
+    )
+    op.drop_index("ix_trade_history_user_id_trade_date", table_name="trade_history")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_trade_history_user_id_trade_date",
+        "trade_history",
+        ["user_id", sa.text("trade_date DESC")]
+    )
+    op.drop_index("ix_trade_history_user_id_trade_date_id", table_name="trade_history")
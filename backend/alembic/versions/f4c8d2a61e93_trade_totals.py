@@ -0,0 +1,86 @@
+"""Trade totals
+
+Per-user and per-user-per-stock running totals over trade_history, kept up
+to date by the API in the same transaction as each trade. Existing history
+is summed into them here; rebuild_trade_totals.py recomputes them later.
+
+Revision ID: f4c8d2a61e93
+Revises: e7b3a0c95d21
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c8d2a61e93'
+down_revision: Union[str, None] = 'e7b3a0c95d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _total_columns():
+    return [
+        sa.Column("trade_count", sa.Integer(), nullable=False),
+        sa.Column("buy_count", sa.Integer(), nullable=False),
+        sa.Column("sell_count", sa.Integer(), nullable=False),
+        sa.Column("buy_quantity", sa.Float(), nullable=False),
+        sa.Column("sell_quantity", sa.Float(), nullable=False),
+        sa.Column("buy_amount", sa.Float(), nullable=False),
+        sa.Column("sell_amount", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+
+
+TOTALS_SELECT = """
+    COUNT(*),
+    COUNT(*) FILTER (WHERE trade_type = 'BUY'),
+    COUNT(*) FILTER (WHERE trade_type <> 'BUY'),
+    COALESCE(SUM(quantity) FILTER (WHERE trade_type = 'BUY'), 0),
+    COALESCE(SUM(quantity) FILTER (WHERE trade_type <> 'BUY'), 0),
+    COALESCE(SUM(total_amount) FILTER (WHERE trade_type = 'BUY'), 0),
+    COALESCE(SUM(total_amount) FILTER (WHERE trade_type <> 'BUY'), 0),
+    now() AT TIME ZONE 'utc'
+"""
+
+TOTALS_COLUMNS = "trade_count, buy_count, sell_count, buy_quantity, sell_quantity, buy_amount, sell_amount, updated_at"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trade_totals",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        *_total_columns(),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_table(
+        "stock_trade_totals",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("stock_id", sa.Integer(), nullable=False),
+        *_total_columns(),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["stock_id"], ["stocks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "stock_id"),
+    )
+
+    op.execute(f"""
+        INSERT INTO trade_totals (user_id, {TOTALS_COLUMNS})
+        SELECT user_id, {TOTALS_SELECT}
+        FROM trade_history
+        GROUP BY user_id
+    """)
+    op.execute(f"""
+        INSERT INTO stock_trade_totals (user_id, stock_id, {TOTALS_COLUMNS})
+        SELECT user_id, stock_id, {TOTALS_SELECT}
+        FROM trade_history
+        GROUP BY user_id, stock_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("stock_trade_totals")
+    op.drop_table("trade_totals")
@@ -3,9 +3,13 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from database import get_db, User
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AsyncSessionLocal, get_db
+from models import User
+from replica_router import get_read_db, replica_router, REPLICA_READ_YOUR_WRITES_SECONDS
 from schemas import TokenData
 import os
 from dotenv import load_dotenv
@@ -53,49 +57,84 @@ def verify_token(token: str) -> Optional[TokenData]:
         email: str = payload.get("sub")
         if email is None:
             return None
-        token_data = TokenData(email=email)
+        issued_at = payload.get("iat")
+        token_data = TokenData(email=email, issued_at=datetime.utcfromtimestamp(issued_at) if issued_at else None)
         return token_data
     except JWTError as e:
         print(f"JWT Error: {e}")
         return None
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate a user with email and password."""
     try:
-        user = db.query(User).filter(User.email == email.lower()).first()
+        user = await db.scalar(select(User).where(User.email == email.lower()))
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        # bcrypt is deliberately slow; keep it off the event loop
+        if not await run_in_threadpool(verify_password, password, user.hashed_password):
             return None
         return user
     except Exception as e:
         print(f"Authentication error: {e}")
         return None
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
+async def get_user_from_token(db: AsyncSession, token: str) -> Optional[User]:
+    """Resolve the user a JWT access token belongs to."""
+    token_data = verify_token(token)
+    if token_data is None:
+        return None
+    return await db.scalar(select(User).where(User.email == token_data.email))
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Get the current authenticated user from JWT token."""
+    try:
+        user = await get_user_from_token(db, credentials.credentials)
+        if user is None:
+            raise _credentials_exception()
+        
+        return user
+    except Exception as e:
+        print(f"Get current user error: {e}")
+        raise _credentials_exception()
+
+def _issued_recently(token_data: TokenData) -> bool:
+    """Whether the token is new enough that its user may not have reached the replicas yet"""
+    if token_data.issued_at is None:
+        return False
+    return datetime.utcnow() - token_data.issued_at <= timedelta(seconds=REPLICA_READ_YOUR_WRITES_SECONDS)
+
+async def get_current_read_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_read_db)
+) -> User:
+    """Get the current user on the request's read session, for read-only routes, so they never open a primary session."""
     try:
         token_data = verify_token(credentials.credentials)
         if token_data is None:
-            raise credentials_exception
-        
-        user = db.query(User).filter(User.email == token_data.email).first()
+            raise _credentials_exception()
+        user = await db.scalar(select(User).where(User.email == token_data.email))
+        if user is None and replica_router.enabled and _issued_recently(token_data):
+            # A user who signed up moments ago may not have reached the replica yet;
+            # older tokens never fall back, so unknown users cannot load the primary
+            async with AsyncSessionLocal() as primary_db:
+                user = await primary_db.scalar(select(User).where(User.email == token_data.email))
         if user is None:
-            raise credentials_exception
+            raise _credentials_exception()
         
         return user
     except Exception as e:
         print(f"Get current user error: {e}")
-        raise credentials_exception
+        raise _credentials_exception()
 
 def create_user_token(user: User) -> dict:
     """Create a token response for a user."""
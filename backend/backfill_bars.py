@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Price bar backfill script
+Fetches hourly and daily OHLCV bars from the market data service, stores them
+and precomputes the monthly rollups used by the chart endpoint.
+
+Usage:
+    python backfill_bars.py            # every stock in the catalog
+    python backfill_bars.py AAPL MSFT  # selected symbols
+"""
+
+import asyncio
+import sys
+from database import SessionLocal, test_connection
+from models import Stock
+from market_data_service import market_data_service
+from bar_service import backfill_stock_bars
+
+async def backfill(symbols):
+    """Backfill bars for the given symbols, or for all stocks when none are given"""
+    db = SessionLocal()
+    await market_data_service.start()
+
+    try:
+        query = db.query(Stock)
+        if symbols:
+            query = query.filter(Stock.symbol.in_([symbol.upper() for symbol in symbols]))
+        stocks = query.order_by(Stock.symbol).all()
+
+        if not stocks:
+            print("❌ No matching stocks found in database")
+            return
+
+        for stock in stocks:
+            try:
+                counts = await backfill_stock_bars(db, stock)
+                summary = ", ".join(f"{count} x {interval}" for interval, count in counts.items())
+                print(f"  • {stock.symbol}: {summary}")
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Error backfilling {stock.symbol}: {e}")
+
+        print(f"\n✅ Backfilled price bars for {len(stocks)} stocks")
+    finally:
+        await market_data_service.close()
+        db.close()
+
+def main():
+    """Main backfill function"""
+
+    print("📈 Backfilling price bars")
+    print("=" * 50)
+
+    if not test_connection():
+        print("❌ Database connection failed. Please check your configuration.")
+        sys.exit(1)
+
+    asyncio.run(backfill(sys.argv[1:]))
+
+if __name__ == "__main__":
+    main()
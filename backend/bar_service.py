@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import Float, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database import AsyncSessionLocal
+from models import CatalogVersion, PriceBar, Stock
+from market_data_service import market_data_service
+from stock_catalog import bump_catalog_version
+from intraday_buffer import intraday_store
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bars fetched from the provider: interval -> Yahoo range to request
+SOURCE_INTERVALS = {
+    "1h": "1mo",
+    "1d": "5y",
+}
+
+# Rollups computed from daily bars
+MONTHLY_INTERVAL = "1mo"
+
+# Chart timeframe -> (bar interval, number of points)
+TIMEFRAME_BARS: Dict[str, Tuple[str, int]] = {
+    "1D": ("1h", 24),
+    "1W": ("1d", 7),
+    "1Y": (MONTHLY_INTERVAL, 12),
+    "5Y": (MONTHLY_INTERVAL, 60),
+}
+
+# Timeframes showing only the latest trading session instead of the last N bars.
+# Like the intraday ticks (see intraday_buffer.session_start), the session is the newest bar's UTC day
+SESSION_TIMEFRAMES = {"1D"}
+
+# Timeframe served from the in-memory intraday ticks when available
+INTRADAY_TIMEFRAME = "1D"
+
+# Chart series are reused for the lifetime of a time bucket, sized to the bar interval
+CHART_BUCKET_SECONDS: Dict[str, int] = {
+    "1D": int(os.getenv("CHART_BUCKET_SECONDS_1D", "300")),
+    "1W": int(os.getenv("CHART_BUCKET_SECONDS_1W", "3600")),
+    "1Y": int(os.getenv("CHART_BUCKET_SECONDS_1Y", "86400")),
+    "5Y": int(os.getenv("CHART_BUCKET_SECONDS_5Y", "86400")),
+}
+CHART_CACHE_MAX_ENTRIES = int(os.getenv("CHART_CACHE_MAX_ENTRIES", "2048"))
+CHART_CACHE_VERSION_CHECK_SECONDS = float(os.getenv("CHART_CACHE_VERSION_CHECK_SECONDS", "30"))
+
+# catalog_versions row bumped whenever bars are stored, e.g. by backfill_bars.py in another process
+BARS_CATALOG_NAME = "price_bars"
+
+
+def upsert_bars(db: Session, stock_id: int, interval: str, bars: List[Dict]) -> int:
+    """Bulk insert bars, overwriting existing bars with the same (stock_id, interval, ts)"""
+    if not bars:
+        return 0
+
+    statement = insert(PriceBar).values([
+        {"stock_id": stock_id, "interval": interval, **bar} for bar in bars
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[PriceBar.stock_id, PriceBar.interval, PriceBar.ts],
+        set_={
+            "open": statement.excluded.open,
+            "high": statement.excluded.high,
+            "low": statement.excluded.low,
+            "close": statement.excluded.close,
+            "volume": statement.excluded.volume,
+        }
+    )
+    db.execute(statement)
+    return len(bars)
+
+
+def rollup_monthly_bars(db: Session, stock_id: int) -> None:
+    """Precompute monthly bars from daily bars in a single INSERT ... SELECT"""
+    month = func.date_trunc("month", PriceBar.ts)
+    first_open = func.array_agg(aggregate_order_by(PriceBar.open, PriceBar.ts.asc()), type_=ARRAY(Float))[1]
+    last_close = func.array_agg(aggregate_order_by(PriceBar.close, PriceBar.ts.desc()), type_=ARRAY(Float))[1]
+
+    monthly = select(
+        PriceBar.stock_id,
+        literal(MONTHLY_INTERVAL),
+        month,
+        first_open,
+        func.max(PriceBar.high),
+        func.min(PriceBar.low),
+        last_close,
+        func.sum(PriceBar.volume),
+    ).where(
+        PriceBar.stock_id == stock_id,
+        PriceBar.interval == "1d"
+    ).group_by(PriceBar.stock_id, month)
+
+    statement = insert(PriceBar).from_select(
+        ["stock_id", "interval", "ts", "open", "high", "low", "close", "volume"],
+        monthly
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[PriceBar.stock_id, PriceBar.interval, PriceBar.ts],
+        set_={
+            "open": statement.excluded.open,
+            "high": statement.excluded.high,
+            "low": statement.excluded.low,
+            "close": statement.excluded.close,
+            "volume": statement.excluded.volume,
+        }
+    )
+    db.execute(statement)
+
+
+async def backfill_stock_bars(db: Session, stock: Stock) -> Dict[str, int]:
+    """Fetch source bars for one stock, store them and refresh its rollups in one transaction"""
+    counts = {}
+    for interval, history_range in SOURCE_INTERVALS.items():
+        bars = await market_data_service.get_price_history(stock.symbol, interval, history_range)
+        counts[interval] = upsert_bars(db, stock.id, interval, bars)
+
+    rollup_monthly_bars(db, stock.id)
+    db.execute(bump_catalog_version(BARS_CATALOG_NAME))
+    db.commit()
+    return counts
+
+
+async def get_chart_closes(db: AsyncSession, stock_id: int, timeframe: str) -> Optional[List[float]]:
+    """Return the latest closes for a timeframe, oldest first, or None when no bars are stored"""
+    interval, points = TIMEFRAME_BARS[timeframe]
+    query = select(PriceBar.close).where(
+        PriceBar.stock_id == stock_id,
+        PriceBar.interval == interval
+    )
+    if timeframe in SESSION_TIMEFRAMES:
+        # Select by time, not count: the last 24 hourly bars would span three or four sessions
+        latest = select(func.max(PriceBar.ts)).where(
+            PriceBar.stock_id == stock_id,
+            PriceBar.interval == interval
+        ).scalar_subquery()
+        query = query.where(PriceBar.ts >= func.date_trunc("day", latest))
+    closes = (await db.scalars(query.order_by(PriceBar.ts.desc()).limit(points))).all()
+
+    if not closes:
+        return None
+    return [round(close, 2) for close in reversed(closes)]
+
+
+@lru_cache(maxsize=CHART_CACHE_MAX_ENTRIES)
+def _synthetic_series(symbol: str, points: int) -> Tuple[float, ...]:
+    seed = int(hashlib.md5(symbol.encode()).hexdigest()[:8], 16)
+    rng = np.random.default_rng(seed)
+
+    base_price = 50 + (seed % 200)  # Price between 50-250
+    volatility = 0.1 + (seed % 30) / 100  # Volatility between 0.1-0.4
+
+    changes = (rng.random(points) - 0.5) * volatility
+    prices = np.clip(base_price * np.cumprod(1 + changes), 10, 500)
+    return tuple(np.round(prices, 2).tolist())
+
+
+def generate_synthetic_series(symbol: str, points: int) -> List[float]:
+    """Symbol-seeded random walk used until real bars have been backfilled"""
+    return list(_synthetic_series(symbol.upper(), points))
+
+
+class ChartSeriesCache:
+    """
+    Bounded LRU of chart series keyed by (symbol, timeframe, time bucket).
+    Each worker polls the price bars version and drops every series once new bars were stored.
+    Only used from the event loop, so it needs no lock: no method awaits between reads and writes.
+    """
+
+    def __init__(self, max_entries: int = CHART_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, int], List[float]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self.version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.clears = 0
+
+    def get(self, key: Tuple[str, str, int]) -> Optional[List[float]]:
+        values = self._entries.get(key)
+        if values is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return values
+
+    def set(self, key: Tuple[str, str, int], values: List[float]) -> None:
+        self._entries[key] = values
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.clears += 1
+
+    def start(self) -> None:
+        """Start polling the price bars version"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(CHART_CACHE_VERSION_CHECK_SECONDS)
+            try:
+                await self.check_version()
+            except Exception as e:
+                logger.error(f"Chart cache version check failed: {str(e)}")
+
+    async def check_version(self) -> None:
+        """Clear the cache when the price bars version in the database differs from the last one seen"""
+        async with AsyncSessionLocal() as db:
+            version = await db.scalar(select(CatalogVersion.version).where(CatalogVersion.name == BARS_CATALOG_NAME))
+        version = version or 0
+        if self.version is not None and version != self.version:
+            self.clear()
+            logger.info(f"Chart cache cleared: price bars changed to version {version}")
+        self.version = version
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "clears": self.clears,
+            "bars_version": self.version,
+        }
+
+
+async def get_chart_series(db: AsyncSession, stock: Stock, timeframe: str) -> List[float]:
+    """Stored closes for a timeframe, falling back to the synthetic series, memoized per time bucket"""
+    if timeframe == INTRADAY_TIMEFRAME:
+        # Live ticks change on every poll, so they are read straight from the ring buffer
+        _, points = TIMEFRAME_BARS[timeframe]
+        y_values = intraday_store.series(stock.symbol, points)
+        if y_values is not None:
+            return y_values
+
+    bucket = int(time.time() // CHART_BUCKET_SECONDS[timeframe])
+    key = (stock.symbol, timeframe, bucket)
+    y_values = chart_cache.get(key)
+    if y_values is not None:
+        return y_values
+
+    y_values = await get_chart_closes(db, stock.id, timeframe)
+    if y_values is None:
+        _, points = TIMEFRAME_BARS[timeframe]
+        y_values = generate_synthetic_series(stock.symbol, points)
+
+    chart_cache.set(key, y_values)
+    return y_values
+
+
+# Global instance
+chart_cache = ChartSeriesCache()
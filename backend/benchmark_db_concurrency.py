@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Database concurrency benchmark
+Runs N concurrent "requests" that each issue one slow query, first through the
+synchronous session on the event loop (how the routers used to work), then
+through the async session, and reports wall time and throughput per level.
+
+Usage:
+    python benchmark_db_concurrency.py                  # levels 1 5 10 20, 100 ms query
+    python benchmark_db_concurrency.py 1 10 30 --delay 0.2
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from sqlalchemy import text
+from database import AsyncSessionLocal, SessionLocal, async_engine, test_connection
+
+SLOW_QUERY = text("SELECT pg_sleep(:delay)")
+
+async def sync_request(delay: float):
+    """One request using the blocking session directly on the event loop"""
+    db = SessionLocal()
+    try:
+        db.execute(SLOW_QUERY, {"delay": delay})
+    finally:
+        db.close()
+
+async def async_request(delay: float):
+    """One request using the async session"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(SLOW_QUERY, {"delay": delay})
+
+async def run_level(request, concurrency: int, delay: float) -> float:
+    """Run `concurrency` requests at once and return the wall time in seconds"""
+    started = time.perf_counter()
+    await asyncio.gather(*(request(delay) for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+async def benchmark(levels, delay: float):
+    # Open pool connections up front so connection setup is not measured
+    await run_level(sync_request, max(levels), 0)
+    await run_level(async_request, max(levels), 0)
+
+    print(f"{'concurrency':>11} | {'sync wall (s)':>13} | {'sync req/s':>10} | {'async wall (s)':>14} | {'async req/s':>11}")
+    print("-" * 72)
+    for concurrency in levels:
+        sync_wall = await run_level(sync_request, concurrency, delay)
+        async_wall = await run_level(async_request, concurrency, delay)
+        print(
+            f"{concurrency:>11} | {sync_wall:>13.3f} | {concurrency / sync_wall:>10.1f} | "
+            f"{async_wall:>14.3f} | {concurrency / async_wall:>11.1f}"
+        )
+
+    await async_engine.dispose()
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Compare sync-on-event-loop and async session concurrency")
+    parser.add_argument("levels", nargs="*", type=int, default=[1, 5, 10, 20], help="Concurrency levels to run")
+    parser.add_argument("--delay", type=float, default=0.1, help="Seconds each query sleeps in the database")
+    args = parser.parse_args()
+
+    print("⏱️  Benchmarking database concurrency")
+    print("=" * 50)
+
+    if not test_connection():
+        print("❌ Database connection failed. Please check your configuration.")
+        sys.exit(1)
+
+    # Both engines allow pool_size + max_overflow connections; beyond that requests queue for a connection
+    asyncio.run(benchmark(args.levels, args.delay))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+FinnHub client latency benchmark
+Fires rounds of N simultaneous quote requests at fake_market_server.py, first as
+blocking requests calls on the event loop (how the FinnHub service used to call
+upstream), then through the async pooled client, and reports p50/p99 latency
+and throughput per concurrency level.
+
+With --probe it measures what slow quotes do to everyone else instead: the API
+is started in a child process with its quote upstream going to FinnHub, once
+with blocking calls and once with the async client, and a cheap unrelated
+endpoint is timed while N quote requests keep the upstream busy.
+
+Start the fake provider first:
+    python fake_market_server.py
+
+Usage:
+    python benchmark_finnhub_latency.py                 # levels 1 10 50, lognormal latency, 50 ms median
+    python benchmark_finnhub_latency.py 10 100 --latency-ms 200 --spread 0.8 --tail-rate 0.02 --rounds 10
+    python benchmark_finnhub_latency.py 10 50 --probe --latency-ms 200   # p99 of GET / under slow quote load
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+# Point the client at the fake provider and lift the real quota before finnhub_service reads its configuration
+os.environ.setdefault("FINNHUB_BASE_URL", "http://localhost:9000/api/v1")
+os.environ.setdefault("FINNHUB_API_KEY", "benchmark")
+os.environ.setdefault("RATE_LIMIT_FINNHUB_PER_MINUTE", "1000000")
+
+import aiohttp
+import numpy as np
+import requests
+from finnhub_service import FinnhubService, FINNHUB_BASE_URL, FINNHUB_MAX_CONNECTIONS
+
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA", "NFLX"]
+
+# Symbols registered in the probed API; each quote worker has its own, so requests are never coalesced
+PROBE_SYMBOL_PREFIX = "SLOW"
+
+def control_url() -> str:
+    """FinnHub profile control endpoint of the fake provider serving FINNHUB_BASE_URL"""
+    return FINNHUB_BASE_URL.rstrip("/").rsplit("/api/", 1)[0] + "/_control/config/finnhub"
+
+def configure_fake_market(args) -> bool:
+    """Apply the latency profile to the fake provider; False if it is not running"""
+    try:
+        response = requests.put(control_url(), json={
+            "latency_distribution": args.distribution,
+            "latency_ms": args.latency_ms,
+            "latency_spread": args.spread,
+            "tail_rate": args.tail_rate,
+            "tail_ms": args.tail_ms,
+            "error_rate": 0,
+            "rate_limit_rate": 0,
+            "seed": 42,
+        }, timeout=5)
+        response.raise_for_status()
+        return True
+    except requests.RequestException as e:
+        print(f"❌ Fake market server not reachable at {control_url()}: {e}")
+        return False
+
+async def run_round(request, concurrency: int) -> list:
+    """Issue `concurrency` requests at once; returns each one's latency from the common start, in seconds"""
+    started = time.perf_counter()
+
+    async def timed(index: int) -> float:
+        await request(SYMBOLS[index % len(SYMBOLS)])
+        return time.perf_counter() - started
+
+    return await asyncio.gather(*(timed(index) for index in range(concurrency)))
+
+async def run_level(request, concurrency: int, rounds: int):
+    """Run several rounds; returns (latencies, wall time)"""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        latencies.extend(await run_round(request, concurrency))
+    return np.array(latencies), time.perf_counter() - started
+
+async def benchmark(levels, rounds: int):
+    blocking_session = requests.Session()
+    blocking_session.headers["X-Finnhub-Token"] = os.environ["FINNHUB_API_KEY"]
+    client = FinnhubService()
+    await client.start()
+
+    async def blocking_request(symbol: str):
+        """The old way: a blocking call that holds the event loop for the whole round trip"""
+        response = blocking_session.get(f"{client.base_url}/quote", params={"symbol": symbol}, timeout=10)
+        response.raise_for_status()
+
+    async def async_request(symbol: str):
+        await client.quote(symbol)
+
+    # Warm both connection pools so connection setup is not measured
+    await run_round(blocking_request, 1)
+    await run_round(async_request, max(levels))
+
+    print(f"{'concurrency':>11} | {'mode':>8} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'max (ms)':>9} | {'req/s':>8}")
+    print("-" * 70)
+    for concurrency in levels:
+        for mode, request in (("blocking", blocking_request), ("async", async_request)):
+            latencies, wall = await run_level(request, concurrency, rounds)
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+            print(
+                f"{concurrency:>11} | {mode:>8} | {p50:>9.1f} | {p99:>9.1f} | "
+                f"{latencies.max() * 1000:>9.1f} | {len(latencies) / wall:>8.1f}"
+            )
+
+    print(f"\nAsync client connections: {client.connection_stats.to_dict()}")
+    await client.close()
+    blocking_session.close()
+
+def serve_api(port: int, mode: str) -> None:
+    """Child process: run the API with its quote upstream on FinnHub, called blocking or async"""
+    # The probed routes never touch the database, but the app reads its configuration at import
+    os.environ.setdefault("DATABASE_URL", "postgresql://localhost/unused")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    import uvicorn
+    from datetime import datetime
+    from auth import get_current_read_user
+    from finnhub_service import finnhub_service
+    from main import app
+    from market_data_service import market_data_service
+    from models import Stock, User
+    from quote_cache import quote_cache
+    from stock_catalog import stock_catalog
+
+    now = datetime.utcnow()
+    for index in range(1000):
+        stock_catalog.put(Stock(id=index + 1, symbol=f"{PROBE_SYMBOL_PREFIX}{index}", name=f"Slow {index}",
+                                currency="USD", created_at=now, updated_at=now))
+    # Every quote request misses the cache and goes upstream
+    quote_cache.ttl_seconds = 0
+    app.dependency_overrides[get_current_read_user] = lambda: User(id=1, email="benchmark@example.com", username="benchmark")
+
+    blocking_session = requests.Session()
+    blocking_session.headers["X-Finnhub-Token"] = os.environ["FINNHUB_API_KEY"]
+
+    def to_market_data(data: dict) -> dict:
+        return {"current_price": data["c"], "change": data["d"], "change_percent": data["dp"],
+                "high": data["h"], "low": data["l"], "open": data["o"]}
+
+    async def fetch_blocking(symbol: str, *args, **kwargs) -> dict:
+        """The old way: a blocking call that holds the event loop for the whole round trip"""
+        response = blocking_session.get(f"{FINNHUB_BASE_URL}/quote", params={"symbol": symbol}, timeout=10)
+        response.raise_for_status()
+        return to_market_data(response.json())
+
+    async def fetch_async(symbol: str, *args, **kwargs) -> dict:
+        return to_market_data(await finnhub_service.quote(symbol))
+
+    market_data_service._fetch_stock_market_data = fetch_blocking if mode == "blocking" else fetch_async
+    uvicorn.run(app, host="127.0.0.1", port=port, lifespan="off", log_level="warning")
+
+async def wait_for_api(session: aiohttp.ClientSession, url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"API did not start at {url}")
+        await asyncio.sleep(0.2)
+
+async def probe(session: aiohttp.ClientSession, url: str, duration: float, interval: float) -> np.ndarray:
+    """Send a request to the unrelated endpoint every `interval` seconds for `duration`, without waiting
+    for earlier ones, so a stalled server shows up as latency rather than as fewer requests"""
+    async def timed() -> float:
+        started = time.perf_counter()
+        async with session.get(url) as response:
+            await response.read()
+        return time.perf_counter() - started
+
+    probes = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        probes.append(asyncio.create_task(timed()))
+        await asyncio.sleep(interval)
+    return np.array(await asyncio.gather(*probes))
+
+async def quote_worker(session: aiohttp.ClientSession, url: str, stop: asyncio.Event, counts: list) -> None:
+    """Keep one quote request in flight until told to stop"""
+    while not stop.is_set():
+        async with session.get(url) as response:
+            await response.read()
+        counts.append(1)
+
+async def probe_level(session, api_url: str, args, concurrency: int):
+    """Probe latencies with `concurrency` quote requests in flight; returns (latencies, quotes per second)"""
+    stop = asyncio.Event()
+    counts: list = []
+    workers = [
+        asyncio.create_task(quote_worker(session, f"{api_url}/stocks/{PROBE_SYMBOL_PREFIX}{index}/quote", stop, counts))
+        for index in range(concurrency)
+    ]
+    # Let the quote load build before timing
+    await asyncio.sleep(args.latency_ms / 1000)
+    started = time.perf_counter()
+    latencies = await probe(session, f"{api_url}{args.probe_path}", args.probe_seconds, args.probe_interval)
+    wall = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*workers, return_exceptions=True)
+    return latencies, len(counts) / wall
+
+async def probe_benchmark(levels, args) -> None:
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    print(f"Probe: GET {args.probe_path} every {args.probe_interval * 1000:.0f} ms for {args.probe_seconds:.0f}s "
+          f"while N quote requests are in flight")
+    print(f"{'quotes':>6} | {'upstream':>8} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'max (ms)':>9} | {'quotes/s':>8}")
+    print("-" * 65)
+    for mode in ("blocking", "async"):
+        server = multiprocessing.Process(target=serve_api, args=(args.api_port, mode), daemon=True)
+        server.start()
+        try:
+            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+                await wait_for_api(session, f"{api_url}/")
+                for concurrency in [0, *levels]:
+                    latencies, quote_rate = await probe_level(session, api_url, args, concurrency)
+                    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                    print(
+                        f"{concurrency:>6} | {mode:>8} | {p50:>9.1f} | {p99:>9.1f} | "
+                        f"{latencies.max() * 1000:>9.1f} | {quote_rate:>8.1f}"
+                    )
+        finally:
+            server.terminate()
+            server.join()
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Compare blocking and async FinnHub client latency against the fake provider")
+    parser.add_argument("levels", nargs="*", type=int, default=[1, 10, 50], help="Concurrent requests per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per concurrency level")
+    parser.add_argument("--distribution", default="lognormal", choices=["fixed", "uniform", "lognormal"], help="Upstream latency distribution")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Median upstream latency")
+    parser.add_argument("--spread", type=float, default=0.5, help="Lognormal sigma (or uniform ± ms)")
+    parser.add_argument("--tail-rate", type=float, default=0.01, help="Share of requests that take --tail-ms")
+    parser.add_argument("--tail-ms", type=float, default=1000, help="Latency of tail requests")
+    parser.add_argument("--probe", action="store_true", help="Time an unrelated API endpoint while quote requests are in flight")
+    parser.add_argument("--probe-path", default="/", help="Endpoint to time in --probe mode")
+    parser.add_argument("--probe-seconds", type=float, default=5, help="Seconds to probe per level")
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="Seconds between probe requests")
+    parser.add_argument("--api-port", type=int, default=8765, help="Port for the API started in --probe mode")
+    args = parser.parse_args()
+
+    print("⏱️  Benchmarking FinnHub client latency")
+    print("=" * 50)
+    print(f"Upstream: {FINNHUB_BASE_URL}, {args.distribution} latency, median {args.latency_ms} ms, "
+          f"tail {args.tail_rate:.0%} at {args.tail_ms} ms; async pool of {FINNHUB_MAX_CONNECTIONS} connections")
+
+    if not configure_fake_market(args):
+        print("💡 Start it with: python fake_market_server.py")
+        sys.exit(1)
+
+    if args.probe:
+        if max(args.levels) > 1000:
+            parser.error("--probe supports at most 1000 concurrent quote requests")
+        asyncio.run(probe_benchmark(args.levels, args))
+    else:
+        asyncio.run(benchmark(args.levels, args.rounds))
+
+if __name__ == "__main__":
+    main()
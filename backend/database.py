@@ -1,11 +1,11 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from typing import AsyncIterator
 import os
 from dotenv import load_dotenv
 
-# Import all models
-from models import Base, User, Stock, Position, Watchlist
-
 load_dotenv()
 
 # Database configuration
@@ -21,21 +21,55 @@ engine = create_engine(
     connect_args={"sslmode": "require"}
 )
 
+# Synchronous sessions, used by init_database.py, migrations and other scripts
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create tables
-def create_tables():
-    """Create all database tables."""
+def get_async_database_url(url: str) -> str:
+    """Same database, addressed through the asyncpg driver (which takes SSL via connect_args)"""
+    async_url = make_url(url).set(drivername="postgresql+asyncpg")
+    return async_url.difference_update_query(["sslmode"]).render_as_string(hide_password=False)
+
+# Async engine used by the API so queries do not block the event loop
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    connect_args={"ssl": "require"}
+)
+
+# Objects stay usable after commit; lazy loads are not available on async sessions
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+# Apply schema migrations
+def run_migrations():
+    """Upgrade the database schema to the latest Alembic revision."""
+    from alembic import command
+    from alembic.config import Config
+
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Database tables created successfully")
-        print("📊 Tables created: users, stocks, positions, watchlist")
+        config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+        # Leave the application's logging alone; alembic.ini's logger setup is for the CLI
+        config.attributes["configure_logger"] = False
+        command.upgrade(config, "head")
+        print("✅ Database migrations applied successfully")
+        print("📊 Tables: users, stocks, catalog_versions, stock_profiles, price_bars, positions, watchlist, trade_history, trade_totals, stock_trade_totals, trade_lots")
     except Exception as e:
-        print(f"❌ Error creating database tables: {e}")
+        print(f"❌ Error applying database migrations: {e}")
+        raise
 
 # Dependency to get database session
-def get_db():
-    """Get database session dependency."""
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session dependency."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Synchronous session for scripts
+def get_sync_db():
+    """Get a synchronous database session."""
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the upstream market data providers.
+
+Serves the FinnHub quote/profile, Alpha Vantage GLOBAL_QUOTE and Yahoo chart
+response shapes consumed by the API, with configurable latency, error rates
+and 429 injection, so throughput and tail-latency tests can run offline
+without spending real API quota. Each provider has its own profile, so the
+primary can be slowed or failed alone to exercise hedging and failover:
+
+    curl -X PUT localhost:9000/_control/config/alpha_vantage \
+         -H 'Content-Type: application/json' -d '{"latency_ms": 1500}'
+
+Point the API at it with:
+    FINNHUB_BASE_URL=http://localhost:9000/api/v1
+    ALPHA_VANTAGE_BASE_URL=http://localhost:9000/query
+    YAHOO_BASE_URL=http://localhost:9000/v8/finance/chart
+"""
+import asyncio
+import hashlib
+import math
+import os
+import random
+import time
+from typing import Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+import uvicorn
+
+
+class FakeMarketConfig(BaseModel):
+    latency_distribution: str = Field(
+        default=os.getenv("FAKE_MARKET_LATENCY_DISTRIBUTION", "lognormal"),
+        pattern="^(fixed|uniform|lognormal)$",
+        description="fixed, uniform (latency_ms ± spread) or lognormal (median latency_ms, sigma spread)"
+    )
+    latency_ms: float = Field(default=float(os.getenv("FAKE_MARKET_LATENCY_MS", "50")), ge=0)
+    latency_spread: float = Field(default=float(os.getenv("FAKE_MARKET_LATENCY_SPREAD", "0.5")), ge=0)
+    tail_rate: float = Field(default=float(os.getenv("FAKE_MARKET_TAIL_RATE", "0.01")), ge=0, le=1)
+    tail_ms: float = Field(default=float(os.getenv("FAKE_MARKET_TAIL_MS", "2000")), ge=0)
+    error_rate: float = Field(default=float(os.getenv("FAKE_MARKET_ERROR_RATE", "0")), ge=0, le=1)
+    rate_limit_rate: float = Field(default=float(os.getenv("FAKE_MARKET_RATE_LIMIT_RATE", "0")), ge=0, le=1)
+    seed: Optional[int] = Field(default=int(os.getenv("FAKE_MARKET_SEED", "42")))
+
+
+app = FastAPI(title="Fake Market Data Provider", docs_url="/docs", redoc_url=None)
+
+PROVIDERS = ("finnhub", "alpha_vantage", "yahoo")
+
+# Every provider starts from the FAKE_MARKET_* defaults, each with its own random stream
+configs: Dict[str, FakeMarketConfig] = {provider: FakeMarketConfig() for provider in PROVIDERS}
+rngs: Dict[str, random.Random] = {provider: random.Random(config.seed) for provider, config in configs.items()}
+request_counts: Dict[str, int] = {}
+
+
+def sample_latency_seconds(provider: str) -> float:
+    """Draw one response delay from the provider's configured distribution"""
+    config, rng = configs[provider], rngs[provider]
+    if rng.random() < config.tail_rate:
+        return config.tail_ms / 1000
+    if config.latency_distribution == "fixed":
+        latency_ms = config.latency_ms
+    elif config.latency_distribution == "uniform":
+        latency_ms = rng.uniform(config.latency_ms - config.latency_spread, config.latency_ms + config.latency_spread)
+    else:
+        latency_ms = rng.lognormvariate(math.log(max(config.latency_ms, 0.001)), config.latency_spread)
+    return max(0.0, latency_ms) / 1000
+
+
+async def simulate_upstream(provider: str, endpoint: str) -> Optional[JSONResponse]:
+    """Apply the provider's latency and injected failures; returns an error response to send, if any"""
+    request_counts[endpoint] = request_counts.get(endpoint, 0) + 1
+    await asyncio.sleep(sample_latency_seconds(provider))
+
+    config = configs[provider]
+    roll = rngs[provider].random()
+    if roll < config.rate_limit_rate:
+        return JSONResponse(status_code=429, content={"error": "API limit reached"}, headers={"Retry-After": "1"})
+    if roll < config.rate_limit_rate + config.error_rate:
+        return JSONResponse(status_code=500, content={"error": "Injected upstream error"})
+    return None
+
+
+# Yahoo chart intervals and ranges, in seconds
+YAHOO_INTERVALS = {
+    "1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800, "60m": 3600, "90m": 5400, "1h": 3600,
+    "1d": 86400, "5d": 5 * 86400, "1wk": 7 * 86400, "1mo": 30 * 86400, "3mo": 91 * 86400,
+}
+YAHOO_RANGES = {
+    "1d": 86400, "5d": 5 * 86400, "1mo": 30 * 86400, "3mo": 91 * 86400, "6mo": 182 * 86400,
+    "1y": 365 * 86400, "2y": 730 * 86400, "5y": 1826 * 86400, "10y": 3652 * 86400, "max": 7305 * 86400,
+}
+
+# Intraday bars fall in the regular US session, 13:30-20:00 UTC, on weekdays
+SESSION_OPEN_SECONDS = 13 * 3600 + 1800
+SESSION_CLOSE_SECONDS = 20 * 3600
+
+
+def symbol_seed(symbol: str) -> int:
+    return int(hashlib.md5(symbol.upper().encode()).hexdigest()[:8], 16)
+
+
+def price_at(symbol: str, timestamp: float) -> float:
+    """Deterministic per-symbol price: a slow yearly swing plus a small intraday wave"""
+    seed = symbol_seed(symbol)
+    base = 50 + (seed % 200)
+    phase = (seed % 360) * math.pi / 180
+    drift = 0.15 * math.sin(2 * math.pi * timestamp / (365 * 86400) + phase) + 0.03 * math.sin(timestamp / 300 + phase)
+    return round(base * (1 + drift), 2)
+
+
+def current_quote(symbol: str) -> Dict[str, float]:
+    """Today's quote for a symbol, consistent with its chart bars"""
+    now = time.time()
+    day_start = now - now % 86400
+    price = price_at(symbol, now)
+    previous_close = price_at(symbol, day_start - 1)
+    open_price = price_at(symbol, day_start + SESSION_OPEN_SECONDS)
+    return {
+        "price": price,
+        "previous_close": previous_close,
+        "open": open_price,
+        "high": round(max(price, open_price, previous_close) * 1.01, 2),
+        "low": round(min(price, open_price, previous_close) * 0.99, 2),
+        "volume": 1_000_000 + symbol_seed(symbol) % 5_000_000,
+    }
+
+
+# FinnHub: /api/v1/quote and /api/v1/stock/profile2
+@app.get("/api/v1/quote")
+async def finnhub_quote(symbol: str = Query(...)):
+    error = await simulate_upstream("finnhub", "finnhub_quote")
+    if error:
+        return error
+    quote = current_quote(symbol)
+    change = round(quote["price"] - quote["previous_close"], 2)
+    return {
+        "c": quote["price"],
+        "d": change,
+        "dp": round(change / quote["previous_close"] * 100, 4),
+        "h": quote["high"],
+        "l": quote["low"],
+        "o": quote["open"],
+        "pc": quote["previous_close"],
+        "t": int(time.time()),
+    }
+
+
+@app.get("/api/v1/stock/profile2")
+async def finnhub_profile(symbol: str = Query(...)):
+    error = await simulate_upstream("finnhub", "finnhub_profile")
+    if error:
+        return error
+    seed = symbol_seed(symbol)
+    return {
+        "country": "US",
+        "currency": "USD",
+        "exchange": "NASDAQ NMS - GLOBAL MARKET",
+        "finnhubIndustry": "Technology",
+        "ipo": "1990-01-01",
+        "logo": "",
+        "marketCapitalization": float(10_000 + seed % 2_000_000),
+        "name": f"{symbol.upper()} Inc",
+        "phone": "",
+        "shareOutstanding": float(100 + seed % 10_000),
+        "ticker": symbol.upper(),
+        "weburl": f"https://example.com/{symbol.lower()}",
+    }
+
+
+# Alpha Vantage: /query?function=GLOBAL_QUOTE
+@app.get("/query")
+async def alpha_vantage_query(function: str = Query(...), symbol: str = Query(...)):
+    error = await simulate_upstream("alpha_vantage", "alpha_vantage_quote")
+    if error:
+        return error
+    if function != "GLOBAL_QUOTE":
+        return {"Error Message": f"Unsupported function {function}"}
+    quote = current_quote(symbol)
+    change = quote["price"] - quote["previous_close"]
+    return {
+        "Global Quote": {
+            "01. symbol": symbol.upper(),
+            "02. open": f"{quote['open']:.4f}",
+            "03. high": f"{quote['high']:.4f}",
+            "04. low": f"{quote['low']:.4f}",
+            "05. price": f"{quote['price']:.4f}",
+            "06. volume": str(quote["volume"]),
+            "07. latest trading day": time.strftime("%Y-%m-%d"),
+            "08. previous close": f"{quote['previous_close']:.4f}",
+            "09. change": f"{change:.4f}",
+            "10. change percent": f"{change / quote['previous_close'] * 100:.4f}%",
+        }
+    }
+
+
+def chart_timestamps(interval_seconds: int, range_seconds: int, now: float) -> List[int]:
+    """Bar start times over the range, on weekdays and, for intraday bars, within the session"""
+    end = int(now) - int(now) % interval_seconds
+    timestamps = []
+    for timestamp in range(end - range_seconds + interval_seconds, end + 1, interval_seconds):
+        if interval_seconds <= 86400 and time.gmtime(timestamp).tm_wday >= 5:
+            continue
+        if interval_seconds < 86400 and not SESSION_OPEN_SECONDS <= timestamp % 86400 < SESSION_CLOSE_SECONDS:
+            continue
+        timestamps.append(timestamp)
+    return timestamps
+
+
+# Yahoo Finance: /v8/finance/chart/{symbol}
+@app.get("/v8/finance/chart/{symbol}")
+async def yahoo_chart(symbol: str, interval: str = Query("1d"), history_range: str = Query("5d", alias="range")):
+    if interval not in YAHOO_INTERVALS or history_range not in YAHOO_RANGES:
+        return JSONResponse(status_code=422, content={"chart": {"result": None, "error": {
+            "code": "Unprocessable Entity", "description": f"Invalid interval {interval} or range {history_range}",
+        }}})
+    error = await simulate_upstream("yahoo", "yahoo_chart")
+    if error:
+        return error
+
+    now = time.time()
+    step = YAHOO_INTERVALS[interval]
+    timestamps = chart_timestamps(step, YAHOO_RANGES[history_range], now)
+    bars: Dict[str, List[float]] = {"open": [], "high": [], "low": [], "close": [], "volume": []}
+    for timestamp in timestamps:
+        open_price = price_at(symbol, timestamp)
+        close_price = price_at(symbol, min(timestamp + step - 1, now))
+        bars["open"].append(open_price)
+        bars["close"].append(close_price)
+        bars["high"].append(round(max(open_price, close_price) * 1.005, 2))
+        bars["low"].append(round(min(open_price, close_price) * 0.995, 2))
+        bars["volume"].append(symbol_seed(symbol) % 100_000 * step // 3600 + 10_000)
+
+    quote = current_quote(symbol)
+    return {
+        "chart": {
+            "result": [{
+                "meta": {
+                    "symbol": symbol.upper(),
+                    "regularMarketPrice": quote["price"],
+                    "previousClose": quote["previous_close"],
+                    "fiftyTwoWeekHigh": round(quote["previous_close"] * 1.2, 2),
+                    "fiftyTwoWeekLow": round(quote["previous_close"] * 0.8, 2),
+                    "dataGranularity": interval,
+                    "range": history_range,
+                },
+                "timestamp": timestamps,
+                "indicators": {"quote": [bars]},
+            }],
+            "error": None,
+        }
+    }
+
+
+# Control endpoints for load tests
+def provider_config(provider: str) -> FakeMarketConfig:
+    if provider not in configs:
+        raise HTTPException(status_code=404, detail=f"Unknown provider {provider}; expected one of {', '.join(PROVIDERS)}")
+    return configs[provider]
+
+
+def apply_config(provider: str, new_config: FakeMarketConfig) -> None:
+    configs[provider] = new_config
+    if new_config.seed is not None:
+        rngs[provider].seed(new_config.seed)
+
+
+@app.get("/_control/config", response_model=Dict[str, FakeMarketConfig])
+async def get_configs():
+    return configs
+
+
+@app.put("/_control/config", response_model=Dict[str, FakeMarketConfig])
+async def update_configs(new_config: FakeMarketConfig):
+    """Apply one fault/latency profile to every provider"""
+    for provider in PROVIDERS:
+        apply_config(provider, new_config.model_copy())
+    return configs
+
+
+@app.get("/_control/config/{provider}", response_model=FakeMarketConfig)
+async def get_config(provider: str):
+    return provider_config(provider)
+
+
+@app.put("/_control/config/{provider}", response_model=FakeMarketConfig)
+async def update_config(provider: str, new_config: FakeMarketConfig):
+    """Replace one provider's profile, e.g. to slow the primary mid-test"""
+    provider_config(provider)
+    apply_config(provider, new_config)
+    return configs[provider]
+
+
+@app.get("/_control/stats")
+async def get_stats():
+    return {"requests": request_counts}
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("FAKE_MARKET_PORT", "9000")), log_level="warning")
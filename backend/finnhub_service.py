@@ -0,0 +1,86 @@
+import asyncio
+import os
+import aiohttp
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from http_pool import ConnectionStats, create_pooled_session
+from rate_limiter import rate_limiters, Priority, FINNHUB
+import logging
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# FinnHub configuration
+FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
+if not FINNHUB_API_KEY:
+    raise ValueError("FINNHUB_API_KEY not found in environment variables")
+
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", "https://finnhub.io/api/v1")
+FINNHUB_MAX_CONNECTIONS = int(os.getenv("FINNHUB_MAX_CONNECTIONS", "20"))
+FINNHUB_TIMEOUT_SECONDS = float(os.getenv("FINNHUB_TIMEOUT_SECONDS", "10"))
+FINNHUB_CONNECT_TIMEOUT_SECONDS = float(os.getenv("FINNHUB_CONNECT_TIMEOUT_SECONDS", "3"))
+
+
+class FinnhubAPIError(Exception):
+    """Raised when FinnHub answers with a non-success status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"FinnHub API error {status}: {message}")
+        self.status = status
+
+
+class FinnhubService:
+    """Async FinnHub client on a pooled aiohttp session, safe to call from the event loop"""
+
+    def __init__(self, api_key: str = FINNHUB_API_KEY, base_url: str = FINNHUB_BASE_URL):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+        self.connection_stats = ConnectionStats()
+
+    async def start(self) -> None:
+        """Create the pooled HTTP session"""
+        await self._get_session()
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    self._session = create_pooled_session(
+                        self.connection_stats,
+                        limit=FINNHUB_MAX_CONNECTIONS,
+                        limit_per_host=FINNHUB_MAX_CONNECTIONS,
+                        timeout_seconds=FINNHUB_TIMEOUT_SECONDS,
+                        connect_timeout_seconds=FINNHUB_CONNECT_TIMEOUT_SECONDS,
+                        headers={"X-Finnhub-Token": self.api_key}
+                    )
+        return self._session
+
+    async def _get(self, path: str, params: Dict[str, str], priority: Priority) -> Dict:
+        """Perform a GET request against the FinnHub REST API within the provider quota"""
+        await rate_limiters[FINNHUB].acquire(priority)
+        session = await self._get_session()
+        async with session.get(f"{self.base_url}{path}", params=params) as response:
+            if response.status != 200:
+                raise FinnhubAPIError(response.status, await response.text())
+            return await response.json()
+
+    async def quote(self, symbol: str, priority: Priority = Priority.INTERACTIVE) -> Dict:
+        """Get real-time quote data for a symbol"""
+        return await self._get("/quote", {"symbol": symbol}, priority)
+
+    async def company_profile2(self, symbol: str, priority: Priority = Priority.PROFILE) -> Dict:
+        """Get the company profile for a symbol"""
+        return await self._get("/stock/profile2", {"symbol": symbol}, priority)
+
+# Global instance
+finnhub_service = FinnhubService()
@@ -0,0 +1,62 @@
+import aiohttp
+from typing import Dict, Optional
+from types import SimpleNamespace
+
+
+class ConnectionStats:
+    """Counts requests and new vs reused pooled connections for one HTTP session"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    async def _on_request_start(self, session, context: SimpleNamespace, params) -> None:
+        self.requests += 1
+
+    async def _on_connection_create_end(self, session, context: SimpleNamespace, params) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, context: SimpleNamespace, params) -> None:
+        self.connections_reused += 1
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Build an aiohttp trace config that feeds these counters"""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        return trace_config
+
+    def to_dict(self) -> Dict[str, float]:
+        """Return counters along with the connection reuse ratio"""
+        acquired = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": round(self.connections_reused / acquired, 4) if acquired else 0.0,
+        }
+
+
+def create_pooled_session(
+    stats: ConnectionStats,
+    limit: int,
+    limit_per_host: int,
+    timeout_seconds: float,
+    connect_timeout_seconds: float,
+    headers: Optional[Dict[str, str]] = None
+) -> aiohttp.ClientSession:
+    """Create a long-lived keep-alive session with DNS caching and explicit timeouts"""
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=300,
+        keepalive_timeout=30,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout_seconds, connect=connect_timeout_seconds),
+        headers=headers,
+        trace_configs=[stats.trace_config()],
+    )
@@ -4,16 +4,17 @@ Database initialization script
 Creates tables and populates with sample data
 """
 
-from database import create_tables, get_db, test_connection
+from database import run_migrations, get_sync_db, test_connection
 from models import User, Stock, Position, Watchlist
 from sqlalchemy.orm import Session
+from stock_catalog import bump_catalog_version
 import sys
 
 def init_sample_stocks():
     """Initialize database with sample stock data"""
     
     # Get database session
-    db = next(get_db())
+    db = next(get_sync_db())
     
     try:
         # Sample stocks data
@@ -45,6 +46,8 @@ def init_sample_stocks():
                 stock = Stock(**stock_data)
                 db.add(stock)
         
+        # Running API workers reload their stock catalog when the version changes
+        db.execute(bump_catalog_version())
         db.commit()
         print(f"✅ Added {len(sample_stocks)} sample stocks to database")
         
@@ -63,7 +66,7 @@ def init_sample_stocks():
 def init_sample_positions(user_id: int):
     """Initialize database with sample position data for a user"""
     
-    db = next(get_db())
+    db = next(get_sync_db())
     
     try:
         # Check if positions already exist for this user
@@ -123,7 +126,7 @@ def init_sample_positions(user_id: int):
 def init_sample_watchlist(user_id: int):
     """Initialize database with sample watchlist data for a user"""
     
-    db = next(get_db())
+    db = next(get_sync_db())
     
     try:
         # Check if watchlist items already exist for this user
@@ -180,7 +183,7 @@ def init_sample_watchlist(user_id: int):
 def show_table_info():
     """Display information about created tables"""
     
-    db = next(get_db())
+    db = next(get_sync_db())
     
     try:
         # Count records in each table
@@ -211,9 +214,9 @@ def main():
         print("❌ Database connection failed. Please check your configuration.")
         sys.exit(1)
     
-    # Create all tables
-    print("\n📋 Creating database tables...")
-    create_tables()
+    # Create or upgrade all tables
+    print("\n📋 Applying database migrations...")
+    run_migrations()
     
     # Initialize with sample data
     print("\n📊 Adding sample stock data...")
@@ -0,0 +1,168 @@
+import os
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Intraday tick buffer configuration
+INTRADAY_BUFFER_CAPACITY = int(os.getenv("INTRADAY_BUFFER_CAPACITY", "2880"))
+INTRADAY_MAX_SYMBOLS = int(os.getenv("INTRADAY_MAX_SYMBOLS", "2000"))
+# The 1D chart falls back to stored bars until the ticks in the session span at least this long
+# (and number at least the chart's points), so a restarted worker does not draw a handful of ticks
+INTRADAY_MIN_COVERAGE_SECONDS = float(os.getenv("INTRADAY_MIN_COVERAGE_SECONDS", "3600"))
+
+
+# A US session falls within one UTC day, so the 1D chart shows the UTC day of the newest
+# tick or bar; get_chart_closes applies the same boundary to stored bars
+SESSION_SECONDS = 86400
+
+
+def session_start(timestamp: float) -> float:
+    """Start of the session (UTC day) containing timestamp"""
+    return timestamp - timestamp % SESSION_SECONDS
+
+
+class IntradayRingBuffer:
+    """Fixed-capacity ring of (timestamp, price) ticks stored in two flat double arrays"""
+
+    __slots__ = ("capacity", "_timestamps", "_prices", "_start", "_size")
+
+    def __init__(self, capacity: int = INTRADAY_BUFFER_CAPACITY):
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._prices = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, price: float) -> None:
+        """Add a tick, overwriting the oldest one once the buffer is full"""
+        if self._size and timestamp < self._timestamps[(self._start + self._size - 1) % self.capacity]:
+            # Out-of-order tick (e.g. a slow hedged response); keep the series monotonic
+            return
+
+        if self._size < self.capacity:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._timestamps[index] = timestamp
+        self._prices[index] = price
+
+    def latest(self) -> Optional[float]:
+        """Timestamp of the newest tick"""
+        if not self._size:
+            return None
+        return self._timestamps[(self._start + self._size - 1) % self.capacity]
+
+    def _skip_before(self, cutoff: float) -> int:
+        """Number of ticks older than cutoff; timestamps are monotonic, so they form a prefix"""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return bisect_left(self._timestamps, cutoff, self._start, end) - self._start
+        # Wrapped: the older ticks run from _start to the end of the array, the newer ones from 0
+        if self._timestamps[self.capacity - 1] >= cutoff:
+            return bisect_left(self._timestamps, cutoff, self._start, self.capacity) - self._start
+        return self.capacity - self._start + bisect_left(self._timestamps, cutoff, 0, end - self.capacity)
+
+    def span_since(self, cutoff: float) -> float:
+        """Seconds between the first tick at or after cutoff and the latest tick"""
+        skipped = self._skip_before(cutoff)
+        if skipped == self._size:
+            return 0.0
+        first = self._timestamps[(self._start + skipped) % self.capacity]
+        return self._timestamps[(self._start + self._size - 1) % self.capacity] - first
+
+    def prices_since(self, cutoff: float) -> array:
+        """Prices of the ticks at or after cutoff, oldest first"""
+        # Skip the expired prefix and copy the rest in at most two slices
+        skipped = self._skip_before(cutoff)
+        first = (self._start + skipped) % self.capacity
+        count = self._size - skipped
+        if first + count <= self.capacity:
+            return self._prices[first:first + count]
+        return self._prices[first:] + self._prices[:first + count - self.capacity]
+
+    def nbytes(self) -> int:
+        return (len(self._timestamps) + len(self._prices)) * self._prices.itemsize
+
+
+def downsample_last(values: array, points: int) -> List[float]:
+    """Split values into `points` contiguous buckets and keep the last value of each"""
+    count = len(values)
+    if count <= points:
+        return [round(value, 2) for value in values]
+    return [round(values[(bucket + 1) * count // points - 1], 2) for bucket in range(points)]
+
+
+class IntradayStore:
+    """Ring buffer per active symbol, evicting the least recently updated symbol past the bound"""
+
+    def __init__(
+        self,
+        capacity: int = INTRADAY_BUFFER_CAPACITY,
+        max_symbols: int = INTRADAY_MAX_SYMBOLS,
+        min_coverage_seconds: float = INTRADAY_MIN_COVERAGE_SECONDS
+    ):
+        self.capacity = capacity
+        self.max_symbols = max_symbols
+        self.min_coverage_seconds = min_coverage_seconds
+        self._buffers: "OrderedDict[str, IntradayRingBuffer]" = OrderedDict()
+
+        self.ticks_recorded = 0
+        self.evictions = 0
+
+    def record(self, symbol: str, price: float, timestamp: Optional[float] = None) -> None:
+        """Append a fresh quote price to the symbol's buffer"""
+        if not price:
+            return
+        symbol = symbol.upper()
+        buffer = self._buffers.get(symbol)
+        if buffer is None:
+            buffer = IntradayRingBuffer(self.capacity)
+            self._buffers[symbol] = buffer
+            while len(self._buffers) > self.max_symbols:
+                self._buffers.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buffers.move_to_end(symbol)
+
+        buffer.append(time.time() if timestamp is None else timestamp, float(price))
+        self.ticks_recorded += 1
+
+    def series(self, symbol: str, points: int) -> Optional[List[float]]:
+        """Prices of the latest session downsampled to exactly `points` values, or None without enough ticks or coverage"""
+        buffer = self._buffers.get(symbol.upper())
+        if buffer is None or not len(buffer):
+            return None
+
+        cutoff = session_start(buffer.latest())
+        if buffer.span_since(cutoff) < self.min_coverage_seconds:
+            return None
+        prices = buffer.prices_since(cutoff)
+        if len(prices) < points:
+            return None
+        return downsample_last(prices, points)
+
+    def stats(self) -> Dict:
+        return {
+            "symbols": len(self._buffers),
+            "max_symbols": self.max_symbols,
+            "capacity_per_symbol": self.capacity,
+            "ticks_buffered": sum(len(buffer) for buffer in self._buffers.values()),
+            "ticks_recorded": self.ticks_recorded,
+            "evictions": self.evictions,
+            "bytes": sum(buffer.nbytes() for buffer in self._buffers.values()),
+        }
+
+
+# Global instance
+intraday_store = IntradayStore()
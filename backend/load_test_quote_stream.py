@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Quote stream load test
+Opens N idle WebSocket subscribers to /stocks/stream on a running API, all
+following the same symbols, then reports how long each quote update takes to
+reach every subscriber (fan-out latency) and the server's memory per connection.
+
+Run the API against the fake provider with the quote poller on, so prices keep moving:
+    python fake_market_server.py
+    FINNHUB_BASE_URL=http://localhost:9000/api/v1 ALPHA_VANTAGE_BASE_URL=http://localhost:9000/query \\
+    YAHOO_BASE_URL=http://localhost:9000/v8/finance/chart QUOTE_POLLER_INTERVAL_SECONDS=5 python start_server.py
+
+Usage:
+    python load_test_quote_stream.py --email user@example.com --password secret
+    python load_test_quote_stream.py 5000 --token JWT --symbols AAPL MSFT --duration 60 --server-pid 1234
+
+Thousands of sockets from one process may need a higher open-file limit (ulimit -n).
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+import aiohttp
+import numpy as np
+
+def read_rss_mb(pid: Optional[int]) -> Optional[float]:
+    """Resident memory of a local process from /proc, in MB"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+async def login(session: aiohttp.ClientSession, api_url: str, email: str, password: str) -> Optional[str]:
+    """Get an access token from /auth/login"""
+    async with session.post(f"{api_url}/auth/login", json={"email": email, "password": password}) as response:
+        if response.status != 200:
+            print(f"❌ Login failed ({response.status}): {await response.text()}")
+            return None
+        return (await response.json())["access_token"]
+
+async def fetch_stream_stats(session: aiohttp.ClientSession, api_url: str) -> Dict:
+    """Streaming counters from /metrics"""
+    try:
+        async with session.get(f"{api_url}/metrics") as response:
+            return (await response.json()).get("quote_stream", {})
+    except aiohttp.ClientError:
+        return {}
+
+class FanoutRecorder:
+    """Receive times of every update, keyed by (symbol, current_price), per subscriber"""
+
+    def __init__(self):
+        self.received: Dict[Tuple[str, float], List[float]] = {}
+        self.messages = 0
+        self.errors = 0
+
+    def record(self, message: Dict) -> None:
+        received_at = time.perf_counter()
+        if message.get("type") != "quotes":
+            self.errors += 1
+            return
+        self.messages += 1
+        for symbol, fields in message["data"].items():
+            if "current_price" in fields:
+                self.received.setdefault((symbol, fields["current_price"]), []).append(received_at)
+
+async def idle_subscriber(session, stream_url: str, symbols: List[str], recorder: FanoutRecorder,
+                          ready: List[int], stop: asyncio.Event) -> None:
+    """Connect, subscribe once, then only read until told to stop"""
+    async with session.ws_connect(stream_url, heartbeat=None) as websocket:
+        await websocket.send_json({"action": "subscribe", "symbols": symbols})
+        ready.append(1)
+        while not stop.is_set():
+            try:
+                message = await asyncio.wait_for(websocket.receive(), timeout=1)
+            except asyncio.TimeoutError:
+                continue
+            if message.type != aiohttp.WSMsgType.TEXT:
+                return
+            recorder.record(message.json())
+
+async def run(args) -> None:
+    api_url = args.api_url.rstrip("/")
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        token = args.token or await login(session, api_url, args.email, args.password)
+        if not token:
+            sys.exit(1)
+
+        stream_url = f"{api_url.replace('http', 'ws', 1)}/stocks/stream?token={token}"
+        rss_before = read_rss_mb(args.server_pid)
+        recorder = FanoutRecorder()
+        stop = asyncio.Event()
+        ready: List[int] = []
+
+        print(f"🔌 Opening {args.subscribers} subscribers to {', '.join(args.symbols)}...")
+        started = time.perf_counter()
+        tasks = []
+        for index in range(args.subscribers):
+            tasks.append(asyncio.create_task(
+                idle_subscriber(session, stream_url, args.symbols, recorder, ready, stop)
+            ))
+            if index % 100 == 99:
+                # Let the accepted connections subscribe before opening more
+                await asyncio.sleep(0.05)
+        while len(ready) < args.subscribers and not all(task.done() for task in tasks):
+            await asyncio.sleep(0.1)
+        failed = sum(1 for task in tasks if task.done() and task.exception() is not None)
+        print(f"✅ {len(ready)} connected in {time.perf_counter() - started:.1f}s ({failed} failed)")
+
+        rss_connected = read_rss_mb(args.server_pid)
+        print(f"⏳ Listening for {args.duration:.0f}s...")
+        await asyncio.sleep(args.duration)
+        stats = await fetch_stream_stats(session, api_url)
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Fan-out latency: time from the first subscriber receiving an update to each other one receiving it
+    complete = {key: times for key, times in recorder.received.items() if len(times) >= len(ready)}
+    spreads = np.array([receive - min(times) for times in complete.values() for receive in times])
+
+    print("\n📊 Results")
+    print("=" * 50)
+    print(f"Subscribers:         {len(ready)}")
+    print(f"Messages received:   {recorder.messages} ({recorder.errors} errors)")
+    print(f"Updates seen:        {len(recorder.received)} ({len(complete)} reached every subscriber)")
+    if len(spreads):
+        p50, p99 = np.percentile(spreads, [50, 99]) * 1000
+        print(f"Fan-out latency:     p50 {p50:.1f} ms, p99 {p99:.1f} ms, max {spreads.max() * 1000:.1f} ms")
+    else:
+        print("Fan-out latency:     no complete updates; is the quote poller running and are prices moving?")
+    if stats:
+        print(f"Server stream stats: {stats}")
+    if rss_before is not None and rss_connected is not None:
+        per_connection_kb = (rss_connected - rss_before) * 1024 / max(len(ready), 1)
+        print(f"Server RSS:          {rss_before:.1f} MB idle -> {rss_connected:.1f} MB connected ({per_connection_kb:.1f} KB per subscriber)")
+
+def main():
+    """Main load test function"""
+    parser = argparse.ArgumentParser(description="Measure quote fan-out latency and memory with many idle WebSocket subscribers")
+    parser.add_argument("subscribers", nargs="?", type=int, default=1000, help="Number of idle subscribers")
+    parser.add_argument("--api-url", default="http://localhost:8000", help="Base URL of the running API")
+    parser.add_argument("--token", help="JWT access token (otherwise log in with --email/--password)")
+    parser.add_argument("--email", help="Login email")
+    parser.add_argument("--password", help="Login password")
+    parser.add_argument("--symbols", nargs="+", default=["AAPL"], help="Symbols every subscriber follows")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to listen for updates")
+    parser.add_argument("--server-pid", type=int, help="PID of a local API process, to report its memory")
+    args = parser.parse_args()
+
+    if not args.token and not (args.email and args.password):
+        parser.error("pass --token or --email and --password")
+
+    print("📡 Quote stream load test")
+    print("=" * 50)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,22 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from database import create_tables, test_connection
+from database import async_engine, run_migrations, test_connection
 from routes.auth import router as auth_router
 from routes.stocks import router as stocks_router
 from routes.positions import router as positions_router
 from routes.watchlist import router as watchlist_router
 from routes.trade_history import router as trade_history_router
+from quote_cache import quote_cache
+from bar_service import chart_cache
+from intraday_buffer import intraday_store
+from finnhub_service import finnhub_service
+from market_data_service import market_data_service
+from quote_poller import quote_poller, QUOTE_POLLER_ENABLED
+from quote_stream import quote_broadcaster
+from rate_limiter import get_rate_limiter_stats
+from replica_router import replica_router, SAFE_METHODS
+from stock_catalog import stock_catalog
 import uvicorn
 import logging
 
@@ -35,6 +45,14 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Requested-With"],
 )
 
+# Read-your-writes: after a successful write, keep the client's reads on the primary
+@app.middleware("http")
+async def track_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        replica_router.record_write(request.headers.get("authorization"))
+    return response
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -45,13 +63,38 @@ async def startup_event():
     if test_connection():
         logger.info("✅ Database connection established")
         
-        # Create database tables
-        create_tables()
-        logger.info("✅ Database tables initialized")
+        # Bring the schema up to date
+        run_migrations()
+        logger.info("✅ Database schema up to date")
     else:
         logger.error("❌ Failed to connect to database")
         raise Exception("Database connection failed")
     
+    # Route read-only sessions to replicas when DATABASE_REPLICA_URLS is set
+    if replica_router.enabled:
+        await replica_router.check_replicas()
+        replica_router.start()
+        logger.info(f"✅ Read replica routing enabled for {len(replica_router.replicas)} replica(s)")
+    
+    # Serve stock lookups from memory; reloaded when another worker changes the catalog
+    await stock_catalog.load()
+    stock_catalog.start()
+    logger.info(f"✅ Stock catalog loaded ({len(stock_catalog.all_stocks())} stocks)")
+    
+    # Drop cached chart series once new price bars are stored (e.g. by backfill_bars.py)
+    await chart_cache.check_version()
+    chart_cache.start()
+    
+    # Open pooled HTTP sessions for upstream market data providers
+    await finnhub_service.start()
+    await market_data_service.start()
+    logger.info("✅ Market data client sessions opened")
+    
+    # Keep quotes for watched and held symbols warm in the background
+    if QUOTE_POLLER_ENABLED:
+        quote_poller.start()
+        logger.info("✅ Background quote poller started")
+    
     logger.info("🎉 Trading Dashboard API started successfully!")
 
 # Shutdown event
@@ -59,6 +102,13 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("👋 Shutting down Trading Dashboard API...")
+    await quote_poller.stop()
+    await stock_catalog.stop()
+    await chart_cache.stop()
+    await market_data_service.close()
+    await finnhub_service.close()
+    await replica_router.stop()
+    await async_engine.dispose()
 
 # Include routers
 app.include_router(auth_router)
@@ -82,7 +132,8 @@ async def root():
             "auth": "/auth",
             "stocks": "/stocks",
             "positions": "/positions",
-            "watchlist": "/watchlist"
+            "watchlist": "/watchlist",
+            "quote_stream": "/stocks/stream"
         }
     }
 
@@ -109,6 +160,26 @@ async def health_check():
             "version": "1.0.0"
         }
 
+# Metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """In-process counters for caches and upstream market data access."""
+    return {
+        "quote_cache": quote_cache.stats(),
+        "chart_cache": chart_cache.stats(),
+        "intraday": intraday_store.stats(),
+        "replicas": replica_router.stats(),
+        "stock_catalog": stock_catalog.stats(),
+        "quote_poller": quote_poller.stats(),
+        "quote_stream": quote_broadcaster.stats(),
+        "rate_limiters": get_rate_limiter_stats(),
+        "market_data": market_data_service.get_provider_stats(),
+        "connections": {
+            "finnhub": finnhub_service.connection_stats.to_dict(),
+            **market_data_service.get_connection_stats()
+        }
+    }
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors."""
@@ -133,7 +204,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "message": exc.detail,
             "success": False,
             "status_code": exc.status_code
-        }
+        },
+        headers=exc.headers
     )
 
 @app.exception_handler(Exception)
@@ -1,53 +1,246 @@
 import asyncio
+import os
+import time
 import aiohttp
 from typing import Dict, Optional, List
 from datetime import datetime
 import logging
+from quote_cache import quote_cache
+from http_pool import ConnectionStats, create_pooled_session
+from rate_limiter import rate_limiters, Priority, RateLimitExceeded, ALPHA_VANTAGE, YAHOO
+from provider_health import ProviderHealth
+from intraday_buffer import intraday_store
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of concurrent upstream fetches for batch requests
+MARKET_DATA_MAX_CONCURRENCY = int(os.getenv("MARKET_DATA_MAX_CONCURRENCY", "8"))
+
+# Connection pool and timeout settings for each provider session
+MARKET_DATA_MAX_CONNECTIONS = int(os.getenv("MARKET_DATA_MAX_CONNECTIONS", "20"))
+MARKET_DATA_TIMEOUT_SECONDS = float(os.getenv("MARKET_DATA_TIMEOUT_SECONDS", "8"))
+MARKET_DATA_CONNECT_TIMEOUT_SECONDS = float(os.getenv("MARKET_DATA_CONNECT_TIMEOUT_SECONDS", "3"))
+
+# Hedged requests: fire the fallback provider once the primary exceeds its p95 latency
+MARKET_DATA_HEDGING_ENABLED = os.getenv("MARKET_DATA_HEDGING_ENABLED", "false").lower() == "true"
+MARKET_DATA_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("MARKET_DATA_HEDGE_MIN_DELAY_SECONDS", "0.2"))
+MARKET_DATA_HEDGE_MAX_DELAY_SECONDS = float(os.getenv("MARKET_DATA_HEDGE_MAX_DELAY_SECONDS", "2"))
+
+def get_direction(change: float) -> str:
+    """Map a price change to the direction indicator used by the frontend"""
+    if change > 0:
+        return "up"
+    elif change < 0:
+        return "down"
+    return "neutral"
+
+def build_quote_fields(data: Dict) -> Dict:
+    """Map a market data dict to the field names of StockQuoteResponse"""
+    change = data.get("change", 0)
+    return {
+        "current_price": data["current_price"],
+        "change": change,
+        "percent_change": data.get("change_percent", 0),
+        "high_price": data.get("high", 0),
+        "low_price": data.get("low", 0),
+        "open_price": data.get("open", 0),
+        "previous_close": data["current_price"] - change,
+        "direction": get_direction(change),
+    }
+
 class MarketDataService:
     """Service to fetch real-time market data from various APIs"""
     
     def __init__(self):
         # Using Alpha Vantage as primary source (free tier available)
-        self.alpha_vantage_key = "demo"  # Replace with actual API key
-        self.alpha_vantage_base = "https://www.alphavantage.co/query"
+        self.alpha_vantage_key = os.getenv("ALPHA_VANTAGE_API_KEY", "demo")
+        self.alpha_vantage_base = os.getenv("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co/query")
         
         # Fallback to Yahoo Finance (no API key required)
-        self.yahoo_base = "https://query1.finance.yahoo.com/v8/finance/chart"
+        self.yahoo_base = os.getenv("YAHOO_BASE_URL", "https://query1.finance.yahoo.com/v8/finance/chart")
+        
+        # One long-lived pooled session per provider
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self.connection_stats: Dict[str, ConnectionStats] = {
+            ALPHA_VANTAGE: ConnectionStats(),
+            YAHOO: ConnectionStats(),
+        }
+        
+        # Circuit breakers and latency tracking per provider
+        self.provider_health: Dict[str, ProviderHealth] = {
+            ALPHA_VANTAGE: ProviderHealth(),
+            YAHOO: ProviderHealth(),
+        }
+        self._provider_fetchers = {
+            ALPHA_VANTAGE: self._fetch_alpha_vantage_data,
+            YAHOO: self._fetch_yahoo_data,
+        }
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+    
+    async def start(self) -> None:
+        """Open the pooled provider sessions"""
+        for provider in self.connection_stats:
+            self._get_session(provider)
+    
+    async def close(self) -> None:
+        """Close the pooled provider sessions"""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            if not session.closed:
+                await session.close()
+    
+    def _get_session(self, provider: str) -> aiohttp.ClientSession:
+        """Return the shared session for a provider, creating it on first use"""
+        session = self._sessions.get(provider)
+        if session is None or session.closed:
+            session = create_pooled_session(
+                self.connection_stats[provider],
+                limit=MARKET_DATA_MAX_CONNECTIONS,
+                limit_per_host=MARKET_DATA_MAX_CONNECTIONS,
+                timeout_seconds=MARKET_DATA_TIMEOUT_SECONDS,
+                connect_timeout_seconds=MARKET_DATA_CONNECT_TIMEOUT_SECONDS
+            )
+            self._sessions[provider] = session
+        return session
+    
+    def get_connection_stats(self) -> Dict[str, Dict]:
+        """Return connection reuse counters per provider"""
+        return {provider: stats.to_dict() for provider, stats in self.connection_stats.items()}
         
     async def get_stock_market_data(self, symbol: str) -> Optional[Dict]:
-        """Get comprehensive market data for a stock symbol"""
+        """Get comprehensive market data for a stock symbol (served from the shared quote cache)"""
+        return await quote_cache.get_or_fetch(
+            f"market:{symbol.upper()}",
+            lambda: self._fetch_stock_market_data(symbol)
+        )
+    
+    async def _fetch_stock_market_data(self, symbol: str, priority: Priority = Priority.INTERACTIVE) -> Optional[Dict]:
+        """Fetch market data from upstream providers, bypassing the cache"""
+        # Providers in preference order, skipping any whose circuit is open
+        providers = self._available_providers()
+        if not providers:
+            # Nothing is cached; callers decide whether to answer with mock data
+            logger.warning(f"All market data providers are open-circuit, no quote for {symbol}")
+            return None
+        
         try:
-            # Try Alpha Vantage first
-            market_data = await self._fetch_alpha_vantage_data(symbol)
-            if market_data:
-                return market_data
-                
-            # Fallback to Yahoo Finance
-            market_data = await self._fetch_yahoo_data(symbol)
-            return market_data
+            if MARKET_DATA_HEDGING_ENABLED and len(providers) > 1:
+                market_data = await self._fetch_hedged(symbol, providers[0], providers[1], priority)
+            else:
+                # Fall back through the providers one after another
+                market_data = None
+                for provider in providers:
+                    market_data = await self._call_provider(provider, symbol, priority)
+                    if market_data:
+                        break
             
         except Exception as e:
             logger.error(f"Error fetching market data for {symbol}: {str(e)}")
             return None
+        
+        # Every fresh upstream quote becomes an intraday tick for the 1D chart
+        if market_data:
+            intraday_store.record(symbol, market_data.get("current_price"))
+        return market_data
+    
+    def _available_providers(self) -> List[str]:
+        """Providers in preference order whose circuit is not open"""
+        return [provider for provider in (ALPHA_VANTAGE, YAHOO)
+                if not self.provider_health[provider].breaker.is_open()]
+    
+    async def _fetch_hedged(self, symbol: str, primary: str, secondary: str, priority: Priority) -> Optional[Dict]:
+        """Call the primary, fire the secondary if the primary is slower than its p95, and take the first answer"""
+        primary_task = asyncio.create_task(self._call_provider(primary, symbol, priority))
+        done, _ = await asyncio.wait({primary_task}, timeout=self._hedge_delay(primary))
+        if done:
+            market_data = primary_task.result()
+            if market_data:
+                return market_data
+            return await self._call_provider(secondary, symbol, priority)
+        
+        self.hedges_fired += 1
+        secondary_task = asyncio.create_task(self._call_provider(secondary, symbol, priority))
+        pending = {primary_task, secondary_task}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    market_data = task.result()
+                    if market_data:
+                        if task is secondary_task:
+                            self.hedge_wins += 1
+                        return market_data
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _hedge_delay(self, provider: str) -> float:
+        """Delay before hedging, based on the provider's recent p95 latency"""
+        p95 = self.provider_health[provider].latency.percentile(95)
+        if p95 is None:
+            return MARKET_DATA_HEDGE_MAX_DELAY_SECONDS
+        return min(MARKET_DATA_HEDGE_MAX_DELAY_SECONDS, max(MARKET_DATA_HEDGE_MIN_DELAY_SECONDS, p95))
+    
+    async def _call_provider(self, provider: str, symbol: str, priority: Priority) -> Optional[Dict]:
+        """Call one provider within its rate limit and circuit breaker, recording latency and outcome"""
+        health = self.provider_health[provider]
+        if not health.breaker.allow_request():
+            return None
+        
+        try:
+            await rate_limiters[provider].acquire(priority)
+        except RateLimitExceeded as e:
+            # Not sent upstream, so it says nothing about the provider's health
+            health.breaker.release()
+            logger.warning(f"{provider} request for {symbol} not sent: {str(e)}")
+            return None
+        except asyncio.CancelledError:
+            health.breaker.release()
+            raise
+        
+        started = time.monotonic()
+        try:
+            market_data = await self._provider_fetchers[provider](symbol)
+        except asyncio.CancelledError:
+            health.breaker.release()
+            raise
+        
+        if market_data:
+            health.latency.record(time.monotonic() - started)
+            health.breaker.record_success()
+            health.served += 1
+            return {**market_data, "provider": provider}
+        
+        health.breaker.record_failure()
+        health.failures += 1
+        return None
+    
+    def get_provider_stats(self) -> Dict:
+        """Return circuit breaker, latency and hedging counters per provider"""
+        return {
+            "providers": {provider: health.stats() for provider, health in self.provider_health.items()},
+            "hedging_enabled": MARKET_DATA_HEDGING_ENABLED,
+            "hedges_fired": self.hedges_fired,
+            "hedge_wins": self.hedge_wins,
+        }
     
     async def _fetch_alpha_vantage_data(self, symbol: str) -> Optional[Dict]:
         """Fetch data from Alpha Vantage API"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Get quote data
-                quote_url = f"{self.alpha_vantage_base}?function=GLOBAL_QUOTE&symbol={symbol}&apikey={self.alpha_vantage_key}"
-                
-                async with session.get(quote_url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        quote_data = data.get("Global Quote", {})
+            session = self._get_session(ALPHA_VANTAGE)
+            # Get quote data
+            params = {"function": "GLOBAL_QUOTE", "symbol": symbol, "apikey": self.alpha_vantage_key}
+            
+            async with session.get(self.alpha_vantage_base, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    quote_data = data.get("Global Quote", {})
+                    
+                    if quote_data:
+                        return self._parse_alpha_vantage_data(symbol, quote_data)
                         
-                        if quote_data:
-                            return self._parse_alpha_vantage_data(symbol, quote_data)
-                            
         except Exception as e:
             logger.error(f"Alpha Vantage API error for {symbol}: {str(e)}")
             return None
@@ -55,19 +248,67 @@ class MarketDataService:
     async def _fetch_yahoo_data(self, symbol: str) -> Optional[Dict]:
         """Fetch data from Yahoo Finance API"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.yahoo_base}/{symbol}"
-                
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_yahoo_data(symbol, data)
-                        
+            session = self._get_session(YAHOO)
+            url = f"{self.yahoo_base}/{symbol}"
+            
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._parse_yahoo_data(symbol, data)
+                    
         except Exception as e:
             logger.error(f"Yahoo Finance API error for {symbol}: {str(e)}")
             return None
     
-    def _parse_alpha_vantage_data(self, symbol: str, quote_data: Dict) -> Dict:
+    async def get_price_history(self, symbol: str, interval: str, history_range: str) -> List[Dict]:
+        """Fetch OHLCV bars from Yahoo Finance, e.g. interval='1d', history_range='5y'"""
+        try:
+            await rate_limiters[YAHOO].acquire(Priority.BACKGROUND)
+            session = self._get_session(YAHOO)
+            url = f"{self.yahoo_base}/{symbol}"
+            params = {"interval": interval, "range": history_range}
+            
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._parse_yahoo_bars(data)
+                logger.error(f"Yahoo Finance history request for {symbol} returned {response.status}")
+                return []
+                
+        except RateLimitExceeded as e:
+            logger.warning(f"Yahoo Finance history request for {symbol} not sent: {str(e)}")
+            return []
+        except Exception as e:
+            logger.error(f"Yahoo Finance history error for {symbol}: {str(e)}")
+            return []
+    
+    def _parse_yahoo_bars(self, data: Dict) -> List[Dict]:
+        """Parse Yahoo Finance chart data into OHLCV bars, skipping incomplete ones"""
+        try:
+            result = data.get("chart", {}).get("result", [{}])[0]
+            timestamps = result.get("timestamp") or []
+            quote = result.get("indicators", {}).get("quote", [{}])[0]
+            
+            bars = []
+            for i, timestamp in enumerate(timestamps):
+                values = [quote.get(field, [None] * len(timestamps))[i] for field in ("open", "high", "low", "close")]
+                if any(value is None for value in values):
+                    continue
+                volumes = quote.get("volume") or []
+                bars.append({
+                    "ts": datetime.utcfromtimestamp(timestamp),
+                    "open": values[0],
+                    "high": values[1],
+                    "low": values[2],
+                    "close": values[3],
+                    "volume": volumes[i] if i < len(volumes) else None,
+                })
+            return bars
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            logger.error(f"Error parsing Yahoo bars: {str(e)}")
+            return []
+    
+    def _parse_alpha_vantage_data(self, symbol: str, quote_data: Dict) -> Optional[Dict]:
         """Parse Alpha Vantage response data"""
         try:
             return {
@@ -90,9 +331,9 @@ class MarketDataService:
             }
         except (ValueError, KeyError) as e:
             logger.error(f"Error parsing Alpha Vantage data: {str(e)}")
-            return self._get_mock_data(symbol)
+            return None
     
-    def _parse_yahoo_data(self, symbol: str, data: Dict) -> Dict:
+    def _parse_yahoo_data(self, symbol: str, data: Dict) -> Optional[Dict]:
         """Parse Yahoo Finance response data"""
         try:
             chart = data.get("chart", {})
@@ -126,7 +367,7 @@ class MarketDataService:
             }
         except (ValueError, KeyError, IndexError) as e:
             logger.error(f"Error parsing Yahoo data: {str(e)}")
-            return self._get_mock_data(symbol)
+            return None
     
     def _get_mock_data(self, symbol: str) -> Dict:
         """Return mock data when APIs fail"""
@@ -150,20 +391,58 @@ class MarketDataService:
             "last_updated": datetime.now().isoformat(),
         }
     
-    async def get_multiple_stocks_data(self, symbols: List[str]) -> Dict[str, Dict]:
-        """Get market data for multiple stocks concurrently"""
-        tasks = [self.get_stock_market_data(symbol) for symbol in symbols]
+    async def get_multiple_stocks_data(
+        self,
+        symbols: List[str],
+        max_concurrency: int = MARKET_DATA_MAX_CONCURRENCY,
+        use_mock_fallback: bool = True
+    ) -> Dict[str, Dict]:
+        """
+        Get market data for multiple stocks concurrently, at most max_concurrency at a time.
+        With use_mock_fallback, symbols without a quote get mock data, but only while every
+        provider is open-circuit; mock data is never written to the quote cache.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def fetch(symbol: str) -> Optional[Dict]:
+            async with semaphore:
+                return await self.get_stock_market_data(symbol)
+        
+        tasks = [fetch(symbol) for symbol in symbols]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
+        serve_mock = use_mock_fallback and not self._available_providers()
         market_data = {}
         for symbol, result in zip(symbols, results):
             if isinstance(result, dict) and result:
                 market_data[symbol] = result
-            else:
-                # Use mock data if API fails
-                market_data[symbol] = self._get_mock_data(symbol)
+            elif serve_mock:
+                market_data[symbol] = {**self._get_mock_data(symbol), "provider": "mock"}
                 
         return market_data
 
+    async def refresh_multiple_stocks_data(
+        self,
+        symbols: List[str],
+        max_concurrency: int = MARKET_DATA_MAX_CONCURRENCY,
+        ttl_seconds: Optional[float] = None
+    ) -> Dict[str, Dict]:
+        """Fetch fresh market data from upstream, bypassing the cache, and publish it to the quote cache"""
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def refresh(symbol: str) -> Optional[Dict]:
+            async with semaphore:
+                data = await self._fetch_stock_market_data(symbol, Priority.BACKGROUND)
+            if data:
+                quote_cache.set(f"market:{symbol.upper()}", data, ttl_seconds=ttl_seconds)
+            return data
+        
+        results = await asyncio.gather(*(refresh(symbol) for symbol in symbols), return_exceptions=True)
+        return {
+            symbol: result
+            for symbol, result in zip(symbols, results)
+            if isinstance(result, dict) and result
+        }
+
 # Global instance
 market_data_service = MarketDataService()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Float, ForeignKey, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from sqlalchemy.ext.declarative import declarative_base
@@ -44,13 +44,70 @@ class Stock(Base):
     positions = relationship("Position", back_populates="stock", cascade="all, delete-orphan")
     watchlist = relationship("Watchlist", back_populates="stock", cascade="all, delete-orphan")
     trade_history = relationship("TradeHistory", back_populates="stock", cascade="all, delete-orphan")
+    profile = relationship("StockProfile", back_populates="stock", uselist=False, cascade="all, delete-orphan")
+    # Bars are removed by the ON DELETE CASCADE rather than loaded and deleted one by one
+    price_bars = relationship("PriceBar", back_populates="stock", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<Stock(id={self.id}, symbol='{self.symbol}', name='{self.name}')>"
 
 
+class CatalogVersion(Base):
+    __tablename__ = "catalog_versions"
+    
+    # Bumped in the same transaction as every change to the named catalog, so
+    # each API worker can tell when its in-memory copy is out of date
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, default=1, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<CatalogVersion(name='{self.name}', version={self.version})>"
+
+
+class StockProfile(Base):
+    __tablename__ = "stock_profiles"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    stock_id = Column(Integer, ForeignKey("stocks.id"), unique=True, nullable=False)
+    data = Column(JSON, nullable=False)  # Company profile as returned by FinnHub
+    etag = Column(String(64), nullable=False)  # Hash of data, changes only when the content changes
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Last upstream refresh
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Last content change
+
+    # Relationships
+    stock = relationship("Stock", back_populates="profile")
+
+    def __repr__(self):
+        return f"<StockProfile(id={self.id}, stock_id={self.stock_id}, fetched_at={self.fetched_at})>"
+
+
+class PriceBar(Base):
+    __tablename__ = "price_bars"
+    
+    # Composite primary key doubles as the (stock_id, interval, ts) range-scan index
+    stock_id = Column(Integer, ForeignKey("stocks.id", ondelete="CASCADE"), primary_key=True)
+    interval = Column(String(5), primary_key=True)  # '1h', '1d' or the '1mo' rollup
+    ts = Column(DateTime, primary_key=True)  # Bar open time (UTC)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=True)
+
+    # Relationships
+    stock = relationship("Stock", back_populates="price_bars")
+
+    def __repr__(self):
+        return f"<PriceBar(stock_id={self.stock_id}, interval='{self.interval}', ts={self.ts}, close={self.close})>"
+
+
 class Position(Base):
     __tablename__ = "positions"
+    # One position per user and stock; also serves every (user_id, stock_id) lookup
+    __table_args__ = (
+        UniqueConstraint("user_id", "stock_id", name="uq_positions_user_id_stock_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -76,6 +133,10 @@ class Position(Base):
 
 class Watchlist(Base):
     __tablename__ = "watchlist"
+    # A stock appears at most once in a user's watchlist
+    __table_args__ = (
+        UniqueConstraint("user_id", "stock_id", name="uq_watchlist_user_id_stock_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -90,12 +151,6 @@ class Watchlist(Base):
     def __repr__(self):
         return f"<Watchlist(id={self.id}, user_id={self.user_id}, stock_id={self.stock_id})>"
 
-    class Config:
-        # Ensure unique combination of user_id and stock_id
-        __table_args__ = (
-            {'extend_existing': True}
-        )
-
 
 class TradeHistory(Base):
     __tablename__ = "trade_history"
@@ -110,6 +165,9 @@ class TradeHistory(Base):
     trade_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     notes = Column(String(500), nullable=True)  # Optional notes about the trade
+    # SELL only: cost of the lots the sale consumed, and total_amount minus that cost
+    cost_basis = Column(Float, nullable=True)
+    realized_pnl = Column(Float, nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="trade_history")
@@ -117,3 +175,74 @@ class TradeHistory(Base):
 
     def __repr__(self):
         return f"<TradeHistory(id={self.id}, user_id={self.user_id}, stock_id={self.stock_id}, trade_type='{self.trade_type}', quantity={self.quantity}, price={self.price_per_share})>"
+
+
+
+class TradeTotals(Base):
+    __tablename__ = "trade_totals"
+    
+    # Running totals over a user's trade_history rows, updated in the same
+    # transaction as every trade insert (see trade_aggregates.py)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    trade_count = Column(Integer, default=0, nullable=False)
+    buy_count = Column(Integer, default=0, nullable=False)
+    sell_count = Column(Integer, default=0, nullable=False)
+    buy_quantity = Column(Float, default=0, nullable=False)
+    sell_quantity = Column(Float, default=0, nullable=False)
+    buy_amount = Column(Float, default=0, nullable=False)
+    sell_amount = Column(Float, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<TradeTotals(user_id={self.user_id}, trade_count={self.trade_count})>"
+
+
+class StockTradeTotals(Base):
+    __tablename__ = "stock_trade_totals"
+    
+    # Same running totals, broken down per stock
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    stock_id = Column(Integer, ForeignKey("stocks.id", ondelete="CASCADE"), primary_key=True)
+    trade_count = Column(Integer, default=0, nullable=False)
+    buy_count = Column(Integer, default=0, nullable=False)
+    sell_count = Column(Integer, default=0, nullable=False)
+    buy_quantity = Column(Float, default=0, nullable=False)
+    sell_quantity = Column(Float, default=0, nullable=False)
+    buy_amount = Column(Float, default=0, nullable=False)
+    sell_amount = Column(Float, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    stock = relationship("Stock")
+
+    def __repr__(self):
+        return f"<StockTradeTotals(user_id={self.user_id}, stock_id={self.stock_id}, trade_count={self.trade_count})>"
+
+
+class TradeLot(Base):
+    __tablename__ = "trade_lots"
+    
+    # Shares bought by one BUY trade and not yet consumed by sells (see trade_lots.py)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    stock_id = Column(Integer, ForeignKey("stocks.id", ondelete="CASCADE"), nullable=False)
+    buy_trade_id = Column(Integer, ForeignKey("trade_history.id", ondelete="CASCADE"), nullable=False, unique=True)
+    quantity = Column(Float, nullable=False)
+    remaining_quantity = Column(Float, nullable=False)
+    price_per_share = Column(Float, nullable=False)
+    opened_at = Column(DateTime, nullable=False)
+
+    buy_trade = relationship("TradeHistory")
+
+    def __repr__(self):
+        return f"<TradeLot(id={self.id}, user_id={self.user_id}, stock_id={self.stock_id}, remaining_quantity={self.remaining_quantity})>"
+
+
+# Per-user trade history, newest first; id breaks ties for keyset pagination
+Index("ix_trade_history_user_id_trade_date_id", TradeHistory.user_id, TradeHistory.trade_date.desc(), TradeHistory.id.desc())
+
+# Open lots of a user's stock in the order sells consume them
+Index(
+    "ix_trade_lots_open",
+    TradeLot.user_id, TradeLot.stock_id, TradeLot.opened_at, TradeLot.id,
+    postgresql_where=TradeLot.remaining_quantity > 0
+)
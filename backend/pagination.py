@@ -0,0 +1,43 @@
+import base64
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+
+# Page size bounds shared by the list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(kind: str, *values: Any) -> str:
+    """Opaque cursor holding the sort key of the last row of a page"""
+    payload = json.dumps({"k": kind, "v": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], kind: str, *parsers: Callable[[Any], Any]) -> Optional[Tuple]:
+    """
+    Decode a cursor issued by encode_cursor for the same kind of list,
+    converting each value with the matching parser. Raises 400 for anything else.
+    """
+    if cursor is None:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = payload["v"]
+        if payload["k"] == kind and len(values) == len(parsers):
+            return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError, KeyError):
+        pass
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+
+def build_page(rows: Sequence, limit: int, kind: str, cursor_values: Callable[[Any], Tuple]) -> Dict[str, Any]:
+    """
+    Turn up to limit + 1 rows into a page; the extra row only signals that another page exists.
+    """
+    items: List = list(rows[:limit])
+    next_cursor = encode_cursor(kind, *cursor_values(items[-1])) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
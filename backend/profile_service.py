@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+from sqlalchemy import case, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AsyncSessionLocal
+from models import Stock, StockProfile
+from finnhub_service import finnhub_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Profiles change rarely; refresh them in the background once they are older than this
+PROFILE_TTL_HOURS = float(os.getenv("PROFILE_TTL_HOURS", "168"))
+
+# Symbols with a background refresh already running
+_refreshing: Set[str] = set()
+
+# FinnHub profile calls in flight, shared by concurrent cold misses for the same symbol
+_inflight: Dict[str, "asyncio.Task[dict]"] = {}
+
+
+def compute_etag(data: dict) -> str:
+    """Stable hash of the profile content"""
+    return hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _forget_fetch(symbol: str, task: "asyncio.Task[dict]") -> None:
+    _inflight.pop(symbol, None)
+    # Retrieve the exception even if every caller was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+async def fetch_profile_data(symbol: str) -> dict:
+    """Call FinnHub for a profile once for all concurrent callers of the same symbol"""
+    task = _inflight.get(symbol)
+    if task is None:
+        task = asyncio.ensure_future(finnhub_service.company_profile2(symbol))
+        _inflight[symbol] = task
+        task.add_done_callback(lambda done: _forget_fetch(symbol, done))
+    # shield() so one cancelled caller does not cancel the shared call
+    return await asyncio.shield(task)
+
+
+def is_profile_stale(profile: StockProfile) -> bool:
+    """Whether a stored profile is due for a background refresh"""
+    return datetime.utcnow() - profile.fetched_at > timedelta(hours=PROFILE_TTL_HOURS)
+
+
+async def fetch_and_store_profile(db: AsyncSession, stock: Stock) -> Optional[StockProfile]:
+    """Fetch a profile from FinnHub and upsert it; returns None when FinnHub has no data"""
+    data = await fetch_profile_data(stock.symbol)
+    if not data:
+        return None
+
+    now = datetime.utcnow()
+    statement = insert(StockProfile).values(
+        stock_id=stock.id, data=data, etag=compute_etag(data), fetched_at=now, updated_at=now
+    )
+    # Another request or worker may have stored the profile meanwhile; update it rather
+    # than fail on the unique stock_id, moving updated_at only when the content changed
+    statement = statement.on_conflict_do_update(
+        index_elements=[StockProfile.stock_id],
+        set_={
+            "data": statement.excluded.data,
+            "etag": statement.excluded.etag,
+            "fetched_at": statement.excluded.fetched_at,
+            "updated_at": case(
+                (StockProfile.etag == statement.excluded.etag, StockProfile.updated_at),
+                else_=statement.excluded.updated_at
+            ),
+        }
+    ).returning(StockProfile)
+    profile = await db.scalar(statement, execution_options={"populate_existing": True})
+    await db.commit()
+    return profile
+
+
+async def refresh_profile(stock_id: int, symbol: str) -> None:
+    """Background task that refreshes a stale profile with its own session"""
+    if symbol in _refreshing:
+        return
+    _refreshing.add(symbol)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            stock = await db.scalar(select(Stock).where(Stock.id == stock_id))
+            if stock is not None:
+                await fetch_and_store_profile(db, stock)
+    except Exception as e:
+        logger.error(f"Background profile refresh failed for {symbol}: {str(e)}")
+    finally:
+        _refreshing.discard(symbol)
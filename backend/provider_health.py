@@ -0,0 +1,125 @@
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+# Circuit breaker configuration
+PROVIDER_FAILURE_THRESHOLD = int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "5"))
+PROVIDER_RESET_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_RESET_TIMEOUT_SECONDS", "30"))
+PROVIDER_LATENCY_SAMPLES = int(os.getenv("PROVIDER_LATENCY_SAMPLES", "200"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+    Opens after failure_threshold consecutive failures, then lets a single trial
+    request through once reset_timeout_seconds have passed.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = PROVIDER_FAILURE_THRESHOLD,
+        reset_timeout_seconds: float = PROVIDER_RESET_TIMEOUT_SECONDS
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    def is_open(self) -> bool:
+        """Whether requests would currently be refused"""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            return False
+        return self.state == OPEN or (self.state == HALF_OPEN and self._trial_in_flight)
+
+    def allow_request(self) -> bool:
+        """Claim permission to call the provider"""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            self.state = HALF_OPEN
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a claimed request that neither succeeded nor failed (e.g. it was cancelled)"""
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class LatencyTracker:
+    """Sliding window of successful request latencies"""
+
+    def __init__(self, max_samples: int = PROVIDER_LATENCY_SAMPLES):
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the pct-th percentile latency in seconds, or None without samples"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def stats(self) -> Dict:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "samples": len(self._samples),
+            "p50_seconds": round(p50, 4) if p50 is not None else None,
+            "p95_seconds": round(p95, 4) if p95 is not None else None,
+        }
+
+
+class ProviderHealth:
+    """Circuit breaker, latency window and outcome counters for one provider"""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.served = 0
+        self.failures = 0
+
+    def stats(self) -> Dict:
+        return {
+            **self.breaker.stats(),
+            **self.latency.stats(),
+            "served": self.served,
+            "failures": self.failures,
+        }
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Quote cache configuration
+QUOTE_CACHE_TTL_SECONDS = float(os.getenv("QUOTE_CACHE_TTL_SECONDS", "15"))
+QUOTE_CACHE_MAX_ENTRIES = int(os.getenv("QUOTE_CACHE_MAX_ENTRIES", "5000"))
+
+
+class QuoteCache:
+    """Process-wide TTL cache for quotes with single-flight coalescing of misses"""
+
+    def __init__(self, ttl_seconds: float = QUOTE_CACHE_TTL_SECONDS, max_entries: int = QUOTE_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # key -> (expires_at, value), kept in LRU order
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # key -> future shared by every caller waiting on the same upstream fetch
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Callbacks notified with (key, value) whenever a fresh value is stored
+        self._listeners: List[Callable[[str, Any], None]] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh cached value or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries past the bound"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+        for listener in self._listeners:
+            try:
+                listener(key, value)
+            except Exception as e:
+                logger.error(f"Quote cache listener failed for {key}: {str(e)}")
+
+    def add_listener(self, listener: Callable[[str, Any], None]) -> None:
+        """Register a callback for every value stored in the cache"""
+        self._listeners.append(listener)
+
+    def invalidate(self, key: str) -> None:
+        """Drop a cached value"""
+        self._entries.pop(key, None)
+
+    async def get_or_fetch(self, key: str, fetcher: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, or fetch it once for all concurrent callers"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            # shield() so one cancelled waiter does not cancel the shared fetch
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetcher()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            # Empty results are shared with waiters but never cached
+            if value:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+        }
+
+# Global instance
+quote_cache = QuoteCache()
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Set
+from sqlalchemy import or_, select
+from database import SessionLocal
+from models import Stock, Position, Watchlist
+from market_data_service import market_data_service
+from quote_stream import quote_broadcaster
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Quote poller configuration
+QUOTE_POLLER_ENABLED = os.getenv("QUOTE_POLLER_ENABLED", "true").lower() == "true"
+QUOTE_POLLER_INTERVAL_SECONDS = float(os.getenv("QUOTE_POLLER_INTERVAL_SECONDS", "30"))
+QUOTE_POLLER_BATCH_SIZE = int(os.getenv("QUOTE_POLLER_BATCH_SIZE", "25"))
+QUOTE_POLLER_CONCURRENCY = int(os.getenv("QUOTE_POLLER_CONCURRENCY", "4"))
+
+
+def get_referenced_symbols() -> List[str]:
+    """Return the distinct symbols held in any position or watched in any watchlist"""
+    db = SessionLocal()
+    try:
+        rows = db.query(Stock.symbol).filter(
+            or_(
+                Stock.id.in_(select(Watchlist.stock_id)),
+                Stock.id.in_(select(Position.stock_id))
+            )
+        ).all()
+        return sorted(row.symbol for row in rows)
+    finally:
+        db.close()
+
+
+class QuotePoller:
+    """Background task that keeps the quote cache warm for every watched or held symbol"""
+
+    def __init__(
+        self,
+        interval_seconds: float = QUOTE_POLLER_INTERVAL_SECONDS,
+        batch_size: int = QUOTE_POLLER_BATCH_SIZE,
+        concurrency: int = QUOTE_POLLER_CONCURRENCY
+    ):
+        self.interval_seconds = interval_seconds
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self._task: Optional[asyncio.Task] = None
+
+        self.tracked_symbols: Set[str] = set()
+        self.cycles = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.last_cycle_seconds = 0.0
+        self.last_cycle_at: Optional[float] = None
+
+    @property
+    def ttl_seconds(self) -> float:
+        """Lifetime of published quotes; symbols that stop being polled age out after this"""
+        return self.interval_seconds * 3
+
+    def start(self) -> None:
+        """Start the polling loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the polling loop and wait for it to finish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Poll forever, sleeping for the configured interval between cycles"""
+        while True:
+            try:
+                await self.refresh_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Quote poller cycle failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def refresh_once(self) -> Dict[str, Dict]:
+        """Refresh every referenced or streamed symbol in batches and publish the results to the quote cache"""
+        started = time.monotonic()
+        # The symbol query uses the synchronous engine, so keep it off the event loop
+        referenced = await asyncio.to_thread(get_referenced_symbols)
+        symbols = sorted(set(referenced) | quote_broadcaster.active_symbols())
+
+        dropped = self.tracked_symbols - set(symbols)
+        if dropped:
+            logger.info(f"Quote poller no longer tracking: {', '.join(sorted(dropped))}")
+        self.tracked_symbols = set(symbols)
+
+        refreshed: Dict[str, Dict] = {}
+        for i in range(0, len(symbols), self.batch_size):
+            batch = symbols[i:i + self.batch_size]
+            results = await market_data_service.refresh_multiple_stocks_data(
+                batch,
+                max_concurrency=self.concurrency,
+                ttl_seconds=self.ttl_seconds
+            )
+            refreshed.update(results)
+            self.failed += len(batch) - len(results)
+
+        self.refreshed += len(refreshed)
+        self.cycles += 1
+        self.last_cycle_seconds = round(time.monotonic() - started, 4)
+        self.last_cycle_at = time.time()
+        return refreshed
+
+    def stats(self) -> Dict:
+        """Return poller counters"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "tracked_symbols": len(self.tracked_symbols),
+            "cycles": self.cycles,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "last_cycle_seconds": self.last_cycle_seconds,
+            "last_cycle_at": self.last_cycle_at,
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+        }
+
+# Global instance
+quote_poller = QuotePoller()
@@ -0,0 +1,135 @@
+import asyncio
+import os
+from typing import Any, Dict, Iterable, Set
+from quote_cache import quote_cache
+from market_data_service import build_quote_fields
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Streaming configuration
+STREAM_MAX_SYMBOLS_PER_CLIENT = int(os.getenv("STREAM_MAX_SYMBOLS_PER_CLIENT", "50"))
+STREAM_SEND_TIMEOUT_SECONDS = float(os.getenv("STREAM_SEND_TIMEOUT_SECONDS", "5"))
+
+MARKET_KEY_PREFIX = "market:"
+
+
+class QuoteSubscriber:
+    """
+    Pending updates for one streaming client.
+    Updates are conflated per symbol, so a slow consumer holds at most one
+    pending delta per subscribed symbol instead of an ever-growing backlog.
+    """
+
+    def __init__(self):
+        self.symbols: Set[str] = set()
+        self._pending: Dict[str, Dict] = {}
+        self._ready = asyncio.Event()
+        self.conflated = 0
+
+    def push(self, symbol: str, fields: Dict) -> None:
+        """Queue a delta, merging it into any delta not yet sent for the symbol"""
+        pending = self._pending.get(symbol)
+        if pending is None:
+            self._pending[symbol] = dict(fields)
+        else:
+            pending.update(fields)
+            self.conflated += 1
+        self._ready.set()
+
+    async def next_batch(self) -> Dict[str, Dict]:
+        """Wait for pending deltas and take all of them"""
+        await self._ready.wait()
+        self._ready.clear()
+        batch, self._pending = self._pending, {}
+        return batch
+
+
+class QuoteBroadcaster:
+    """Fans each upstream quote update out to every subscriber of the symbol as a delta"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[QuoteSubscriber]] = {}
+        # Last fields sent for each subscribed symbol, used to compute deltas
+        self._last: Dict[str, Dict] = {}
+
+        self.connections = 0
+        self.published = 0
+        self.deliveries = 0
+        self.slow_disconnects = 0
+
+    def on_quote_cached(self, key: str, value: Any) -> None:
+        """Quote cache listener that publishes fresh market data"""
+        if key.startswith(MARKET_KEY_PREFIX) and value:
+            self.publish(key[len(MARKET_KEY_PREFIX):], build_quote_fields(value))
+
+    def publish(self, symbol: str, fields: Dict) -> None:
+        """Send the fields that changed since the last update to every subscriber"""
+        subscribers = self._subscribers.get(symbol)
+        if not subscribers:
+            return
+
+        last = self._last.get(symbol, {})
+        delta = {field: value for field, value in fields.items() if last.get(field) != value}
+        if not delta:
+            return
+
+        self._last[symbol] = {**last, **delta}
+        self.published += 1
+        for subscriber in subscribers:
+            subscriber.push(symbol, delta)
+            self.deliveries += 1
+
+    def register(self, subscriber: QuoteSubscriber) -> None:
+        """Track a newly connected client"""
+        self.connections += 1
+
+    def subscribe(self, subscriber: QuoteSubscriber, symbols: Iterable[str]) -> None:
+        """Subscribe a client to symbols and queue a snapshot of what is already known"""
+        for symbol in symbols:
+            if symbol in subscriber.symbols:
+                continue
+            subscriber.symbols.add(symbol)
+            self._subscribers.setdefault(symbol, set()).add(subscriber)
+
+            if symbol not in self._last:
+                cached = quote_cache.get(f"{MARKET_KEY_PREFIX}{symbol}")
+                if cached:
+                    self._last[symbol] = build_quote_fields(cached)
+            if symbol in self._last:
+                subscriber.push(symbol, self._last[symbol])
+
+    def unsubscribe(self, subscriber: QuoteSubscriber, symbols: Iterable[str]) -> None:
+        """Unsubscribe a client from symbols, forgetting symbols nobody follows any more"""
+        for symbol in symbols:
+            subscriber.symbols.discard(symbol)
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[symbol]
+                self._last.pop(symbol, None)
+
+    def remove(self, subscriber: QuoteSubscriber) -> None:
+        """Drop a disconnected client"""
+        self.unsubscribe(subscriber, list(subscriber.symbols))
+        self.connections -= 1
+
+    def active_symbols(self) -> Set[str]:
+        """Return every symbol with at least one subscriber"""
+        return set(self._subscribers)
+
+    def stats(self) -> Dict:
+        """Return streaming counters"""
+        return {
+            "connections": self.connections,
+            "active_symbols": len(self._subscribers),
+            "published": self.published,
+            "deliveries": self.deliveries,
+            "slow_disconnects": self.slow_disconnects,
+        }
+
+# Global instance
+quote_broadcaster = QuoteBroadcaster()
+quote_cache.add_listener(quote_broadcaster.on_quote_cached)
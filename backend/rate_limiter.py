@@ -0,0 +1,173 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+# Upstream providers
+FINNHUB = "finnhub"
+ALPHA_VANTAGE = "alpha_vantage"
+YAHOO = "yahoo"
+
+# Scheduler configuration; per-minute quotas can be overridden per provider
+RATE_LIMIT_MAX_QUEUE = int(os.getenv("RATE_LIMIT_MAX_QUEUE", "100"))
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "5"))
+DEFAULT_REQUESTS_PER_MINUTE = {
+    FINNHUB: 60,
+    ALPHA_VANTAGE: 5,
+    YAHOO: 100,
+}
+# Alpha Vantage refills one token every 12s, so a queued call would always exceed
+# RATE_LIMIT_MAX_WAIT_SECONDS; it never queues and a missing token falls through to Yahoo
+DEFAULT_MAX_WAIT_SECONDS = {
+    ALPHA_VANTAGE: 0.0,
+}
+
+
+class Priority(IntEnum):
+    """Upstream request classes; lower values are served first"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+    PROFILE = 2
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be scheduled within the provider quota"""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {provider}, retry after {retry_after:.1f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class TokenBucketScheduler:
+    """
+    Token bucket for one upstream provider.
+    Requests take a token immediately when one is free; otherwise they wait in a
+    priority queue, or are rejected at once if the queue is full or the expected
+    wait exceeds max_wait_seconds.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: float,
+        burst: float,
+        max_queue: int = RATE_LIMIT_MAX_QUEUE,
+        max_wait_seconds: float = RATE_LIMIT_MAX_WAIT_SECONDS
+    ):
+        self.provider = provider
+        self.rate_per_second = requests_per_minute / 60.0
+        self.capacity = max(1.0, burst)
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+
+        self.tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self.granted = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seen_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    def _reject(self, retry_after: float) -> None:
+        self.rejected += 1
+        raise RateLimitExceeded(self.provider, retry_after)
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Wait for a token, or raise RateLimitExceeded if none can be granted in time"""
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            self.granted += 1
+            return
+
+        # Requests of equal or higher priority already queued will be served first
+        ahead = sum(1 for waiter_priority, _, future in self._waiters
+                    if waiter_priority <= priority and not future.done())
+        expected_wait = max(0.0, (ahead + 1 - self.tokens) / self.rate_per_second)
+        if len(self._waiters) >= self.max_queue or expected_wait > self.max_wait_seconds:
+            self._reject(expected_wait)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        started = time.monotonic()
+        await future
+        waited = time.monotonic() - started
+        self.total_wait_seconds += waited
+        self.max_wait_seen_seconds = max(self.max_wait_seen_seconds, waited)
+
+    async def _dispatch(self) -> None:
+        """Hand out tokens to queued requests in priority order as the bucket refills"""
+        while self._waiters:
+            self._refill()
+            if self.tokens >= 1:
+                _, _, future = heapq.heappop(self._waiters)
+                if future.done():
+                    # The waiter was cancelled; keep the token
+                    continue
+                self.tokens -= 1
+                self.granted += 1
+                future.set_result(None)
+            else:
+                await asyncio.sleep((1 - self.tokens) / self.rate_per_second)
+
+    def stats(self) -> Dict:
+        """Return queue depth, wait time and remaining tokens"""
+        self._refill()
+        depth_by_priority = {priority.name.lower(): 0 for priority in Priority}
+        for waiter_priority, _, future in self._waiters:
+            if not future.done():
+                depth_by_priority[Priority(waiter_priority).name.lower()] += 1
+        return {
+            "tokens_remaining": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "requests_per_minute": round(self.rate_per_second * 60, 2),
+            "queue_depth": sum(depth_by_priority.values()),
+            "queue_depth_by_priority": depth_by_priority,
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.granted, 4) if self.granted else 0.0,
+            "max_wait_seconds": round(self.max_wait_seen_seconds, 4),
+        }
+
+
+def _build_scheduler(provider: str) -> TokenBucketScheduler:
+    requests_per_minute = float(os.getenv(
+        f"RATE_LIMIT_{provider.upper()}_PER_MINUTE",
+        DEFAULT_REQUESTS_PER_MINUTE[provider]
+    ))
+    max_wait_seconds = float(os.getenv(
+        f"RATE_LIMIT_{provider.upper()}_MAX_WAIT_SECONDS",
+        DEFAULT_MAX_WAIT_SECONDS.get(provider, RATE_LIMIT_MAX_WAIT_SECONDS)
+    ))
+    # Allow bursts of up to ten seconds' worth of quota
+    return TokenBucketScheduler(
+        provider,
+        requests_per_minute,
+        burst=requests_per_minute / 6,
+        max_wait_seconds=max_wait_seconds
+    )
+
+# Global instances
+rate_limiters: Dict[str, TokenBucketScheduler] = {
+    provider: _build_scheduler(provider) for provider in DEFAULT_REQUESTS_PER_MINUTE
+}
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict]:
+    """Return scheduler metrics for every provider"""
+    return {provider: scheduler.stats() for provider, scheduler in rate_limiters.items()}
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Trade lots rebuild script
+Recomputes the FIFO lots and every sale's cost basis and realized P&L from
+trade_history. The API keeps them current on every trade; run this after the
+trade_lots migration to backfill them, or to repair drift (e.g. after editing
+trade_history by hand).
+
+Usage:
+    python rebuild_trade_lots.py              # every user
+    python rebuild_trade_lots.py --user-id 7  # one user
+"""
+
+import argparse
+import sys
+import time
+from sqlalchemy import text
+from database import SessionLocal, test_connection
+from trade_lots import rebuild_lots
+
+def rebuild(user_id=None):
+    """Recompute the lots in one transaction"""
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        # Block new trades while recomputing so no sale is matched against stale lots;
+        # reads of trade_history are not blocked
+        db.execute(text("LOCK TABLE trade_history IN SHARE MODE"))
+        counts = rebuild_lots(db, user_id)
+        db.commit()
+
+        print(f"✅ Rebuilt {counts['lots']} lot(s) and {counts['sells']} sale(s) from {counts['trades']} trade(s) in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error rebuilding trade lots: {e}")
+        raise
+    finally:
+        db.close()
+
+def main():
+    """Main rebuild function"""
+    parser = argparse.ArgumentParser(description="Recompute FIFO lots and realized P&L from trade_history")
+    parser.add_argument("--user-id", type=int, help="Only rebuild this user's lots")
+    args = parser.parse_args()
+
+    print("🧮 Rebuilding trade lots")
+    print("=" * 50)
+
+    if not test_connection():
+        print("❌ Database connection failed. Please check your configuration.")
+        sys.exit(1)
+
+    rebuild(args.user_id)
+
+if __name__ == "__main__":
+    main()
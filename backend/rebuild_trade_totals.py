@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Trade totals rebuild script
+Recomputes the per-user and per-user-per-stock trade totals from trade_history.
+The API keeps them current on every trade; run this to backfill them or to
+repair drift (e.g. after editing trade_history by hand).
+
+Usage:
+    python rebuild_trade_totals.py              # every user
+    python rebuild_trade_totals.py --user-id 7  # one user
+"""
+
+import argparse
+import sys
+from sqlalchemy import text
+from database import SessionLocal, test_connection
+from models import TradeTotals
+from trade_aggregates import rebuild_statements
+
+def rebuild(user_id=None):
+    """Recompute the totals in one transaction"""
+    db = SessionLocal()
+    try:
+        # Block new trades while recomputing so none is counted twice or missed;
+        # reads of trade_history and the totals are not blocked
+        db.execute(text("LOCK TABLE trade_history IN SHARE MODE"))
+        for statement in rebuild_statements(user_id):
+            db.execute(statement)
+        db.commit()
+
+        users = db.query(TradeTotals).count() if user_id is None else db.query(TradeTotals).filter(TradeTotals.user_id == user_id).count()
+        print(f"✅ Rebuilt trade totals for {users} user(s)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error rebuilding trade totals: {e}")
+        raise
+    finally:
+        db.close()
+
+def main():
+    """Main rebuild function"""
+    parser = argparse.ArgumentParser(description="Recompute trade totals from trade_history")
+    parser.add_argument("--user-id", type=int, help="Only rebuild this user's totals")
+    args = parser.parse_args()
+
+    print("🧮 Rebuilding trade totals")
+    print("=" * 50)
+
+    if not test_connection():
+        print("❌ Database connection failed. Please check your configuration.")
+        sys.exit(1)
+
+    rebuild(args.user_id)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from database import AsyncSessionLocal, get_async_database_url
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Read replica configuration
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2"))
+REPLICA_LAG_CHECK_INTERVAL_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL_SECONDS", "5"))
+# After a write, the same client reads from the primary for this long
+REPLICA_READ_YOUR_WRITES_SECONDS = float(os.getenv("REPLICA_READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_SSL = os.getenv("REPLICA_SSL", "require")
+
+# Replay lag in seconds; 0 for a server that is not in recovery (e.g. a local stand-in)
+# or a replica that has replayed everything it received
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class Replica:
+    """One read replica with its engine and last observed health"""
+
+    def __init__(self, url: str):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine: AsyncEngine = create_async_engine(
+            get_async_database_url(url),
+            pool_size=10,
+            max_overflow=20,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            connect_args={"ssl": REPLICA_SSL}
+        )
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False, autoflush=False)
+        self.lag_seconds: Optional[float] = None
+        self.healthy = False
+        self.last_error: Optional[str] = None
+        self.served = 0
+
+    def is_eligible(self) -> bool:
+        return self.healthy and self.lag_seconds is not None and self.lag_seconds <= REPLICA_MAX_LAG_SECONDS
+
+    def stats(self) -> Dict:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag_seconds, 3) if self.lag_seconds is not None else None,
+            "eligible": self.is_eligible(),
+            "served": self.served,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaRouter:
+    """
+    Routes read-only sessions to replicas round-robin.
+    Replicas that are unreachable or lag more than REPLICA_MAX_LAG_SECONDS are skipped,
+    and clients that just wrote keep reading from the primary for a short window.
+    """
+
+    def __init__(self, replica_urls: List[str] = DATABASE_REPLICA_URLS):
+        self.replicas = [Replica(url) for url in replica_urls]
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+        # Hash of the client's Authorization header -> monotonic time until which reads stay on the primary
+        self._recent_writers: Dict[str, float] = {}
+
+        self.primary_fallbacks = 0
+        self.sticky_primary_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def start(self) -> None:
+        """Start the background lag checker"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the lag checker and close replica connections"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(REPLICA_LAG_CHECK_INTERVAL_SECONDS)
+
+    async def check_replicas(self) -> None:
+        """Refresh the health and replay lag of every replica"""
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as connection:
+                lag = await asyncio.wait_for(
+                    connection.scalar(LAG_QUERY),
+                    timeout=REPLICA_LAG_CHECK_INTERVAL_SECONDS
+                )
+            replica.lag_seconds = float(lag or 0)
+            replica.healthy = True
+            replica.last_error = None
+        except Exception as e:
+            if replica.healthy:
+                logger.warning(f"Read replica {replica.name} unavailable: {str(e)}")
+            replica.healthy = False
+            replica.last_error = str(e)
+
+    @staticmethod
+    def _client_key(authorization: Optional[str]) -> Optional[str]:
+        if not authorization:
+            return None
+        return hashlib.sha256(authorization.encode()).hexdigest()
+
+    def record_write(self, authorization: Optional[str]) -> None:
+        """Pin this client's reads to the primary for the read-your-writes window"""
+        key = self._client_key(authorization)
+        if key is None or not self.enabled:
+            return
+        now = time.monotonic()
+        self._recent_writers[key] = now + REPLICA_READ_YOUR_WRITES_SECONDS
+        if len(self._recent_writers) > 10_000:
+            self._recent_writers = {k: until for k, until in self._recent_writers.items() if until > now}
+
+    def _wrote_recently(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        until = self._recent_writers.get(key)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._recent_writers[key]
+            return False
+        return True
+
+    def session_factory(self, authorization: Optional[str] = None) -> async_sessionmaker:
+        """Pick where a read-only session should go"""
+        if not self.enabled:
+            return AsyncSessionLocal
+        if self._wrote_recently(self._client_key(authorization)):
+            self.sticky_primary_reads += 1
+            return AsyncSessionLocal
+
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if replica.is_eligible():
+                replica.served += 1
+                return replica.session_factory
+
+        self.primary_fallbacks += 1
+        return AsyncSessionLocal
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "max_lag_seconds": REPLICA_MAX_LAG_SECONDS,
+            "primary_fallbacks": self.primary_fallbacks,
+            "sticky_primary_reads": self.sticky_primary_reads,
+            "replicas": {replica.name: replica.stats() for replica in self.replicas},
+        }
+
+
+async def get_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Get a read-only database session dependency, served by a replica when one is usable."""
+    session_factory = replica_router.session_factory(request.headers.get("authorization"))
+    async with session_factory() as db:
+        yield db
+
+
+# Global instance
+replica_router = ReplicaRouter()
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from database import get_db
 from schemas import UserCreate, UserLogin, UserResponse, Token, MessageResponse, ErrorResponse
-from auth import authenticate_user, get_current_user, create_user_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth import authenticate_user, get_current_user, get_current_read_user, create_user_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from user_service import UserService
 from pydantic import ValidationError
 
@@ -12,10 +12,10 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 security = HTTPBearer()
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user account."""
     try:
-        user = UserService.create_user(db, user_data)
+        user = await UserService.create_user(db, user_data)
         return user
     except ValueError as e:
         raise HTTPException(
@@ -35,10 +35,10 @@ async def signup_user(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
 @router.post("/login", response_model=Token)
-async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """Authenticate user and return access token."""
     try:
-        user = authenticate_user(db, user_credentials.email, user_credentials.password)
+        user = await authenticate_user(db, user_credentials.email, user_credentials.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,7 +47,7 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
             )
         
         # Update last login
-        UserService.update_last_login(db, user.id)
+        await UserService.update_last_login(db, user.id)
         
         # Create access token
         token_data = create_user_token(user)
@@ -65,7 +65,7 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
         )
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user = Depends(get_current_user)):
+async def get_current_user_info(current_user = Depends(get_current_read_user)):
     """Get current authenticated user information."""
     return current_user
 
@@ -85,11 +85,11 @@ async def verify_token(current_user = Depends(get_current_user)):
     return current_user
 
 @router.post("/refresh-token", response_model=Token)
-async def refresh_token(current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+async def refresh_token(current_user = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Refresh the access token for the current user."""
     try:
         # Update last login
-        UserService.update_last_login(db, current_user.id)
+        await UserService.update_last_login(db, current_user.id)
         
         # Create new access token
         token_data = create_user_token(current_user)
@@ -106,18 +106,18 @@ async def refresh_token(current_user = Depends(get_current_user), db: Session =
 
 # Additional user management endpoints (optional)
 @router.get("/users/me/profile", response_model=UserResponse)
-async def get_user_profile(current_user = Depends(get_current_user)):
+async def get_user_profile(current_user = Depends(get_current_read_user)):
     """Get detailed user profile information."""
     return current_user
 
 @router.post("/users/me/deactivate", response_model=MessageResponse)
 async def deactivate_own_account(
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Allow user to deactivate their own account."""
     try:
-        success = UserService.deactivate_user(db, current_user.id)
+        success = await UserService.deactivate_user(db, current_user.id)
         if success:
             return MessageResponse(
                 message="Account deactivated successfully",
@@ -1,64 +1,114 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import Optional
+from datetime import datetime
 from database import get_db
-from models import Position, Stock, User, TradeHistory
-from schemas import PositionCreate, PositionResponse, PositionUpdate, MessageResponse, PortfolioSummary, SellResponse
-from auth import get_current_user
+from models import Position, User, TradeHistory
+from schemas import PositionCreate, PositionResponse, PositionUpdate, MessageResponse, PortfolioSummary, SellResponse, Page, BatchOrderRequest, BatchOrderResponse, OrderLegResult
+from replica_router import get_read_db
+from pagination import build_page, decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from stock_catalog import stock_catalog
+from quote_cache import quote_cache
+from trade_aggregates import record_trades
+from trade_lots import record_lots
+from auth import get_current_user, get_current_read_user
 
 router = APIRouter(prefix="/positions", tags=["positions"])
 
-@router.get("/", response_model=List[PositionResponse])
+async def get_positions_page(db: AsyncSession, user_id: int, cursor: Optional[str], limit: int) -> dict:
+    """One keyset page of a user's positions, ordered by id"""
+    query = select(Position).options(joinedload(Position.stock)).where(Position.user_id == user_id)
+    after = decode_cursor(cursor, "positions", int)
+    if after is not None:
+        query = query.where(Position.id > after[0])
+    positions = (await db.scalars(query.order_by(Position.id).limit(limit + 1))).all()
+    return build_page(positions, limit, "positions", lambda position: (position.id,))
+
+@router.get("/", response_model=Page[PositionResponse])
 async def get_user_positions(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of positions to return"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
-    """Get all positions for the current user"""
-    positions = db.query(Position).filter(Position.user_id == current_user.id).all()
-    return positions
+    """Get the current user's positions"""
+    return await get_positions_page(db, current_user.id, cursor, limit)
 
-@router.get("/user/{user_id}", response_model=List[PositionResponse])
+@router.get("/user/{user_id}", response_model=Page[PositionResponse])
 async def get_positions_by_user_id(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of positions to return"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """Get all positions for a specific user (admin functionality or for viewing other users)"""
     # For now, allow any authenticated user to view any user's positions
     # In production, you might want to add admin checks here
-    positions = db.query(Position).filter(Position.user_id == user_id).all()
-    return positions
+    return await get_positions_page(db, user_id, cursor, limit)
 
 @router.get("/portfolio", response_model=PortfolioSummary)
 async def get_portfolio_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
-    """Get portfolio summary for the current user"""
-    positions = db.query(Position).filter(Position.user_id == current_user.id).all()
-    
-    total_value = sum(position.total_value for position in positions)
-    total_positions = len(positions)
-    total_stocks = len(set(position.stock_id for position in positions))
-    
+    """
+    Get portfolio summary for the current user.
+    Holdings are aggregated per stock in SQL and marked to market from the quote cache, never upstream.
+    """
+    holdings = (await db.execute(
+        select(
+            Position.stock_id,
+            func.count(),
+            func.sum(Position.quantity),
+            func.sum(Position.quantity * Position.purchase_price),
+        ).where(Position.user_id == current_user.id).group_by(Position.stock_id)
+    )).all()
+
+    total_positions = 0
+    cost_basis = market_value = day_change = 0.0
+    quoted_stocks = 0
+    for stock_id, position_count, quantity, cost in holdings:
+        total_positions += position_count
+        cost_basis += cost
+        stock = stock_catalog.get_by_id(stock_id)
+        quote = quote_cache.get(f"market:{stock.symbol}") if stock else None
+        if quote is None:
+            # No fresh quote: value at cost so the stock adds nothing to P&L
+            market_value += cost
+            continue
+        quoted_stocks += 1
+        market_value += quantity * quote["current_price"]
+        day_change += quantity * quote.get("change", 0)
+
+    unrealized_pnl = market_value - cost_basis
+    previous_value = market_value - day_change
     return PortfolioSummary(
-        total_value=total_value,
+        total_value=market_value,
+        cost_basis=cost_basis,
+        unrealized_pnl=unrealized_pnl,
+        unrealized_pnl_percent=unrealized_pnl / cost_basis * 100 if cost_basis else 0.0,
+        day_change=day_change,
+        day_change_percent=day_change / previous_value * 100 if previous_value else 0.0,
         total_positions=total_positions,
-        total_stocks=total_stocks,
-        positions=positions
+        total_stocks=len(holdings),
+        quoted_stocks=quoted_stocks
     )
 
 @router.get("/{position_id}", response_model=PositionResponse)
 async def get_position(
     position_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """Get a specific position"""
-    position = db.query(Position).filter(
+    position = await db.scalar(select(Position).options(joinedload(Position.stock)).where(
         Position.id == position_id,
         Position.user_id == current_user.id
-    ).first()
+    ))
     
     if not position:
         raise HTTPException(
@@ -73,12 +123,12 @@ async def get_position(
 @router.post("/", response_model=PositionResponse)
 async def create_position(
     position_data: PositionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new position"""
     # Verify stock exists
-    stock = db.query(Stock).filter(Stock.id == position_data.stock_id).first()
+    stock = stock_catalog.get_by_id(position_data.stock_id)
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -86,10 +136,10 @@ async def create_position(
         )
     
     # Check if user already has a position in this stock
-    existing_position = db.query(Position).filter(
+    existing_position = await db.scalar(select(Position).where(
         Position.user_id == current_user.id,
         Position.stock_id == position_data.stock_id
-    ).first()
+    ))
     
     if existing_position:
         # Update existing position (average cost)
@@ -112,9 +162,11 @@ async def create_position(
             notes=f"Additional purchase of {stock.symbol} (averaged with existing position)"
         )
         db.add(trade_record)
+        await record_lots(db, [trade_record])
+        await record_trades(db, [trade_record])
         
-        db.commit()
-        db.refresh(existing_position)
+        await db.commit()
+        await db.refresh(existing_position, attribute_names=["stock"])
         return existing_position
     else:
         # Create new position
@@ -135,23 +187,153 @@ async def create_position(
             notes=f"Initial purchase of {stock.symbol}"
         )
         db.add(trade_record)
+        await record_lots(db, [trade_record])
+        await record_trades(db, [trade_record])
         
-        db.commit()
-        db.refresh(position)
+        await db.commit()
+        await db.refresh(position, attribute_names=["stock"])
         return position
 
+@router.post("/batch", response_model=BatchOrderResponse)
+async def execute_batch_order(
+    order: BatchOrderRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply several buys and sells in one transaction, in order.
+    Every leg is checked before anything is written; if any leg fails, none is applied.
+    """
+    # Lock the user's positions in every stock the order touches, in one query
+    positions = {
+        position.stock_id: position
+        for position in (await db.scalars(
+            select(Position).where(
+                Position.user_id == current_user.id,
+                Position.stock_id.in_({leg.stock_id for leg in order.legs})
+            ).order_by(Position.stock_id).with_for_update()
+        )).all()
+    }
+
+    errors = []
+    legs = []
+    # One timestamp for the whole order; trade ids keep the legs in order
+    trade_date = datetime.utcnow()
+    for index, leg in enumerate(order.legs):
+        stock = stock_catalog.get_by_id(leg.stock_id)
+        if not stock:
+            errors.append(f"Leg {index}: Stock not found")
+            continue
+
+        price = leg.price
+        if price is None:
+            quote = quote_cache.get(f"market:{stock.symbol}")
+            price = quote["current_price"] if quote else None
+
+        # Legs are applied to the positions in memory, so later legs see earlier ones
+        position = positions.get(leg.stock_id)
+        if leg.side == "BUY":
+            if price is None:
+                errors.append(f"Leg {index}: No price given and no cached quote for {stock.symbol}")
+                continue
+            if position is None:
+                position = Position(user_id=current_user.id, stock_id=leg.stock_id, quantity=0.0, purchase_price=price)
+                db.add(position)
+                positions[leg.stock_id] = position
+            total_shares = position.quantity + leg.quantity
+            position.purchase_price = (position.quantity * position.purchase_price + leg.quantity * price) / total_shares
+            position.quantity = total_shares
+            notes = f"Purchase of {stock.symbol} (batch order)"
+        else:
+            if position is None or position.quantity == 0:
+                errors.append(f"Leg {index}: Position not found")
+                continue
+            if leg.quantity > position.quantity:
+                errors.append(f"Leg {index}: Cannot sell more shares than owned")
+                continue
+            if price is None:
+                # Without a cached quote the sale is recorded at the average cost, as in sell_shares
+                price = position.purchase_price
+            position.quantity -= leg.quantity
+            notes = f"Sold {leg.quantity} shares of {stock.symbol} (batch order)"
+
+        trade_record = TradeHistory(
+            user_id=current_user.id,
+            stock_id=leg.stock_id,
+            trade_type=leg.side,
+            quantity=leg.quantity,
+            price_per_share=price,
+            total_amount=leg.quantity * price,
+            trade_date=trade_date,
+            notes=notes
+        )
+        legs.append((index, leg, stock, position, position.quantity, trade_record))
+
+    if errors:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="; ".join(errors)
+        )
+
+    trades = [trade_record for _, _, _, _, _, trade_record in legs]
+    db.add_all(trades)
+    await record_lots(db, trades)
+    await record_trades(db, trades)
+
+    # Positions sold down to zero are closed; one only bought and sold within this order was never stored
+    for position in positions.values():
+        if position.quantity == 0:
+            if position.id is None:
+                db.expunge(position)
+            else:
+                await db.delete(position)
+
+    # Trades, lots and positions go out as batched statements in one flush
+    try:
+        await db.flush()
+    except IntegrityError:
+        # Another request opened a position in one of these stocks after ours were locked
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A position in this order was opened concurrently; please retry"
+        )
+    results = [
+        OrderLegResult(
+            index=index,
+            side=leg.side,
+            stock_id=leg.stock_id,
+            symbol=stock.symbol,
+            quantity=leg.quantity,
+            price=trade_record.price_per_share,
+            trade_id=trade_record.id,
+            position_id=position.id if position.quantity else None,
+            position_quantity=position_quantity,
+            realized_pnl=trade_record.realized_pnl
+        )
+        for index, leg, stock, position, position_quantity, trade_record in legs
+    ]
+    await db.commit()
+
+    return BatchOrderResponse(
+        success=True,
+        message=f"Executed {len(results)} order leg(s)",
+        results=results
+    )
+
 @router.put("/{position_id}", response_model=PositionResponse)
 async def update_position(
     position_id: int,
     position_data: PositionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a position"""
-    position = db.query(Position).filter(
+    position = await db.scalar(select(Position).options(joinedload(Position.stock)).where(
         Position.id == position_id,
         Position.user_id == current_user.id
-    ).first()
+    ))
     
     if not position:
         raise HTTPException(
@@ -161,25 +343,30 @@ async def update_position(
     
     # Update position fields
     update_data = position_data.dict(exclude_unset=True)
+    if "quantity" in update_data and update_data["quantity"] != position.quantity:
+        # The open lots would no longer add up to the position
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Quantity can only be changed by buying or selling shares"
+        )
     for field, value in update_data.items():
         setattr(position, field, value)
     
-    db.commit()
-    db.refresh(position)
+    await db.commit()
     
     return position
 
 @router.delete("/{position_id}", response_model=MessageResponse)
 async def delete_position(
     position_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a position (sell all shares)"""
-    position = db.query(Position).filter(
+    position = await db.scalar(select(Position).options(joinedload(Position.stock)).where(
         Position.id == position_id,
         Position.user_id == current_user.id
-    ).first()
+    ))
     
     if not position:
         raise HTTPException(
@@ -188,8 +375,24 @@ async def delete_position(
         )
     
     stock_symbol = position.stock.symbol
-    db.delete(position)
-    db.commit()
+    # Closing the position is a sale of every share, recorded like sell_shares
+    quote = quote_cache.get(f"market:{stock_symbol}")
+    price = quote["current_price"] if quote else position.purchase_price
+    trade_record = TradeHistory(
+        user_id=current_user.id,
+        stock_id=position.stock_id,
+        trade_type="SELL",
+        quantity=position.quantity,
+        price_per_share=price,
+        total_amount=position.quantity * price,
+        notes=f"Sold all {position.quantity} shares of {stock_symbol} (position deleted)"
+    )
+    db.add(trade_record)
+    await record_lots(db, [trade_record])
+    await record_trades(db, [trade_record])
+    
+    await db.delete(position)
+    await db.commit()
     
     return MessageResponse(
         message=f"Position in {stock_symbol} deleted successfully"
@@ -199,14 +402,15 @@ async def delete_position(
 async def sell_shares(
     position_id: int,
     quantity: float,
-    db: Session = Depends(get_db),
+    price: Optional[float] = Query(None, gt=0, description="Sale price per share; defaults to the cached quote"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Sell a specific quantity of shares from a position"""
-    position = db.query(Position).filter(
+    position = await db.scalar(select(Position).options(joinedload(Position.stock)).where(
         Position.id == position_id,
         Position.user_id == current_user.id
-    ).first()
+    ))
     
     if not position:
         raise HTTPException(
@@ -227,6 +431,10 @@ async def sell_shares(
         )
     
     stock_symbol = position.stock.symbol
+    if price is None:
+        # Without a cached quote the sale is recorded at the average cost, as before
+        quote = quote_cache.get(f"market:{stock_symbol}")
+        price = quote["current_price"] if quote else position.purchase_price
     
     # Record trade history for sell transaction
     trade_record = TradeHistory(
@@ -234,19 +442,21 @@ async def sell_shares(
         stock_id=position.stock_id,
         trade_type="SELL",
         quantity=quantity,
-        price_per_share=position.purchase_price,  # Using purchase price for now, could be current market price
-        total_amount=quantity * position.purchase_price,
+        price_per_share=price,
+        total_amount=quantity * price,
         notes=f"Sold {quantity} shares of {stock_symbol}"
     )
     db.add(trade_record)
+    await record_lots(db, [trade_record])
+    await record_trades(db, [trade_record])
     
     # Update position quantity
     position.quantity -= quantity
     
     # If all shares sold, delete the position
     if position.quantity == 0:
-        db.delete(position)
-        db.commit()
+        await db.delete(position)
+        await db.commit()
         return SellResponse(
             success=True,
             message=f"All shares of {stock_symbol} sold. Position closed.",
@@ -254,8 +464,7 @@ async def sell_shares(
             position=None
         )
     else:
-        db.commit()
-        db.refresh(position)
+        await db.commit()
         return SellResponse(
             success=True,
             message=f"Sold {quantity} shares of {stock_symbol}. {position.quantity} shares remaining.",
@@ -1,62 +1,202 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Optional
-from datetime import datetime, timedelta
-from database import get_db
-from models import Stock, User
-from schemas import StockCreate, StockResponse, StockUpdate, MessageResponse, StockQuoteResponse
-from auth import get_current_user
-import os
-import finnhub
-import random
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Path, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from database import get_db, AsyncSessionLocal
+from models import Stock, StockProfile, User
+from schemas import StockCreate, StockResponse, StockUpdate, MessageResponse, StockQuoteResponse, BatchQuoteItem, BatchChartRequest, ChartSeriesResult, Page
+from replica_router import get_read_db
+from pagination import build_page, decode_cursor, MAX_PAGE_SIZE
+from stock_catalog import stock_catalog, bump_catalog_version
+from trade_aggregates import remove_stock_totals
+from auth import get_current_user, get_current_read_user, get_user_from_token
+from quote_cache import quote_cache
+from market_data_service import market_data_service, build_quote_fields
+from rate_limiter import RateLimitExceeded
+from profile_service import fetch_and_store_profile, is_profile_stale, refresh_profile
+from bar_service import get_chart_series
+from quote_stream import quote_broadcaster, QuoteSubscriber, STREAM_MAX_SYMBOLS_PER_CLIENT, STREAM_SEND_TIMEOUT_SECONDS
+import asyncio
+import json
 
 router = APIRouter(prefix="/stocks", tags=["stocks"])
 
-# FinnHub configuration
-FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
-if not FINNHUB_API_KEY:
-    raise ValueError("FINNHUB_API_KEY not found in environment variables")
+# Maximum number of symbols accepted by the batch quote endpoint
+MAX_BATCH_QUOTE_SYMBOLS = 50
 
-# Initialize Finnhub client
-finnhub_client = finnhub.Client(api_key=FINNHUB_API_KEY)
-
-@router.get("/", response_model=List[StockResponse])
+@router.get("/", response_model=Page[StockResponse])
 async def get_stocks(
-    skip: int = Query(0, ge=0, description="Number of stocks to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Number of stocks to return"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Number of stocks to return"),
+    current_user: User = Depends(get_current_read_user)
 ):
-    """Get all stocks with pagination"""
-    stocks = db.query(Stock).offset(skip).limit(limit).all()
-    return stocks
+    """Get all stocks ordered by id, one keyset page at a time"""
+    after = decode_cursor(cursor, "stocks", int)
+    stocks = stock_catalog.stocks_after(after[0] if after else None, limit + 1)
+    return build_page(stocks, limit, "stocks", lambda stock: (stock.id,))
 
 @router.get("/search", response_model=List[StockResponse])
 async def search_stocks(
     q: str = Query(..., min_length=1, description="Search query for stock symbol or name"),
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_read_user)
+):
+    """Search stocks by symbol or name, ranked: exact symbol, symbol prefix, then name matches"""
+    return stock_catalog.search(q, limit)
+
+@router.get("/quotes", response_model=Dict[str, BatchQuoteItem])
+async def get_stock_quotes(
+    symbols: str = Query(..., min_length=1, description="Comma-separated stock symbols, e.g. AAPL,MSFT"),
+    current_user: User = Depends(get_current_read_user)
 ):
-    """Search stocks by symbol or name"""
-    search_term = f"%{q.upper()}%"
-    stocks = db.query(Stock).filter(
-        or_(
-            Stock.symbol.ilike(search_term),
-            Stock.name.ilike(search_term)
+    """
+    Get quotes for many symbols in one request.
+    Returns a symbol-keyed map where each entry holds either a quote or an error.
+    """
+    requested = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one symbol is required"
+        )
+    if len(requested) > MAX_BATCH_QUOTE_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_QUOTE_SYMBOLS} symbols can be requested at once"
+        )
+    
+    # Check all symbols against the in-process stock catalog
+    known_symbols = stock_catalog.known_symbols(requested)
+    
+    # Mock quotes only stand in while every provider is open-circuit
+    market_data = await market_data_service.get_multiple_stocks_data(
+        [symbol for symbol in requested if symbol in known_symbols]
+    )
+    
+    results: Dict[str, BatchQuoteItem] = {}
+    for symbol in requested:
+        if symbol not in known_symbols:
+            results[symbol] = BatchQuoteItem(error=f"Stock with symbol '{symbol}' not found in our database")
+            continue
+        
+        data = market_data.get(symbol)
+        if not data:
+            results[symbol] = BatchQuoteItem(error=f"No quote data available for symbol '{symbol}'")
+            continue
+        
+        results[symbol] = BatchQuoteItem(
+            quote=StockQuoteResponse(**build_quote_fields(data), last_updated=datetime.utcnow())
         )
-    ).limit(limit).all()
-    return stocks
+    
+    return results
+
+@router.websocket("/stream")
+async def stream_quotes(
+    websocket: WebSocket,
+    token: str = Query(..., description="JWT access token")
+):
+    """
+    Stream quote deltas over a WebSocket.
+    Clients send {"action": "subscribe" | "unsubscribe", "symbols": [...]} and receive
+    {"type": "quotes", "data": {symbol: {changed fields}}} whenever prices move.
+    """
+    # Authenticate with the same JWT used by get_current_user; the DB session is not held open
+    async with AsyncSessionLocal() as db:
+        user = await get_user_from_token(db, token)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscriber = QuoteSubscriber()
+    quote_broadcaster.register(subscriber)
+    background_fetches = set()
+    
+    async def send_updates():
+        while True:
+            batch = await subscriber.next_batch()
+            try:
+                await asyncio.wait_for(
+                    websocket.send_json({"type": "quotes", "data": batch}),
+                    timeout=STREAM_SEND_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # The client is not draining its socket; disconnect instead of buffering
+                quote_broadcaster.slow_disconnects += 1
+                return
+    
+    async def receive_commands():
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action = message.get("action")
+                symbols = list(dict.fromkeys(
+                    str(symbol).strip().upper() for symbol in message.get("symbols", []) if str(symbol).strip()
+                ))
+            except (ValueError, AttributeError, TypeError):
+                await websocket.send_json({"type": "error", "message": "Invalid message"})
+                continue
+            
+            if action == "subscribe":
+                if len(subscriber.symbols | set(symbols)) > STREAM_MAX_SYMBOLS_PER_CLIENT:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"At most {STREAM_MAX_SYMBOLS_PER_CLIENT} symbols can be streamed at once"
+                    })
+                    continue
+                
+                known_symbols = stock_catalog.known_symbols(symbols)
+                unknown_symbols = [symbol for symbol in symbols if symbol not in known_symbols]
+                if unknown_symbols:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"Unknown symbols: {', '.join(unknown_symbols)}"
+                    })
+                
+                new_symbols = [symbol for symbol in symbols if symbol in known_symbols]
+                quote_broadcaster.subscribe(subscriber, new_symbols)
+                
+                # Warm symbols nobody has fetched yet; the result reaches us through the quote cache
+                missing = [symbol for symbol in new_symbols if quote_cache.get(f"market:{symbol}") is None]
+                if missing:
+                    task = asyncio.create_task(
+                        market_data_service.get_multiple_stocks_data(missing, use_mock_fallback=False)
+                    )
+                    background_fetches.add(task)
+                    task.add_done_callback(background_fetches.discard)
+            elif action == "unsubscribe":
+                quote_broadcaster.unsubscribe(subscriber, symbols)
+            else:
+                await websocket.send_json({"type": "error", "message": f"Unknown action '{action}'"})
+    
+    tasks = [asyncio.create_task(send_updates()), asyncio.create_task(receive_commands())]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                print(f"❌ Quote stream error for user {user.id}: {error}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        quote_broadcaster.remove(subscriber)
+        try:
+            await websocket.close()
+        except RuntimeError:
+            # Already closed by the client
+            pass
 
 @router.get("/symbol/{symbol}", response_model=StockResponse)
 async def get_stock_by_symbol(
     symbol: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_read_user)
 ):
     """Get a stock by its symbol"""
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
+    stock = stock_catalog.get_by_symbol(symbol)
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -67,64 +207,52 @@ async def get_stock_by_symbol(
 @router.get("/chart/{symbol}/{timeframe}")
 async def get_stock_chart_data(
     symbol: str,
-    timeframe: str = Path(..., regex="^(1D|1W|1Y|5Y)$"),
-    db: Session = Depends(get_db),
+    timeframe: str = Path(..., pattern="^(1D|1W|1Y|5Y)$"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Returns stock chart data as an array of Y values (prices)"""
+    """Returns stock chart data as an array of Y values (closing prices, oldest first)"""
     # Verify stock exists
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
+    stock = stock_catalog.get_by_symbol(symbol)
     if not stock:
         raise HTTPException(status_code=404, detail="Stock not found")
 
-    # Configure timeframe
-    timeframe_config = {
-        "1D": {"points": 24},  # 24 points (hourly for 1 day)
-        "1W": {"points": 7},  # 28 points (daily for 4 weeks)
-        "1Y": {"points": 12},  # 12 points (monthly for 1 year)
-        "5Y": {"points": 60}    # 5 points (yearly for 5 years)
-    }
-    
-    config = timeframe_config.get(timeframe)
-    
-    # Generate symbol-specific chart data
-    import hashlib
-    import random
-    
-    # Create a seed based on symbol to ensure consistent but different data per symbol
-    seed = int(hashlib.md5(symbol.encode()).hexdigest()[:8], 16)
-    random.seed(seed)
-    
-    # Generate symbol-specific price range
-    base_price = 50 + (seed % 200)  # Price between 50-250
-    volatility = 0.1 + (seed % 30) / 100  # Volatility between 0.1-0.4
-    
-    y_values = []
-    current_price = base_price
-    
-    for _ in range(config["points"]):
-        # Add some realistic price movement
-        change_percent = (random.random() - 0.5) * volatility
-        current_price = current_price * (1 + change_percent)
-        
-        # Keep price within reasonable bounds
-        current_price = max(10, min(500, current_price))
-        
-        y_values.append(round(current_price, 2))  # Store just the price (Y value)
-    
+    # One indexed range scan over the stored (or precomputed rollup) bars, memoized per time bucket
+    y_values = await get_chart_series(db, stock, timeframe)
+
     return {
         "symbol": symbol.upper(),
         "timeframe": timeframe,
         "y_values": y_values,  # Array of prices (Y values)
     }
 
+@router.post("/charts", response_model=List[ChartSeriesResult])
+async def get_stock_charts(
+    request: BatchChartRequest,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Returns chart series for many (symbol, timeframe) pairs in one response, in request order"""
+    results = []
+    for item in request.items:
+        symbol = item.symbol.upper()
+        stock = stock_catalog.get_by_symbol(symbol)
+        if stock is None:
+            results.append(ChartSeriesResult(symbol=symbol, timeframe=item.timeframe, error="Stock not found"))
+            continue
+        results.append(ChartSeriesResult(
+            symbol=symbol,
+            timeframe=item.timeframe,
+            y_values=await get_chart_series(db, stock, item.timeframe)
+        ))
+
+    return results
+
 @router.get("/{stock_id}", response_model=StockResponse)
 async def get_stock(
     stock_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_read_user)
 ):
     """Get a stock by ID"""
-    stock = db.query(Stock).filter(Stock.id == stock_id).first()
+    stock = stock_catalog.get_by_id(stock_id)
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -137,13 +265,12 @@ async def get_stock(
 @router.post("/", response_model=StockResponse, status_code=status.HTTP_201_CREATED)
 async def create_stock(
     stock_data: StockCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new stock"""
     # Check if stock with this symbol already exists
-    existing_stock = db.query(Stock).filter(Stock.symbol == stock_data.symbol.upper()).first()
-    if existing_stock:
+    if stock_catalog.get_by_symbol(stock_data.symbol):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Stock with symbol '{stock_data.symbol}' already exists"
@@ -160,19 +287,29 @@ async def create_stock(
     )
     
     db.add(stock)
-    db.commit()
-    db.refresh(stock)
+    await db.execute(bump_catalog_version())
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Created by another worker since our catalog was last refreshed
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Stock with symbol '{stock_data.symbol}' already exists"
+        )
+    
+    stock_catalog.put(stock)
     return stock
 
 @router.put("/{stock_id}", response_model=StockResponse)
 async def update_stock(
     stock_id: int,
     stock_data: StockUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a stock"""
-    stock = db.query(Stock).filter(Stock.id == stock_id).first()
+    stock = await db.scalar(select(Stock).where(Stock.id == stock_id))
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -184,18 +321,21 @@ async def update_stock(
     for field, value in update_data.items():
         setattr(stock, field, value)
     
-    db.commit()
-    db.refresh(stock)
+    await db.execute(bump_catalog_version())
+    await db.commit()
+    await db.refresh(stock)
+    
+    stock_catalog.put(stock)
     return stock
 
 @router.delete("/{stock_id}", response_model=MessageResponse)
 async def delete_stock(
     stock_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a stock"""
-    stock = db.query(Stock).filter(Stock.id == stock_id).first()
+    stock = await db.scalar(select(Stock).where(Stock.id == stock_id))
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -204,8 +344,12 @@ async def delete_stock(
     
     # Check if stock is used in positions or watchlist
     # Due to cascade delete, this will also remove related positions and watchlist items
-    db.delete(stock)
-    db.commit()
+    await remove_stock_totals(db, stock.id)
+    await db.delete(stock)
+    await db.execute(bump_catalog_version())
+    await db.commit()
+    
+    stock_catalog.remove(stock.id)
     
     return MessageResponse(
         message=f"Stock '{stock.symbol}' deleted successfully",
@@ -218,88 +362,97 @@ async def delete_stock(
 @router.get("/{symbol}/quote", response_model=StockQuoteResponse)
 async def get_stock_quote(
     symbol: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_read_user)
 ):
     """
-    Get real-time stock quote data from FinnHub for a specific stock symbol.
-    Returns price, change, and market data with direction indicator.
+    Get the quote for a specific stock symbol, with a direction indicator.
+    Served from the quote cache the poller keeps warm; only a miss goes upstream.
     """
     # First check if stock exists in our database
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
+    stock = stock_catalog.get_by_symbol(symbol)
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Stock with symbol '{symbol}' not found in our database"
         )
     
-    try:
-        data = finnhub_client.quote(symbol.upper())
-        
-        if not data or 'c' not in data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"No quote data available for symbol '{symbol}'"
-            )
-        
-        # Determine direction
-        change = data.get('d', 0)
-        if change > 0:
-            direction = "up"
-        elif change < 0:
-            direction = "down"
-        else:
-            direction = "neutral"
-        
-        return StockQuoteResponse(
-            current_price=data['c'],
-            change=data['d'],
-            percent_change=data['dp'],
-            high_price=data['h'],
-            low_price=data['l'],
-            open_price=data['o'],
-            previous_close=data['pc'],
-            direction=direction,
-            last_updated=datetime.utcnow()
-        )
-    
-    except Exception as e:
+    # Same cache entry, providers and mock fallback as the batch /quotes endpoint
+    market_data = await market_data_service.get_multiple_stocks_data([stock.symbol])
+    data = market_data.get(stock.symbol)
+    if not data:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching stock quote: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No quote data available for symbol '{symbol}'"
         )
+    
+    return StockQuoteResponse(**build_quote_fields(data), last_updated=datetime.utcnow())
 
 @router.get("/{symbol}/profile")
 async def get_stock_profile(
     symbol: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get company profile information from FinnHub for a specific stock symbol.
+    Get company profile information for a specific stock symbol.
+    Profiles are stored in the database and only fetched from FinnHub on a cold miss;
+    stale profiles are served immediately and refreshed in the background.
+    Supports conditional requests via ETag / Last-Modified.
     """
-    # Verify stock exists in our database first
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
+    # Verify stock exists in our database first, then load its stored profile
+    stock = stock_catalog.get_by_symbol(symbol)
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Stock with symbol '{symbol}' not found in our database"
         )
     
-    try:
-        profile_data = finnhub_client.company_profile2(symbol=symbol.upper())
+    profile = await db.scalar(select(StockProfile).where(StockProfile.stock_id == stock.id))
+    if profile is None:
+        try:
+            profile = await fetch_and_store_profile(db, stock)
+        except RateLimitExceeded as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(e),
+                headers={"Retry-After": str(max(1, int(e.retry_after + 0.5)))}
+            )
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error fetching company profile: {str(e)}"
+            )
         
-        if not profile_data:
+        if profile is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No profile data available for symbol '{symbol}'"
             )
-        
-        return profile_data
+    elif is_profile_stale(profile):
+        background_tasks.add_task(refresh_profile, stock.id, stock.symbol)
     
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching company profile: {str(e)}"
-        )
-
+    last_modified = profile.updated_at.replace(microsecond=0, tzinfo=timezone.utc)
+    headers = {
+        "ETag": f'"{profile.etag}"',
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    
+    # Conditional requests: If-None-Match takes precedence over If-Modified-Since
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                if last_modified <= parsedate_to_datetime(if_modified_since):
+                    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            except (TypeError, ValueError):
+                pass
+    
+    return JSONResponse(content=profile.data, headers=headers)
@@ -1,22 +1,210 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
-from database import get_db
-from models import TradeHistory, User
-from schemas import TradeHistoryResponse
-from auth import get_current_user
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import AsyncIterator, List, Optional
+from datetime import datetime
+from models import Stock, StockTradeTotals, TradeHistory, TradeTotals, User
+from schemas import TradeHistoryResponse, TradeHistorySummary, StockTradeSummary, RealizedPnlPeriod, Page
+from replica_router import get_read_db, replica_router
+from pagination import build_page, decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from auth import get_current_read_user
+import csv
+import io
+import json
 
 router = APIRouter(prefix="/trade-history", tags=["trade-history"])
 
-@router.get("/", response_model=List[TradeHistoryResponse])
+# Rows fetched from the server-side cursor (and written to the client) per batch
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = ["id", "trade_date", "symbol", "trade_type", "quantity", "price_per_share", "total_amount", "notes"]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+@router.get("/", response_model=Page[TradeHistoryResponse])
 async def get_user_trade_history(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of trades to return"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
-    """Get complete trade history for the current user"""
-    trades = db.query(TradeHistory).filter(
+    """Get the current user's trade history, newest first, one keyset page at a time"""
+    query = select(TradeHistory).options(joinedload(TradeHistory.stock)).where(
         TradeHistory.user_id == current_user.id
-    ).order_by(desc(TradeHistory.trade_date)).all()
-    
-    return trades
+    )
+
+    # Seek past the last (trade_date, id) of the previous page
+    after = decode_cursor(cursor, "trade_history", datetime.fromisoformat, int)
+    if after is not None:
+        query = query.where(tuple_(TradeHistory.trade_date, TradeHistory.id) < tuple_(*after))
+
+    trades = (await db.scalars(
+        query.order_by(TradeHistory.trade_date.desc(), TradeHistory.id.desc()).limit(limit + 1)
+    )).all()
+
+    return build_page(trades, limit, "trade_history", lambda trade: (trade.trade_date.isoformat(), trade.id))
+
+@router.get("/summary", response_model=TradeHistorySummary)
+async def get_trade_history_summary(
+    recent: int = Query(10, ge=0, le=100, description="Number of most recent trades to include"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get the current user's trade totals from the maintained aggregates, plus their latest trades"""
+    totals = await db.get(TradeTotals, current_user.id)
+    trades = (await db.scalars(
+        select(TradeHistory).options(joinedload(TradeHistory.stock)).where(
+            TradeHistory.user_id == current_user.id
+        ).order_by(TradeHistory.trade_date.desc(), TradeHistory.id.desc()).limit(recent)
+    )).all() if recent else []
+
+    buy_amount = totals.buy_amount if totals else 0.0
+    sell_amount = totals.sell_amount if totals else 0.0
+    return TradeHistorySummary(
+        total_trades=totals.trade_count if totals else 0,
+        total_buy_amount=buy_amount,
+        total_sell_amount=sell_amount,
+        net_amount=buy_amount - sell_amount,
+        trades=trades
+    )
+
+@router.get("/summary/stocks", response_model=List[StockTradeSummary])
+async def get_trade_history_summary_by_stock(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get the current user's trade totals per stock, ordered by symbol"""
+    rows = (await db.execute(
+        select(StockTradeTotals, Stock.symbol)
+        .join(Stock, StockTradeTotals.stock_id == Stock.id)
+        .where(StockTradeTotals.user_id == current_user.id)
+        .order_by(Stock.symbol)
+    )).all()
+
+    return [
+        StockTradeSummary(
+            stock_id=totals.stock_id,
+            symbol=symbol,
+            total_trades=totals.trade_count,
+            buy_quantity=totals.buy_quantity,
+            sell_quantity=totals.sell_quantity,
+            total_buy_amount=totals.buy_amount,
+            total_sell_amount=totals.sell_amount,
+            net_amount=totals.buy_amount - totals.sell_amount
+        )
+        for totals, symbol in rows
+    ]
+
+@router.get("/realized-pnl", response_model=List[RealizedPnlPeriod])
+async def get_realized_pnl(
+    period: str = Query("month", pattern="^(day|week|month|year)$", description="day, week, month or year"),
+    start_date: Optional[datetime] = Query(None, description="Only sales on or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only sales before this time"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get the current user's realized P&L (FIFO lots) per period, oldest first"""
+    period_start = func.date_trunc(period, TradeHistory.trade_date).label("period_start")
+    query = select(
+        period_start,
+        func.count(),
+        func.sum(TradeHistory.total_amount),
+        func.sum(TradeHistory.cost_basis),
+        func.sum(TradeHistory.realized_pnl),
+    ).where(
+        TradeHistory.user_id == current_user.id,
+        TradeHistory.trade_type == "SELL",
+        TradeHistory.realized_pnl.is_not(None)
+    )
+    if start_date is not None:
+        query = query.where(TradeHistory.trade_date >= start_date)
+    if end_date is not None:
+        query = query.where(TradeHistory.trade_date < end_date)
+
+    rows = (await db.execute(query.group_by(period_start).order_by(period_start))).all()
+    return [
+        RealizedPnlPeriod(
+            period_start=start,
+            sell_count=sell_count,
+            proceeds=proceeds,
+            cost_basis=cost_basis,
+            realized_pnl=realized_pnl
+        )
+        for start, sell_count, proceeds, cost_basis, realized_pnl in rows
+    ]
+
+def format_export_batch(rows, format: str, include_header: bool) -> str:
+    """Serialize one batch of export rows as CSV lines or NDJSON records"""
+    if format == "ndjson":
+        return "".join(
+            json.dumps({**row._asdict(), "trade_date": row.trade_date.isoformat()}) + "\n"
+            for row in rows
+        )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(
+        [row.id, row.trade_date.isoformat(), row.symbol, row.trade_type,
+         row.quantity, row.price_per_share, row.total_amount, row.notes]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+@router.get("/export")
+async def export_trade_history(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    start_date: Optional[datetime] = Query(None, description="Only trades on or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only trades before this time"),
+    symbol: Optional[str] = Query(None, description="Only trades in this stock"),
+    current_user: User = Depends(get_current_read_user)
+):
+    """
+    Stream the current user's full trade history, oldest first, as CSV or NDJSON.
+    Rows come from a server-side cursor in batches, so memory use does not grow with history size.
+    """
+    query = select(
+        TradeHistory.id,
+        TradeHistory.trade_date,
+        Stock.symbol,
+        TradeHistory.trade_type,
+        TradeHistory.quantity,
+        TradeHistory.price_per_share,
+        TradeHistory.total_amount,
+        TradeHistory.notes,
+    ).join(Stock, TradeHistory.stock_id == Stock.id).where(TradeHistory.user_id == current_user.id)
+    if start_date is not None:
+        query = query.where(TradeHistory.trade_date >= start_date)
+    if end_date is not None:
+        query = query.where(TradeHistory.trade_date < end_date)
+    if symbol:
+        query = query.where(Stock.symbol == symbol.upper())
+    query = query.order_by(TradeHistory.trade_date, TradeHistory.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    # The session is owned by the generator so it stays open for as long as the response streams
+    session_factory = replica_router.session_factory(request.headers.get("authorization"))
+
+    async def stream_rows() -> AsyncIterator[str]:
+        async with session_factory() as db:
+            result = await db.stream(query)
+            include_header = True
+            async for rows in result.partitions():
+                yield format_export_batch(rows, format, include_header)
+                include_header = False
+            if include_header and format == "csv":
+                # No trades matched; still send the header row
+                yield format_export_batch([], format, include_header)
+
+    filename = f"trade-history-{datetime.utcnow():%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream_rows(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
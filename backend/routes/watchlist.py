@@ -1,29 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import Optional
 from database import get_db
-from models import Watchlist, Stock, User
-from schemas import WatchlistCreate, WatchlistResponse, WatchlistUpdate, MessageResponse, WatchlistSummary
-from auth import get_current_user
+from models import Watchlist, User
+from schemas import WatchlistCreate, WatchlistResponse, WatchlistUpdate, MessageResponse, WatchlistSummary, Page
+from replica_router import get_read_db
+from pagination import build_page, decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from stock_catalog import stock_catalog
+from auth import get_current_user, get_current_read_user
 
 router = APIRouter(prefix="/watchlist", tags=["watchlist"])
 
-@router.get("/", response_model=List[WatchlistResponse])
+@router.get("/", response_model=Page[WatchlistResponse])
 async def get_user_watchlist(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of items to return"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
-    """Get all watchlist items for the current user"""
-    watchlist = db.query(Watchlist).filter(Watchlist.user_id == current_user.id).all()
-    return watchlist
+    """Get the current user's watchlist items ordered by id, one keyset page at a time"""
+    query = select(Watchlist).options(joinedload(Watchlist.stock)).where(Watchlist.user_id == current_user.id)
+    after = decode_cursor(cursor, "watchlist", int)
+    if after is not None:
+        query = query.where(Watchlist.id > after[0])
+    watchlist = (await db.scalars(query.order_by(Watchlist.id).limit(limit + 1))).all()
+    return build_page(watchlist, limit, "watchlist", lambda item: (item.id,))
 
 @router.get("/summary", response_model=WatchlistSummary)
 async def get_watchlist_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """Get watchlist summary for the current user"""
-    watchlist = db.query(Watchlist).filter(Watchlist.user_id == current_user.id).all()
+    watchlist = (await db.scalars(
+        select(Watchlist).options(joinedload(Watchlist.stock)).where(Watchlist.user_id == current_user.id)
+    )).all()
     
     return WatchlistSummary(
         total_watched=len(watchlist),
@@ -33,14 +46,14 @@ async def get_watchlist_summary(
 @router.get("/{watchlist_id}", response_model=WatchlistResponse)
 async def get_watchlist_item(
     watchlist_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     """Get a specific watchlist item"""
-    watchlist_item = db.query(Watchlist).filter(
+    watchlist_item = await db.scalar(select(Watchlist).options(joinedload(Watchlist.stock)).where(
         Watchlist.id == watchlist_id,
         Watchlist.user_id == current_user.id
-    ).first()
+    ))
     
     if not watchlist_item:
         raise HTTPException(
@@ -53,12 +66,12 @@ async def get_watchlist_item(
 @router.post("/", response_model=WatchlistResponse)
 async def add_to_watchlist(
     watchlist_data: WatchlistCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Add a stock to watchlist"""
     # Verify stock exists
-    stock = db.query(Stock).filter(Stock.id == watchlist_data.stock_id).first()
+    stock = stock_catalog.get_by_id(watchlist_data.stock_id)
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -66,10 +79,10 @@ async def add_to_watchlist(
         )
     
     # Check if stock is already in watchlist
-    existing_item = db.query(Watchlist).filter(
+    existing_item = await db.scalar(select(Watchlist).where(
         Watchlist.user_id == current_user.id,
         Watchlist.stock_id == watchlist_data.stock_id
-    ).first()
+    ))
     
     if existing_item:
         raise HTTPException(
@@ -83,8 +96,8 @@ async def add_to_watchlist(
         **watchlist_data.dict()
     )
     db.add(watchlist_item)
-    db.commit()
-    db.refresh(watchlist_item)
+    await db.commit()
+    await db.refresh(watchlist_item, attribute_names=["stock"])
     
     return watchlist_item
 
@@ -92,12 +105,12 @@ async def add_to_watchlist(
 async def add_to_watchlist_by_symbol(
     symbol: str,
     notes: str = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Add a stock to watchlist by symbol"""
     # Find stock by symbol
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
+    stock = stock_catalog.get_by_symbol(symbol)
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -105,10 +118,10 @@ async def add_to_watchlist_by_symbol(
         )
     
     # Check if stock is already in watchlist
-    existing_item = db.query(Watchlist).filter(
+    existing_item = await db.scalar(select(Watchlist).where(
         Watchlist.user_id == current_user.id,
         Watchlist.stock_id == stock.id
-    ).first()
+    ))
     
     if existing_item:
         raise HTTPException(
@@ -123,8 +136,8 @@ async def add_to_watchlist_by_symbol(
         notes=notes
     )
     db.add(watchlist_item)
-    db.commit()
-    db.refresh(watchlist_item)
+    await db.commit()
+    await db.refresh(watchlist_item, attribute_names=["stock"])
     
     return watchlist_item
 
@@ -132,14 +145,14 @@ async def add_to_watchlist_by_symbol(
 async def update_watchlist_item(
     watchlist_id: int,
     watchlist_data: WatchlistUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update watchlist item notes"""
-    watchlist_item = db.query(Watchlist).filter(
+    watchlist_item = await db.scalar(select(Watchlist).options(joinedload(Watchlist.stock)).where(
         Watchlist.id == watchlist_id,
         Watchlist.user_id == current_user.id
-    ).first()
+    ))
     
     if not watchlist_item:
         raise HTTPException(
@@ -152,22 +165,21 @@ async def update_watchlist_item(
     for field, value in update_data.items():
         setattr(watchlist_item, field, value)
     
-    db.commit()
-    db.refresh(watchlist_item)
+    await db.commit()
     
     return watchlist_item
 
 @router.delete("/{watchlist_id}", response_model=MessageResponse)
 async def remove_from_watchlist(
     watchlist_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Remove a stock from watchlist"""
-    watchlist_item = db.query(Watchlist).filter(
+    watchlist_item = await db.scalar(select(Watchlist).options(joinedload(Watchlist.stock)).where(
         Watchlist.id == watchlist_id,
         Watchlist.user_id == current_user.id
-    ).first()
+    ))
     
     if not watchlist_item:
         raise HTTPException(
@@ -176,8 +188,8 @@ async def remove_from_watchlist(
         )
     
     stock_symbol = watchlist_item.stock.symbol
-    db.delete(watchlist_item)
-    db.commit()
+    await db.delete(watchlist_item)
+    await db.commit()
     
     return MessageResponse(
         message=f"Stock '{stock_symbol}' removed from watchlist"
@@ -186,12 +198,12 @@ async def remove_from_watchlist(
 @router.delete("/symbol/{symbol}", response_model=MessageResponse)
 async def remove_from_watchlist_by_symbol(
     symbol: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Remove a stock from watchlist by symbol"""
     # Find stock by symbol
-    stock = db.query(Stock).filter(Stock.symbol == symbol.upper()).first()
+    stock = stock_catalog.get_by_symbol(symbol)
     if not stock:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -199,10 +211,10 @@ async def remove_from_watchlist_by_symbol(
         )
     
     # Find watchlist item
-    watchlist_item = db.query(Watchlist).filter(
+    watchlist_item = await db.scalar(select(Watchlist).where(
         Watchlist.user_id == current_user.id,
         Watchlist.stock_id == stock.id
-    ).first()
+    ))
     
     if not watchlist_item:
         raise HTTPException(
@@ -210,8 +222,8 @@ async def remove_from_watchlist_by_symbol(
             detail=f"Stock '{symbol}' not found in your watchlist"
         )
     
-    db.delete(watchlist_item)
-    db.commit()
+    await db.delete(watchlist_item)
+    await db.commit()
     
     return MessageResponse(
         message=f"Stock '{symbol}' removed from watchlist"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Generic, TypeVar
 from datetime import datetime
 import re
 
@@ -118,6 +118,23 @@ class StockQuoteResponse(BaseModel):
     direction: str  # "up", "down", or "neutral"
     last_updated: datetime
 
+class BatchQuoteItem(BaseModel):
+    quote: Optional[StockQuoteResponse] = None
+    error: Optional[str] = None  # Set when no quote could be produced for the symbol
+
+class ChartRequestItem(BaseModel):
+    symbol: str = Field(..., min_length=1, max_length=10)
+    timeframe: str = Field(..., pattern="^(1D|1W|1Y|5Y)$")
+
+class BatchChartRequest(BaseModel):
+    items: List[ChartRequestItem] = Field(..., min_length=1, max_length=100)
+
+class ChartSeriesResult(BaseModel):
+    symbol: str
+    timeframe: str
+    y_values: Optional[List[float]] = None
+    error: Optional[str] = None  # Set when the symbol is not in the catalog
+
 # Position schemas
 class PositionBase(BaseModel):
     stock_id: int = Field(..., description="Stock ID")
@@ -165,10 +182,15 @@ class WatchlistUpdate(BaseModel):
 
 # Portfolio summary schemas
 class PortfolioSummary(BaseModel):
-    total_value: float
+    total_value: float = Field(..., description="Market value at cached quotes; stocks without a quote count at cost")
+    cost_basis: float
+    unrealized_pnl: float
+    unrealized_pnl_percent: float
+    day_change: float
+    day_change_percent: float
     total_positions: int
     total_stocks: int
-    positions: List[PositionResponse]
+    quoted_stocks: int = Field(..., description="Stocks valued at a cached quote")
 
 class WatchlistSummary(BaseModel):
     total_watched: int
@@ -183,6 +205,7 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    issued_at: Optional[datetime] = None
 
 # Response schemas
 class MessageResponse(BaseModel):
@@ -190,6 +213,13 @@ class MessageResponse(BaseModel):
     success: bool = True
     data: Optional[dict] = None
 
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    """One page of a keyset-paginated list; pass next_cursor back as ?cursor= for the next page"""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 class ErrorResponse(BaseModel):
     message: str
     success: bool = False
@@ -203,6 +233,32 @@ class SellResponse(BaseModel):
     position_closed: bool
     position: Optional[PositionResponse] = None
 
+class OrderLeg(BaseModel):
+    side: str = Field(..., pattern="^(BUY|SELL)$", description="BUY or SELL")
+    stock_id: int = Field(..., description="Stock ID")
+    quantity: float = Field(..., gt=0, description="Number of shares")
+    price: Optional[float] = Field(None, gt=0, description="Price per share; defaults to the cached quote")
+
+class BatchOrderRequest(BaseModel):
+    legs: List[OrderLeg] = Field(..., min_length=1, max_length=200, description="Legs, applied in order")
+
+class OrderLegResult(BaseModel):
+    index: int
+    side: str
+    stock_id: int
+    symbol: str
+    quantity: float
+    price: float
+    trade_id: int
+    position_id: Optional[int] = None  # None once the position is closed
+    position_quantity: float
+    realized_pnl: Optional[float] = None  # SELL only
+
+class BatchOrderResponse(BaseModel):
+    success: bool
+    message: str
+    results: List[OrderLegResult]
+
 # Trade History schemas
 class TradeHistoryBase(BaseModel):
     stock_id: int = Field(..., description="Stock ID")
@@ -220,6 +276,8 @@ class TradeHistoryResponse(TradeHistoryBase):
     user_id: int
     trade_date: datetime
     created_at: datetime
+    cost_basis: Optional[float] = None  # SELL only
+    realized_pnl: Optional[float] = None  # SELL only
     stock: StockResponse
     
     class Config:
@@ -231,3 +289,20 @@ class TradeHistorySummary(BaseModel):
     total_sell_amount: float
     net_amount: float  # total_buy_amount - total_sell_amount
     trades: List[TradeHistoryResponse]
+
+class StockTradeSummary(BaseModel):
+    stock_id: int
+    symbol: str
+    total_trades: int
+    buy_quantity: float
+    sell_quantity: float
+    total_buy_amount: float
+    total_sell_amount: float
+    net_amount: float  # total_buy_amount - total_sell_amount
+
+class RealizedPnlPeriod(BaseModel):
+    period_start: datetime
+    sell_count: int
+    proceeds: float
+    cost_basis: float
+    realized_pnl: float
@@ -0,0 +1,195 @@
+import asyncio
+import bisect
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AsyncSessionLocal
+from models import CatalogVersion, Stock
+from stock_search import StockSearchIndex
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stock catalog cache configuration
+STOCK_CATALOG_VERSION_CHECK_SECONDS = float(os.getenv("STOCK_CATALOG_VERSION_CHECK_SECONDS", "5"))
+
+CATALOG_NAME = "stocks"
+
+
+@dataclass(frozen=True)
+class CatalogStock:
+    """Immutable snapshot of a stocks row, safe to share between requests"""
+    id: int
+    symbol: str
+    name: str
+    description: Optional[str]
+    sector: Optional[str]
+    exchange: Optional[str]
+    currency: str
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_model(cls, stock: Stock) -> "CatalogStock":
+        return cls(
+            id=stock.id,
+            symbol=stock.symbol,
+            name=stock.name,
+            description=stock.description,
+            sector=stock.sector,
+            exchange=stock.exchange,
+            currency=stock.currency,
+            created_at=stock.created_at,
+            updated_at=stock.updated_at,
+        )
+
+
+def bump_catalog_version(name: str = CATALOG_NAME):
+    """UPDATE statement to execute in the same transaction as any change to the named catalog (the stocks table by default)"""
+    return update(CatalogVersion).where(CatalogVersion.name == name).values(
+        version=CatalogVersion.version + 1,
+        updated_at=datetime.utcnow()
+    )
+
+
+class StockCatalog:
+    """
+    In-memory copy of the stocks table indexed by symbol and id.
+    Each worker polls the catalog version and reloads when another worker changed it.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._by_symbol: Dict[str, CatalogStock] = {}
+        self._by_id: Dict[int, CatalogStock] = {}
+        self._ids: List[int] = []
+        self._search_index = StockSearchIndex()
+        self._task: Optional[asyncio.Task] = None
+
+        self.loads = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+
+    async def load(self, db: Optional[AsyncSession] = None) -> None:
+        """Replace the cached catalog with the current table contents"""
+        if db is None:
+            async with AsyncSessionLocal() as session:
+                return await self.load(session)
+
+        # Read the version first: a concurrent change then at worst triggers one extra reload
+        version = await db.scalar(select(CatalogVersion.version).where(CatalogVersion.name == CATALOG_NAME))
+        stocks = [CatalogStock.from_model(stock) for stock in (await db.scalars(select(Stock).order_by(Stock.id))).all()]
+
+        search_index = StockSearchIndex()
+        for stock in stocks:
+            search_index.add(stock.id, stock.symbol, stock.name)
+
+        self._by_id = {stock.id: stock for stock in stocks}
+        self._ids = [stock.id for stock in stocks]
+        self._by_symbol = {stock.symbol: stock for stock in stocks}
+        self._search_index = search_index
+        self.version = version or 0
+        self.loads += 1
+        logger.info(f"Stock catalog loaded: {len(stocks)} stocks at version {self.version}")
+
+    def start(self) -> None:
+        """Start polling the catalog version"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(STOCK_CATALOG_VERSION_CHECK_SECONDS)
+            try:
+                await self.check_version()
+            except Exception as e:
+                logger.error(f"Stock catalog version check failed: {str(e)}")
+
+    async def check_version(self) -> None:
+        """Reload when the version in the database differs from the cached one"""
+        async with AsyncSessionLocal() as db:
+            version = await db.scalar(select(CatalogVersion.version).where(CatalogVersion.name == CATALOG_NAME))
+            if (version or 0) != self.version:
+                await self.load(db)
+
+    def get_by_symbol(self, symbol: str) -> Optional[CatalogStock]:
+        stock = self._by_symbol.get(symbol.upper())
+        self._count(stock)
+        return stock
+
+    def get_by_id(self, stock_id: int) -> Optional[CatalogStock]:
+        stock = self._by_id.get(stock_id)
+        self._count(stock)
+        return stock
+
+    def known_symbols(self, symbols: Iterable[str]) -> Set[str]:
+        """Subset of the (upper-case) symbols present in the catalog"""
+        return {symbol for symbol in symbols if symbol in self._by_symbol}
+
+    def all_stocks(self) -> List[CatalogStock]:
+        """Every stock, ordered by id"""
+        return [self._by_id[stock_id] for stock_id in self._ids]
+
+    def stocks_after(self, after_id: Optional[int], limit: int) -> List[CatalogStock]:
+        """Up to `limit` stocks with an id greater than after_id, ordered by id"""
+        start = bisect.bisect_right(self._ids, after_id) if after_id is not None else 0
+        return [self._by_id[stock_id] for stock_id in self._ids[start:start + limit]]
+
+    def search(self, query: str, limit: int) -> List[CatalogStock]:
+        """Ranked symbol/name search over the catalog"""
+        return [self._by_id[stock_id] for stock_id in self._search_index.search(query, limit)]
+
+    def _count(self, stock: Optional[CatalogStock]) -> None:
+        if stock is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+    def put(self, stock: Stock) -> None:
+        """Apply a committed insert/update in this worker without waiting for the next version check"""
+        previous = self._by_id.get(stock.id)
+        if previous is not None and previous.symbol != stock.symbol:
+            self._by_symbol.pop(previous.symbol, None)
+        cached = CatalogStock.from_model(stock)
+        self._by_id[cached.id] = cached
+        self._by_symbol[cached.symbol] = cached
+        self._search_index.add(cached.id, cached.symbol, cached.name)
+        if previous is None:
+            bisect.insort(self._ids, cached.id)
+
+    def remove(self, stock_id: int) -> None:
+        """Apply a committed delete in this worker"""
+        stock = self._by_id.pop(stock_id, None)
+        if stock is not None:
+            self._by_symbol.pop(stock.symbol, None)
+            del self._ids[bisect.bisect_left(self._ids, stock_id)]
+            self._search_index.remove(stock_id)
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.version,
+            "stocks": len(self._by_id),
+            "loads": self.loads,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global instance
+stock_catalog = StockCatalog()
@@ -0,0 +1,125 @@
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+
+# Longest n-gram kept in the index; longer queries intersect their trigrams
+MAX_GRAM = 3
+
+# Ranking tiers, best first
+RANK_EXACT_SYMBOL = 0
+RANK_SYMBOL_PREFIX = 1
+RANK_NAME_PREFIX = 2
+RANK_NAME_WORD_PREFIX = 3
+RANK_SYMBOL_SUBSTRING = 4
+RANK_NAME_SUBSTRING = 5
+
+
+def _grams(text: str) -> Set[str]:
+    """Every substring of length 1..MAX_GRAM"""
+    return {
+        text[start:start + size]
+        for size in range(1, MAX_GRAM + 1)
+        for start in range(len(text) - size + 1)
+    }
+
+
+def _prefixes(*words: str) -> Set[str]:
+    """Every prefix of each word"""
+    return {word[:end] for word in words for end in range(1, len(word) + 1)}
+
+
+def rank_match(query: str, symbol: str, name: str) -> Optional[int]:
+    """Ranking tier of one stock for an upper-cased query, or None when it does not match"""
+    if symbol == query:
+        return RANK_EXACT_SYMBOL
+    if symbol.startswith(query):
+        return RANK_SYMBOL_PREFIX
+    if name.startswith(query):
+        return RANK_NAME_PREFIX
+    if f" {query}" in name:
+        return RANK_NAME_WORD_PREFIX
+    if query in symbol:
+        return RANK_SYMBOL_SUBSTRING
+    if query in name:
+        return RANK_NAME_SUBSTRING
+    return None
+
+
+class StockSearchIndex:
+    """
+    Case-insensitive substring index over stock symbols and names.
+    Queries of up to MAX_GRAM characters are a single dictionary lookup; longer
+    queries intersect the posting sets of their trigrams and verify the survivors.
+    Symbol and name-word prefixes are indexed separately, so autocomplete queries with
+    enough prefix matches never rank the (much larger) substring candidate set.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._symbol_prefixes: Dict[str, Set[int]] = {}
+        self._word_prefixes: Dict[str, Set[int]] = {}
+        self._entries: Dict[int, Tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, stock_id: int, symbol: str, name: str) -> None:
+        if stock_id in self._entries:
+            self.remove(stock_id)
+        symbol, name = symbol.upper(), name.upper()
+        self._entries[stock_id] = (symbol, name)
+        for gram in _grams(symbol) | _grams(name):
+            self._postings.setdefault(gram, set()).add(stock_id)
+        for prefix in _prefixes(symbol):
+            self._symbol_prefixes.setdefault(prefix, set()).add(stock_id)
+        for prefix in _prefixes(*name.split()):
+            self._word_prefixes.setdefault(prefix, set()).add(stock_id)
+
+    def remove(self, stock_id: int) -> None:
+        entry = self._entries.pop(stock_id, None)
+        if entry is None:
+            return
+        symbol, name = entry
+        self._discard(self._postings, _grams(symbol) | _grams(name), stock_id)
+        self._discard(self._symbol_prefixes, _prefixes(symbol), stock_id)
+        self._discard(self._word_prefixes, _prefixes(*name.split()), stock_id)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], keys: Set[str], stock_id: int) -> None:
+        for key in keys:
+            postings = index.get(key)
+            if postings is not None:
+                postings.discard(stock_id)
+                if not postings:
+                    del index[key]
+
+    def _candidates(self, query: str) -> Set[int]:
+        if len(query) <= MAX_GRAM:
+            return self._postings.get(query, set())
+        postings = sorted(
+            (self._postings.get(query[start:start + MAX_GRAM], set()) for start in range(len(query) - MAX_GRAM + 1)),
+            key=len
+        )
+        return set.intersection(*postings) if postings[0] else set()
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Ids of the best `limit` matches: exact symbol, symbol prefix, name prefix, then substring matches"""
+        query = query.strip().upper()
+        if not query:
+            return []
+
+        # Symbol prefix matches outrank name word prefixes, which outrank other substrings;
+        # only widen the candidate set when the better tiers cannot fill the page
+        candidates = self._symbol_prefixes.get(query, set())
+        if len(candidates) < limit:
+            candidates = candidates | self._word_prefixes.get(query, set())
+        if len(candidates) < limit:
+            candidates = self._candidates(query)
+
+        ranked = []
+        for stock_id in candidates:
+            symbol, name = self._entries[stock_id]
+            rank = rank_match(query, symbol, name)
+            if rank is not None:
+                ranked.append((rank, len(symbol), symbol, stock_id))
+
+        return [stock_id for _, _, _, stock_id in heapq.nsmallest(limit, ranked)]
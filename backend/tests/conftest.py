@@ -0,0 +1,141 @@
+"""
+Shared fixtures for the API tests.
+
+Tests that touch the database need a disposable PostgreSQL database: its public
+schema is rebuilt from the Alembic migrations at the start of a run and every
+table is emptied before each test. Without TEST_DATABASE_URL they are skipped.
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost/dashboard_test python -m pytest tests
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import NullPool
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# The application reads its configuration at import time; the default engines are never connected
+os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL or "postgresql://localhost/unused")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("FINNHUB_API_KEY", "test")
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from auth import create_access_token, get_password_hash
+from database import get_async_database_url, get_db
+from main import app
+from models import Base, User
+from replica_router import get_read_db
+
+
+class QueryCounter:
+    """Statements sent to the database while counting"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.active = False
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @contextmanager
+    def counting(self) -> Iterator["QueryCounter"]:
+        self.statements = []
+        self.active = True
+        try:
+            yield self
+        finally:
+            self.active = False
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def database_schema():
+    """Recreate the schema through the Alembic migrations once per test run"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    engine = create_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    with engine.connect() as connection:
+        connection.execute(text("DROP SCHEMA public CASCADE"))
+        connection.execute(text("CREATE SCHEMA public"))
+        config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+        config.attributes["connection"] = connection
+        config.attributes["configure_logger"] = False
+        command.upgrade(config, "head")
+        connection.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+async def db_engine(database_schema):
+    """Async engine on the test database, with every table emptied"""
+    engine = create_async_engine(get_async_database_url(TEST_DATABASE_URL), poolclass=NullPool)
+    # catalog_versions keeps the rows the migrations seeded
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables if table.name != "catalog_versions")
+    async with engine.begin() as connection:
+        await connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    return async_sessionmaker(db_engine, expire_on_commit=False, autoflush=False)
+
+
+@pytest.fixture
+def query_counter(db_engine) -> Iterator[QueryCounter]:
+    """Counts statements on the test engine inside `with query_counter.counting():`"""
+    counter = QueryCounter()
+    event.listen(db_engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(db_engine.sync_engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+async def client(session_factory):
+    """HTTP client for the app, with primary and read sessions on the test database"""
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http_client:
+        yield http_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def user(session_factory) -> User:
+    async with session_factory() as db:
+        user = User(email="trader@example.com", username="trader", hashed_password=get_password_hash("secret"))
+        db.add(user)
+        await db.commit()
+        return user
+
+
+@pytest.fixture
+def auth_headers(user) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
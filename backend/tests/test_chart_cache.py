@@ -0,0 +1,28 @@
+"""Chart series cache: LRU bound, hit/miss counters and clearing"""
+
+from bar_service import ChartSeriesCache
+
+
+def test_lru_evicts_the_least_recently_used_series():
+    cache = ChartSeriesCache(max_entries=2)
+    cache.set(("A", "1W", 1), [1.0])
+    cache.set(("B", "1W", 1), [2.0])
+    assert cache.get(("A", "1W", 1)) == [1.0]
+
+    cache.set(("C", "1W", 1), [3.0])
+
+    assert cache.get(("B", "1W", 1)) is None
+    assert cache.get(("A", "1W", 1)) == [1.0]
+    assert cache.get(("C", "1W", 1)) == [3.0]
+
+
+def test_stats_count_hits_misses_and_clears():
+    cache = ChartSeriesCache(max_entries=10)
+    cache.set(("A", "1Y", 7), [1.0])
+    cache.get(("A", "1Y", 7))
+    cache.get(("A", "1Y", 8))
+    cache.clear()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["clears"], stats["entries"]) == (1, 1, 1, 0)
+    assert stats["hit_ratio"] == 0.5
@@ -0,0 +1,50 @@
+"""The fake provider keeps a profile per provider and serves Yahoo bars the API can store"""
+
+import httpx
+import pytest
+import fake_market_server
+from fake_market_server import FakeMarketConfig, PROVIDERS, app
+from market_data_service import market_data_service
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def fake_client():
+    for provider in PROVIDERS:
+        fake_market_server.apply_config(provider, FakeMarketConfig(latency_distribution="fixed", latency_ms=0, tail_rate=0))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://fake") as http_client:
+        yield http_client
+
+
+async def test_provider_profiles_are_independent(fake_client):
+    response = await fake_client.put("/_control/config/alpha_vantage", json={
+        "latency_distribution": "fixed", "latency_ms": 0, "error_rate": 1,
+    })
+
+    assert response.status_code == 200, response.text
+    configs = (await fake_client.get("/_control/config")).json()
+    assert configs["alpha_vantage"]["error_rate"] == 1
+    assert configs["yahoo"]["error_rate"] == 0
+    alpha_vantage = await fake_client.get("/query", params={"function": "GLOBAL_QUOTE", "symbol": "AAPL"})
+    yahoo = await fake_client.get("/v8/finance/chart/AAPL")
+    assert (alpha_vantage.status_code, yahoo.status_code) == (500, 200)
+
+
+async def test_unknown_provider_is_rejected(fake_client):
+    response = await fake_client.put("/_control/config/bloomberg", json={})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("interval,history_range,step", [("1h", "1mo", 3600), ("1d", "5y", 86400)])
+async def test_chart_bars_follow_interval_and_range(fake_client, interval, history_range, step):
+    response = await fake_client.get("/v8/finance/chart/AAPL", params={"interval": interval, "range": history_range})
+
+    assert response.status_code == 200, response.text
+    bars = market_data_service._parse_yahoo_bars(response.json())
+    timestamps = [bar["ts"].timestamp() for bar in bars]
+    assert len(bars) > 20
+    assert all(later > earlier for earlier, later in zip(timestamps, timestamps[1:]))
+    assert all((later - earlier) % step == 0 for earlier, later in zip(timestamps, timestamps[1:]))
+    assert max(timestamps) - min(timestamps) <= fake_market_server.YAHOO_RANGES[history_range]
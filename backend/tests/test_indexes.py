@@ -0,0 +1,86 @@
+"""EXPLAIN the per-user hot queries against the migrated schema and check they use its indexes"""
+
+from typing import Dict, List
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from models import Position, TradeHistory, Watchlist
+
+pytestmark = pytest.mark.anyio
+
+USERS = 200
+STOCKS = 50
+TRADES_PER_USER = 100
+
+
+@pytest.fixture
+async def populated(db_engine):
+    """Enough rows, with fresh statistics, that the planner prefers an index to a sequential scan"""
+    async with db_engine.begin() as connection:
+        await connection.execute(text(
+            "INSERT INTO users (email, username, hashed_password, is_active, is_verified, created_at) "
+            "SELECT 'user' || n || '@example.com', 'user' || n, 'x', true, false, now() FROM generate_series(1, :users) n"
+        ), {"users": USERS})
+        await connection.execute(text(
+            "INSERT INTO stocks (symbol, name, currency, created_at, updated_at) "
+            "SELECT 'S' || n, 'Stock ' || n, 'USD', now(), now() FROM generate_series(1, :stocks) n"
+        ), {"stocks": STOCKS})
+        await connection.execute(text(
+            "INSERT INTO positions (user_id, stock_id, quantity, purchase_price, purchase_date, created_at, updated_at) "
+            "SELECT u, s, 10, 100, now(), now(), now() FROM generate_series(1, :users) u, generate_series(1, :stocks) s"
+        ), {"users": USERS, "stocks": STOCKS})
+        await connection.execute(text(
+            "INSERT INTO watchlist (user_id, stock_id, date_added) "
+            "SELECT u, s, now() FROM generate_series(1, :users) u, generate_series(1, :stocks) s"
+        ), {"users": USERS, "stocks": STOCKS})
+        await connection.execute(text(
+            "INSERT INTO trade_history (user_id, stock_id, trade_type, quantity, price_per_share, total_amount, trade_date, created_at) "
+            "SELECT u, 1 + t % :stocks, 'BUY', 1, 100, 100, now() - t * interval '1 hour', now() "
+            "FROM generate_series(1, :users) u, generate_series(1, :trades) t"
+        ), {"users": USERS, "stocks": STOCKS, "trades": TRADES_PER_USER})
+        await connection.execute(text("ANALYZE"))
+    return db_engine
+
+
+async def explain(engine, query) -> List[Dict]:
+    """Every node of the query's plan"""
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    async with engine.connect() as connection:
+        plan = (await connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+
+    nodes = []
+    pending = [plan[0]["Plan"]]
+    while pending:
+        node = pending.pop()
+        nodes.append(node)
+        pending.extend(node.get("Plans", []))
+    return nodes
+
+
+def index_names(nodes: List[Dict]) -> set:
+    return {node["Index Name"] for node in nodes if "Index Name" in node}
+
+
+async def test_position_lookup_uses_user_stock_index(populated):
+    nodes = await explain(populated, select(Position).where(Position.user_id == 7, Position.stock_id == 3))
+
+    assert "uq_positions_user_id_stock_id" in index_names(nodes)
+
+
+async def test_watchlist_lookup_uses_user_stock_index(populated):
+    nodes = await explain(populated, select(Watchlist).where(Watchlist.user_id == 7, Watchlist.stock_id == 3))
+
+    assert "uq_watchlist_user_id_stock_id" in index_names(nodes)
+
+
+async def test_trade_history_page_reads_the_index_in_order(populated):
+    query = select(TradeHistory).where(TradeHistory.user_id == 7).order_by(
+        TradeHistory.trade_date.desc(), TradeHistory.id.desc()
+    ).limit(50)
+
+    nodes = await explain(populated, query)
+
+    assert "ix_trade_history_user_id_trade_date_id" in index_names(nodes)
+    # The index already returns rows newest first
+    assert not any(node["Node Type"] == "Sort" for node in nodes)
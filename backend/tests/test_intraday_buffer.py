@@ -0,0 +1,115 @@
+"""Intraday ring buffer: wraparound, the monotonic prefix search and the 1D session boundary"""
+
+import random
+
+import pytest
+from intraday_buffer import IntradayRingBuffer, IntradayStore, downsample_last, session_start
+
+DAY = 86400
+# 2023-11-15 00:00 UTC
+MIDNIGHT = 1_700_006_400.0
+
+
+def linear_skip(buffer: IntradayRingBuffer, cutoff: float) -> int:
+    """Reference: count the expired prefix one tick at a time"""
+    timestamps = [buffer._timestamps[(buffer._start + offset) % buffer.capacity] for offset in range(len(buffer))]
+    return sum(1 for timestamp in timestamps if timestamp < cutoff)
+
+
+def test_append_overwrites_the_oldest_once_full():
+    buffer = IntradayRingBuffer(capacity=4)
+    for tick in range(6):
+        buffer.append(float(tick), float(tick * 10))
+
+    assert len(buffer) == 4
+    assert list(buffer.prices_since(0)) == [20.0, 30.0, 40.0, 50.0]
+    assert buffer.latest() == 5.0
+
+
+def test_out_of_order_ticks_are_dropped():
+    buffer = IntradayRingBuffer(capacity=4)
+    buffer.append(10.0, 1.0)
+    buffer.append(5.0, 2.0)
+
+    assert list(buffer.prices_since(0)) == [1.0]
+
+
+@pytest.mark.parametrize("appended", [0, 1, 3, 7, 8, 9, 13, 20])
+def test_prefix_search_matches_a_linear_scan_across_wraparound(appended):
+    buffer = IntradayRingBuffer(capacity=8)
+    for tick in range(appended):
+        buffer.append(float(tick * 2), float(tick))
+
+    for cutoff in [-1.0, *[tick - 0.5 for tick in range(0, appended * 2 + 2)], float(appended * 2 + 5)]:
+        assert buffer._skip_before(cutoff) == linear_skip(buffer, cutoff), cutoff
+        expected = [buffer._prices[(buffer._start + offset) % 8] for offset in range(linear_skip(buffer, cutoff), len(buffer))]
+        assert list(buffer.prices_since(cutoff)) == expected
+
+
+def test_prefix_search_with_repeated_timestamps():
+    rng = random.Random(7)
+    buffer = IntradayRingBuffer(capacity=16)
+    timestamp = 0.0
+    for _ in range(40):
+        timestamp += rng.choice([0.0, 1.0, 2.0])
+        buffer.append(timestamp, 1.0)
+
+    for cutoff in range(int(timestamp) + 2):
+        assert buffer._skip_before(float(cutoff)) == linear_skip(buffer, float(cutoff))
+
+
+def test_span_since():
+    buffer = IntradayRingBuffer(capacity=4)
+    assert buffer.span_since(0) == 0.0
+    for tick in range(6):
+        buffer.append(float(tick * 100), 1.0)
+
+    assert buffer.span_since(0) == 300.0
+    assert buffer.span_since(350) == 100.0
+    assert buffer.span_since(1000) == 0.0
+
+
+def test_downsample_last_keeps_the_last_value_of_each_bucket():
+    assert downsample_last([1.0, 2.0, 3.0, 4.0, 5.0, 6.0], 3) == [2.0, 4.0, 6.0]
+    assert downsample_last([1.0, 2.0], 5) == [1.0, 2.0]
+
+
+def test_session_start_is_the_utc_day():
+    assert session_start(MIDNIGHT + 15 * 3600) == MIDNIGHT
+    assert session_start(MIDNIGHT) == MIDNIGHT
+
+
+def test_series_shows_only_the_latest_session():
+    store = IntradayStore(capacity=1000, min_coverage_seconds=3600)
+    # Yesterday afternoon at 1, today 14:00-16:00 at 2
+    for minute in range(0, 240, 5):
+        store.record("abc", 1.0, MIDNIGHT - DAY + 14 * 3600 + minute * 60)
+    for minute in range(0, 120, 5):
+        store.record("abc", 2.0, MIDNIGHT + 14 * 3600 + minute * 60)
+
+    assert store.series("ABC", 12) == [2.0] * 12
+
+
+def test_series_needs_coverage_and_points_within_the_session():
+    store = IntradayStore(capacity=1000, min_coverage_seconds=3600)
+    for minute in range(0, 50, 5):
+        store.record("ABC", 1.0, MIDNIGHT + 14 * 3600 + minute * 60)
+
+    assert store.series("ABC", 5) is None  # 45 minutes of ticks
+    for minute in range(50, 70, 5):
+        store.record("ABC", 1.0, MIDNIGHT + 14 * 3600 + minute * 60)
+    assert store.series("ABC", 5) == [1.0] * 5
+    assert store.series("ABC", 50) is None  # fewer ticks than points
+    assert store.series("XYZ", 5) is None
+
+
+def test_store_evicts_the_least_recently_updated_symbol():
+    store = IntradayStore(capacity=10, max_symbols=2)
+    store.record("A", 1.0, 1.0)
+    store.record("B", 1.0, 1.0)
+    store.record("A", 1.0, 2.0)
+    store.record("C", 1.0, 1.0)
+
+    assert store.stats()["symbols"] == 2
+    assert store.evictions == 1
+    assert "B" not in store._buffers
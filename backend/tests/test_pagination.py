@@ -0,0 +1,72 @@
+"""Keyset cursors round-trip and anything not issued for the same list is rejected with 400"""
+
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from pagination import build_page, decode_cursor, encode_cursor
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trips_through_the_parsers():
+    created_at = datetime(2024, 3, 1, 12, 30, 15, 250000)
+    cursor = encode_cursor("trades", created_at.isoformat(), 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "trades", datetime.fromisoformat, int) == (created_at, 42)
+
+
+def test_missing_cursor_is_the_first_page():
+    assert decode_cursor(None, "trades", int) is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor!",
+    "%%%%",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    raw_cursor([1, 2]),
+    raw_cursor({"k": "trades"}),
+    raw_cursor({"v": [1]}),
+    raw_cursor({"k": "trades", "v": 7}),
+    raw_cursor({"k": "trades", "v": [1, 2]}),
+    raw_cursor({"k": "stocks", "v": [1]}),
+    raw_cursor({"k": "trades", "v": ["one"]}),
+    raw_cursor({"k": "trades", "v": [None]}),
+])
+def test_tampered_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor, "trades", int)
+
+    assert excinfo.value.status_code == 400
+
+
+def test_cursor_from_another_list_is_rejected():
+    cursor = encode_cursor("watchlist", 5)
+
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, "positions", int)
+
+
+def test_truncated_cursor_is_rejected():
+    cursor = encode_cursor("trades", "2024-03-01T12:30:15", 42)
+
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor[:-3], "trades", datetime.fromisoformat, int)
+
+
+def test_build_page_issues_a_cursor_only_when_more_rows_exist():
+    rows = [{"id": i} for i in range(1, 5)]
+
+    page = build_page(rows, 3, "ids", lambda row: (row["id"],))
+    last = build_page(rows[:3], 3, "ids", lambda row: (row["id"],))
+
+    assert [row["id"] for row in page["items"]] == [1, 2, 3]
+    assert decode_cursor(page["next_cursor"], "ids", int) == (3,)
+    assert last["next_cursor"] is None
+    assert build_page([], 3, "ids", lambda row: (row["id"],)) == {"items": [], "next_cursor": None}
@@ -0,0 +1,105 @@
+"""Every change to a position's quantity is a recorded trade that keeps the open lots in step"""
+
+import pytest
+import routes.positions as positions_routes
+from sqlalchemy import func, select
+from models import Position, Stock, StockTradeTotals, TradeHistory, TradeLot
+from stock_catalog import stock_catalog
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def stock(session_factory) -> Stock:
+    async with session_factory() as db:
+        stock = Stock(symbol="LOTS", name="Lot Test Corp")
+        db.add(stock)
+        await db.commit()
+    stock_catalog.put(stock)
+    yield stock
+    stock_catalog.remove(stock.id)
+
+
+async def buy(client, auth_headers, stock, quantity: float, price: float) -> dict:
+    response = await client.post("/positions/", headers=auth_headers, json={
+        "stock_id": stock.id, "quantity": quantity, "purchase_price": price,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def open_quantity(session_factory, user, stock) -> float:
+    async with session_factory() as db:
+        return await db.scalar(select(func.coalesce(func.sum(TradeLot.remaining_quantity), 0)).where(
+            TradeLot.user_id == user.id, TradeLot.stock_id == stock.id
+        ))
+
+
+async def test_delete_records_a_sale_of_every_share(client, session_factory, user, auth_headers, stock):
+    await buy(client, auth_headers, stock, 10, 100.0)
+    position = await buy(client, auth_headers, stock, 5, 130.0)
+
+    response = await client.delete(f"/positions/{position['id']}", headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    assert await open_quantity(session_factory, user, stock) == 0
+    async with session_factory() as db:
+        sale = await db.scalar(select(TradeHistory).where(TradeHistory.trade_type == "SELL"))
+        totals = await db.get(StockTradeTotals, (user.id, stock.id))
+    assert sale.quantity == 15
+    assert totals.sell_count == 1 and totals.sell_quantity == 15
+
+
+async def test_put_rejects_quantity_changes(client, session_factory, user, auth_headers, stock):
+    position = await buy(client, auth_headers, stock, 10, 100.0)
+
+    response = await client.put(f"/positions/{position['id']}", headers=auth_headers, json={"quantity": 25})
+
+    assert response.status_code == 400, response.text
+    assert await open_quantity(session_factory, user, stock) == 10
+
+
+async def test_put_still_updates_the_purchase_price(client, auth_headers, stock):
+    position = await buy(client, auth_headers, stock, 10, 100.0)
+
+    response = await client.put(f"/positions/{position['id']}", headers=auth_headers, json={
+        "quantity": 10, "purchase_price": 90.0,
+    })
+
+    assert response.status_code == 200, response.text
+    assert response.json()["purchase_price"] == 90.0
+
+
+async def test_batch_order_records_lots_and_totals(client, session_factory, user, auth_headers, stock):
+    response = await client.post("/positions/batch", headers=auth_headers, json={"legs": [
+        {"side": "BUY", "stock_id": stock.id, "quantity": 10, "price": 100.0},
+        {"side": "SELL", "stock_id": stock.id, "quantity": 4, "price": 120.0},
+    ]})
+
+    assert response.status_code == 200, response.text
+    assert [result["position_quantity"] for result in response.json()["results"]] == [10, 6]
+    assert response.json()["results"][1]["realized_pnl"] == 80.0
+    assert await open_quantity(session_factory, user, stock) == 6
+    async with session_factory() as db:
+        totals = await db.get(StockTradeTotals, (user.id, stock.id))
+    assert (totals.buy_count, totals.sell_count, totals.sell_quantity) == (1, 1, 4)
+
+
+async def test_batch_order_conflicting_with_a_concurrent_first_buy_returns_409(
+        client, session_factory, user, auth_headers, stock, monkeypatch):
+    record_lots = positions_routes.record_lots
+
+    async def record_lots_after_a_concurrent_buy(db, trades):
+        # Another request opens the position between our lock and our flush
+        async with session_factory() as other:
+            other.add(Position(user_id=user.id, stock_id=stock.id, quantity=1, purchase_price=100.0))
+            await other.commit()
+        await record_lots(db, trades)
+
+    monkeypatch.setattr(positions_routes, "record_lots", record_lots_after_a_concurrent_buy)
+    response = await client.post("/positions/batch", headers=auth_headers, json={"legs": [
+        {"side": "BUY", "stock_id": stock.id, "quantity": 10, "price": 100.0},
+    ]})
+
+    assert response.status_code == 409, response.text
+    assert await open_quantity(session_factory, user, stock) == 0
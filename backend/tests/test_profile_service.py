@@ -0,0 +1,56 @@
+"""Concurrent profile misses share one FinnHub call, outside the quote cache"""
+
+import asyncio
+
+import pytest
+import profile_service
+from finnhub_service import finnhub_service
+from quote_cache import quote_cache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_fetches_share_one_call(monkeypatch):
+    calls = []
+
+    async def company_profile2(symbol):
+        calls.append(symbol)
+        await asyncio.sleep(0.01)
+        return {"ticker": symbol}
+
+    monkeypatch.setattr(finnhub_service, "company_profile2", company_profile2)
+    stats_before = quote_cache.stats()
+
+    results = await asyncio.gather(*(profile_service.fetch_profile_data("PRFL") for _ in range(5)))
+
+    assert results == [{"ticker": "PRFL"}] * 5
+    assert calls == ["PRFL"]
+    assert profile_service._inflight == {}
+    assert quote_cache.stats() == stats_before
+
+
+async def test_a_cancelled_caller_does_not_cancel_the_shared_call(monkeypatch):
+    async def company_profile2(symbol):
+        await asyncio.sleep(0.02)
+        return {"ticker": symbol}
+
+    monkeypatch.setattr(finnhub_service, "company_profile2", company_profile2)
+    first = asyncio.ensure_future(profile_service.fetch_profile_data("PRFL"))
+    second = asyncio.ensure_future(profile_service.fetch_profile_data("PRFL"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == {"ticker": "PRFL"}
+
+
+async def test_errors_reach_every_caller_and_are_not_kept(monkeypatch):
+    async def company_profile2(symbol):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(finnhub_service, "company_profile2", company_profile2)
+
+    results = await asyncio.gather(*(profile_service.fetch_profile_data("PRFL") for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert profile_service._inflight == {}
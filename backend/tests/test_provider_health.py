@@ -0,0 +1,222 @@
+"""Circuit breaker state transitions and hedged provider calls"""
+
+import asyncio
+
+import pytest
+import market_data_service as market_data_module
+import provider_health
+from market_data_service import MarketDataService
+from provider_health import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LatencyTracker
+from rate_limiter import ALPHA_VANTAGE, YAHOO
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    """Stands in for the time module so the reset timeout can be stepped by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(provider_health, "time", clock)
+    return clock
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+    assert breaker.stats()["times_opened"] == 1
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_breaker_lets_one_trial_through_after_the_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30)
+    open_breaker(breaker)
+
+    clock.now += 29
+    assert breaker.is_open()
+    clock.now += 1
+    assert not breaker.is_open()
+
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+
+
+def test_successful_trial_closes_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30)
+    open_breaker(breaker)
+    clock.now += 30
+    breaker.allow_request()
+
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+    assert breaker.allow_request()
+
+
+def test_failed_trial_reopens_for_a_full_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30)
+    open_breaker(breaker)
+    clock.now += 30
+    breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+    clock.now += 29
+    assert not breaker.allow_request()
+
+
+def test_released_trial_frees_the_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30)
+    open_breaker(breaker)
+    clock.now += 30
+    breaker.allow_request()
+
+    breaker.release()
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_latency_percentiles_over_the_window():
+    latency = LatencyTracker(max_samples=100)
+    assert latency.percentile(95) is None
+
+    for millis in range(1, 201):
+        latency.record(millis / 1000)
+
+    # Only the last 100 samples (0.101s..0.200s) are kept
+    assert latency.percentile(0) == pytest.approx(0.101)
+    assert latency.percentile(50) == pytest.approx(0.151)
+    assert latency.percentile(95) == pytest.approx(0.195)
+    assert latency.stats()["samples"] == 100
+
+
+@pytest.fixture
+def service(monkeypatch) -> MarketDataService:
+    monkeypatch.setattr(market_data_module, "MARKET_DATA_HEDGE_MIN_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(market_data_module, "MARKET_DATA_HEDGE_MAX_DELAY_SECONDS", 0.05)
+    return MarketDataService()
+
+
+def fake_providers(service: MarketDataService, monkeypatch, **behaviour) -> tuple:
+    """Replace _call_provider with fakes given as provider=(delay_seconds, result); returns (calls, cancelled)"""
+    calls = []
+    cancelled = []
+
+    async def call_provider(provider, symbol, priority):
+        calls.append(provider)
+        delay, result = behaviour[provider]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(provider)
+            raise
+        return result and {**result, "provider": provider}
+
+    monkeypatch.setattr(service, "_call_provider", call_provider)
+    return calls, cancelled
+
+
+async def test_fast_primary_is_not_hedged(service, monkeypatch):
+    calls, _ = fake_providers(service, monkeypatch, **{
+        ALPHA_VANTAGE: (0, {"current_price": 1.0}),
+        YAHOO: (0, {"current_price": 2.0}),
+    })
+
+    result = await service._fetch_hedged("AAPL", ALPHA_VANTAGE, YAHOO, priority=0)
+
+    assert result["provider"] == ALPHA_VANTAGE
+    assert calls == [ALPHA_VANTAGE]
+    assert service.hedges_fired == 0
+
+
+async def test_failed_primary_falls_through_without_hedging(service, monkeypatch):
+    calls, _ = fake_providers(service, monkeypatch, **{
+        ALPHA_VANTAGE: (0, None),
+        YAHOO: (0, {"current_price": 2.0}),
+    })
+
+    result = await service._fetch_hedged("AAPL", ALPHA_VANTAGE, YAHOO, priority=0)
+
+    assert result["provider"] == YAHOO
+    assert calls == [ALPHA_VANTAGE, YAHOO]
+    assert service.hedges_fired == 0
+
+
+async def test_slow_primary_is_hedged_and_the_loser_cancelled(service, monkeypatch):
+    _, cancelled = fake_providers(service, monkeypatch, **{
+        ALPHA_VANTAGE: (1, {"current_price": 1.0}),
+        YAHOO: (0, {"current_price": 2.0}),
+    })
+
+    result = await service._fetch_hedged("AAPL", ALPHA_VANTAGE, YAHOO, priority=0)
+    await asyncio.sleep(0)
+
+    assert result["provider"] == YAHOO
+    assert (service.hedges_fired, service.hedge_wins) == (1, 1)
+    assert cancelled == [ALPHA_VANTAGE]
+
+
+async def test_hedged_primary_can_still_win(service, monkeypatch):
+    fake_providers(service, monkeypatch, **{
+        ALPHA_VANTAGE: (0.07, {"current_price": 1.0}),
+        YAHOO: (0.07, None),
+    })
+
+    result = await service._fetch_hedged("AAPL", ALPHA_VANTAGE, YAHOO, priority=0)
+
+    assert result["provider"] == ALPHA_VANTAGE
+    assert (service.hedges_fired, service.hedge_wins) == (1, 0)
+
+
+async def test_hedge_returns_none_when_both_fail(service, monkeypatch):
+    fake_providers(service, monkeypatch, **{
+        ALPHA_VANTAGE: (0.07, None),
+        YAHOO: (0, None),
+    })
+
+    assert await service._fetch_hedged("AAPL", ALPHA_VANTAGE, YAHOO, priority=0) is None
+
+
+def test_hedge_delay_follows_the_primary_p95_within_bounds(service):
+    latency = service.provider_health[ALPHA_VANTAGE].latency
+    assert service._hedge_delay(ALPHA_VANTAGE) == 0.05
+
+    latency.record(0.001)
+    assert service._hedge_delay(ALPHA_VANTAGE) == 0.01
+
+    latency.record(0.03)
+    assert service._hedge_delay(ALPHA_VANTAGE) == pytest.approx(0.03)
+
+    latency.record(1.0)
+    assert service._hedge_delay(ALPHA_VANTAGE) == 0.05
@@ -0,0 +1,59 @@
+"""The list and summary endpoints load each row's stock in the same query, so their query count does not grow with the rows"""
+
+import pytest
+from models import Position, Stock, TradeHistory, Watchlist
+
+pytestmark = pytest.mark.anyio
+
+# Auth lookup plus one query for the rows (the trade history summary also reads the totals)
+MAX_QUERIES = 3
+
+ENDPOINTS = [
+    "/positions/",
+    "/positions/portfolio",
+    "/watchlist/",
+    "/watchlist/summary",
+    "/trade-history/",
+    "/trade-history/summary",
+]
+
+
+async def add_holdings(session_factory, user, count: int, offset: int = 0) -> None:
+    """Give the user a position, a watchlist entry and a trade in `count` new stocks"""
+    async with session_factory() as db:
+        for index in range(offset, offset + count):
+            stock = Stock(symbol=f"T{index}", name=f"Test Stock {index}")
+            db.add_all([
+                Position(user_id=user.id, stock=stock, quantity=10, purchase_price=100.0),
+                Watchlist(user_id=user.id, stock=stock),
+                TradeHistory(user_id=user.id, stock=stock, trade_type="BUY", quantity=10,
+                             price_per_share=100.0, total_amount=1000.0),
+            ])
+        await db.commit()
+
+
+async def count_queries(client, query_counter, auth_headers, endpoint: str) -> int:
+    with query_counter.counting():
+        response = await client.get(endpoint, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return query_counter.count
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+async def test_query_count_does_not_grow_with_rows(endpoint, client, session_factory, query_counter, user, auth_headers):
+    await add_holdings(session_factory, user, 2)
+    few = await count_queries(client, query_counter, auth_headers, endpoint)
+
+    await add_holdings(session_factory, user, 40, offset=2)
+    many = await count_queries(client, query_counter, auth_headers, endpoint)
+
+    assert many == few, query_counter.statements
+    assert many <= MAX_QUERIES, query_counter.statements
+
+
+async def test_listed_rows_include_their_stock(client, session_factory, user, auth_headers):
+    await add_holdings(session_factory, user, 3)
+
+    response = await client.get("/positions/", headers=auth_headers)
+
+    assert [item["stock"]["symbol"] for item in response.json()["items"]] == ["T0", "T1", "T2"]
@@ -0,0 +1,167 @@
+"""QuoteCache expiry, LRU bound and single-flight coalescing of misses"""
+
+import asyncio
+
+import pytest
+import quote_cache as quote_cache_module
+from quote_cache import QuoteCache
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    """Stands in for the time module so expiry can be stepped by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(quote_cache_module, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = QuoteCache(ttl_seconds=15)
+    cache.set("market:AAPL", {"current_price": 1.0})
+
+    clock.now += 14.9
+    assert cache.get("market:AAPL") == {"current_price": 1.0}
+
+    clock.now += 0.1
+    assert cache.get("market:AAPL") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_per_entry_ttl_overrides_the_default(clock):
+    cache = QuoteCache(ttl_seconds=15)
+    cache.set("market:AAPL", 1, ttl_seconds=60)
+
+    clock.now += 30
+    assert cache.get("market:AAPL") == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = QuoteCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_invalidate_drops_the_entry(clock):
+    cache = QuoteCache()
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+
+    assert cache.get("a") is None
+
+
+def test_listeners_see_stored_values_and_failures_are_contained(clock):
+    cache = QuoteCache()
+    seen = []
+
+    def broken(key, value):
+        raise RuntimeError("listener bug")
+
+    cache.add_listener(broken)
+    cache.add_listener(lambda key, value: seen.append((key, value)))
+    cache.set("a", 1)
+
+    assert seen == [("a", 1)]
+
+
+async def test_concurrent_misses_share_one_fetch():
+    cache = QuoteCache()
+    calls = []
+
+    async def fetcher():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"current_price": 1.0}
+
+    results = await asyncio.gather(*(cache.get_or_fetch("market:AAPL", fetcher) for _ in range(5)))
+
+    assert results == [{"current_price": 1.0}] * 5
+    assert len(calls) == 1
+    assert (cache.misses, cache.coalesced) == (1, 4)
+    assert await cache.get_or_fetch("market:AAPL", fetcher) == {"current_price": 1.0}
+    assert cache.hits == 1 and len(calls) == 1
+
+
+async def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = QuoteCache()
+    calls = []
+
+    async def fetcher():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(*(cache.get_or_fetch("k", fetcher) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.get("k") is None
+    assert cache.stats()["inflight"] == 0
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("k", fetcher)
+    assert len(calls) == 2
+
+
+async def test_empty_results_are_shared_but_not_cached():
+    cache = QuoteCache()
+
+    async def fetcher():
+        return {}
+
+    assert await cache.get_or_fetch("k", fetcher) == {}
+    assert cache.stats()["entries"] == 0
+
+
+async def test_a_cancelled_waiter_does_not_cancel_the_shared_fetch():
+    cache = QuoteCache()
+
+    async def fetcher():
+        await asyncio.sleep(0.02)
+        return 42
+
+    owner = asyncio.ensure_future(cache.get_or_fetch("k", fetcher))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(cache.get_or_fetch("k", fetcher))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    assert await owner == 42
+    assert cache.get("k") == 42
+
+
+async def test_cancelling_the_fetching_caller_releases_the_key():
+    cache = QuoteCache()
+
+    async def slow():
+        await asyncio.sleep(1)
+        return 1
+
+    owner = asyncio.ensure_future(cache.get_or_fetch("k", slow))
+    await asyncio.sleep(0)
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+    assert cache.stats()["inflight"] == 0
+
+    async def fast():
+        return 2
+
+    assert await cache.get_or_fetch("k", fast) == 2
@@ -0,0 +1,61 @@
+"""/stocks/{symbol}/quote reads the same quote cache entry the poller and the batch endpoint keep warm"""
+
+from datetime import datetime
+
+import httpx
+import pytest
+from auth import get_current_read_user
+from main import app
+from market_data_service import market_data_service
+from models import Stock, User
+from quote_cache import quote_cache
+from stock_catalog import stock_catalog
+
+pytestmark = pytest.mark.anyio
+
+QUOTE = {"current_price": 101.5, "change": 1.5, "change_percent": 1.5, "high": 102.0, "low": 99.0, "open": 100.0}
+
+
+@pytest.fixture
+async def quote_client():
+    """HTTP client signed in without a database"""
+    app.dependency_overrides[get_current_read_user] = lambda: User(id=1, email="trader@example.com", username="trader")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http_client:
+        yield http_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def stock():
+    now = datetime.utcnow()
+    stock = Stock(id=900001, symbol="QUOT", name="Quote Test Corp", currency="USD", created_at=now, updated_at=now)
+    stock_catalog.put(stock)
+    yield stock
+    stock_catalog.remove(stock.id)
+    quote_cache.invalidate("market:QUOT")
+
+
+async def test_quote_is_served_from_the_polled_entry(quote_client, stock, monkeypatch):
+    async def no_upstream(*args, **kwargs):
+        raise AssertionError("quote route went upstream on a warm cache")
+
+    monkeypatch.setattr(market_data_service, "_fetch_stock_market_data", no_upstream)
+    quote_cache.set("market:QUOT", QUOTE)
+
+    response = await quote_client.get("/stocks/QUOT/quote")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["current_price"] == 101.5
+    assert response.json()["direction"] == "up"
+
+
+async def test_quote_miss_warms_the_shared_entry(quote_client, stock, monkeypatch):
+    async def fetch(symbol, *args, **kwargs):
+        return dict(QUOTE, provider="yahoo")
+
+    monkeypatch.setattr(market_data_service, "_fetch_stock_market_data", fetch)
+
+    response = await quote_client.get("/stocks/QUOT/quote")
+
+    assert response.status_code == 200, response.text
+    assert quote_cache.get("market:QUOT")["current_price"] == 101.5
@@ -0,0 +1,113 @@
+"""Token bucket grants, priority ordering and rejection of waits the quota cannot cover"""
+
+import asyncio
+
+import pytest
+from rate_limiter import Priority, RateLimitExceeded, TokenBucketScheduler
+
+pytestmark = pytest.mark.anyio
+
+
+def scheduler(requests_per_minute: float = 6000, burst: float = 1, **kwargs) -> TokenBucketScheduler:
+    # 6000/min refills a token every 10ms, so queued requests drain quickly
+    return TokenBucketScheduler("test", requests_per_minute, burst=burst, **kwargs)
+
+
+async def test_burst_is_granted_without_waiting():
+    bucket = scheduler(burst=3)
+
+    for _ in range(3):
+        await bucket.acquire()
+
+    assert bucket.granted == 3
+    assert bucket.stats()["max_wait_seconds"] == 0
+    assert bucket.tokens < 1
+
+
+async def test_queued_requests_are_served_by_priority_then_arrival():
+    bucket = scheduler()
+    await bucket.acquire()
+    served = []
+
+    async def request(name, priority):
+        await bucket.acquire(priority)
+        served.append(name)
+
+    await asyncio.gather(
+        request("profile", Priority.PROFILE),
+        request("background-1", Priority.BACKGROUND),
+        request("interactive", Priority.INTERACTIVE),
+        request("background-2", Priority.BACKGROUND),
+    )
+
+    assert served == ["interactive", "background-1", "background-2", "profile"]
+    assert bucket.stats()["queue_depth"] == 0
+
+
+async def test_queue_depth_is_reported_per_priority():
+    bucket = scheduler()
+    await bucket.acquire()
+    waiters = [asyncio.ensure_future(bucket.acquire(priority))
+               for priority in (Priority.BACKGROUND, Priority.BACKGROUND, Priority.PROFILE)]
+    await asyncio.sleep(0)
+
+    depth = bucket.stats()["queue_depth_by_priority"]
+
+    assert depth == {"interactive": 0, "background": 2, "profile": 1}
+    await asyncio.gather(*waiters)
+
+
+async def test_wait_longer_than_the_limit_is_rejected_immediately():
+    # One token a second; the second request would wait ~1s
+    bucket = scheduler(requests_per_minute=60, max_wait_seconds=0.5)
+    await bucket.acquire()
+
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        await bucket.acquire()
+
+    assert excinfo.value.provider == "test"
+    assert excinfo.value.retry_after == pytest.approx(1.0, abs=0.05)
+    assert bucket.rejected == 1
+
+
+async def test_full_queue_rejects_new_requests():
+    bucket = scheduler(requests_per_minute=60, max_queue=1, max_wait_seconds=10)
+    await bucket.acquire()
+    queued = asyncio.ensure_future(bucket.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire()
+
+    queued.cancel()
+
+
+async def test_higher_priority_waits_only_behind_its_own_class():
+    bucket = scheduler(requests_per_minute=60, max_wait_seconds=1.5)
+    await bucket.acquire()
+    queued = asyncio.ensure_future(bucket.acquire(Priority.PROFILE))
+    await asyncio.sleep(0)
+
+    # A second profile request would wait ~2s, an interactive one only ~1s
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire(Priority.PROFILE)
+    interactive = asyncio.ensure_future(bucket.acquire(Priority.INTERACTIVE))
+    await asyncio.sleep(0)
+    assert not interactive.done()
+    assert bucket.stats()["queue_depth"] == 2
+
+    queued.cancel()
+    interactive.cancel()
+
+
+async def test_cancelled_waiter_does_not_consume_a_token():
+    bucket = scheduler()
+    await bucket.acquire()
+    cancelled = asyncio.ensure_future(bucket.acquire())
+    kept = asyncio.ensure_future(bucket.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await kept
+
+    assert bucket.granted == 2
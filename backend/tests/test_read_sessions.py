@@ -0,0 +1,36 @@
+"""Read-only routes authenticate and query on the read session and never open a primary session"""
+
+import pytest
+from database import get_db
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+READ_ENDPOINTS = [
+    "/auth/me",
+    "/positions/",
+    "/positions/portfolio",
+    "/watchlist/",
+    "/watchlist/summary",
+    "/trade-history/",
+    "/trade-history/summary",
+    "/trade-history/summary/stocks",
+    "/trade-history/realized-pnl",
+]
+
+
+@pytest.fixture
+def primary_unavailable(client):
+    """Fail any request that asks for a primary session"""
+    async def no_primary_session():
+        raise AssertionError("read-only route opened a primary session")
+        yield
+
+    app.dependency_overrides[get_db] = no_primary_session
+
+
+@pytest.mark.parametrize("endpoint", READ_ENDPOINTS)
+async def test_read_route_uses_only_the_read_session(endpoint, client, primary_unavailable, auth_headers):
+    response = await client.get(endpoint, headers=auth_headers)
+
+    assert response.status_code == 200, response.text
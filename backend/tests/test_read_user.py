@@ -0,0 +1,86 @@
+"""get_current_read_user only retries on the primary for freshly issued tokens"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+import auth
+from auth import create_access_token, get_current_read_user
+from models import User
+from replica_router import replica_router, REPLICA_READ_YOUR_WRITES_SECONDS
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSession:
+    """Session stand-in that counts lookups and returns a fixed user"""
+
+    def __init__(self, user=None):
+        self.user = user
+        self.lookups = 0
+
+    async def scalar(self, statement):
+        self.lookups += 1
+        return self.user
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def primary(monkeypatch):
+    session = FakeSession(User(id=1, email="new@example.com", username="new"))
+    monkeypatch.setattr(auth, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(replica_router, "replicas", [object()])
+    return session
+
+
+def bearer(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def token_issued(ago: timedelta) -> str:
+    # create_access_token stamps iat with the current time, so sign the claims by hand
+    issued_at = datetime.utcnow() - ago
+    return jwt.encode({"sub": "new@example.com", "iat": issued_at, "exp": issued_at + timedelta(minutes=30)},
+                      auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+
+
+async def test_new_token_missing_on_the_replica_is_found_on_the_primary(primary):
+    user = await get_current_read_user(bearer(create_access_token({"sub": "new@example.com"})), FakeSession())
+
+    assert user.email == "new@example.com"
+    assert primary.lookups == 1
+
+
+async def test_old_token_missing_on_the_replica_does_not_touch_the_primary(primary):
+    token = token_issued(timedelta(seconds=REPLICA_READ_YOUR_WRITES_SECONDS + 60))
+
+    with pytest.raises(HTTPException) as error:
+        await get_current_read_user(bearer(token), FakeSession())
+
+    assert error.value.status_code == 401
+    assert primary.lookups == 0
+
+
+async def test_invalid_token_touches_no_database(primary):
+    replica = FakeSession()
+
+    with pytest.raises(HTTPException):
+        await get_current_read_user(bearer("not-a-jwt"), replica)
+
+    assert (replica.lookups, primary.lookups) == (0, 0)
+
+
+async def test_no_fallback_without_replicas(primary, monkeypatch):
+    monkeypatch.setattr(replica_router, "replicas", [])
+
+    with pytest.raises(HTTPException):
+        await get_current_read_user(bearer(create_access_token({"sub": "new@example.com"})), FakeSession())
+
+    assert primary.lookups == 0
@@ -0,0 +1,33 @@
+"""Deleting a stock leaves its price bars to the database's ON DELETE CASCADE"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from models import PriceBar, Stock
+from stock_catalog import stock_catalog
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_delete_stock_cascades_bars_without_loading_them(client, session_factory, query_counter, auth_headers):
+    async with session_factory() as db:
+        stock = Stock(symbol="BARS", name="Bar Test Corp")
+        db.add(stock)
+        await db.flush()
+        start = datetime(2024, 1, 1)
+        db.add_all([
+            PriceBar(stock_id=stock.id, interval="1d", ts=start + timedelta(days=day),
+                     open=100.0, high=101.0, low=99.0, close=100.5, volume=1000.0)
+            for day in range(50)
+        ])
+        await db.commit()
+    stock_catalog.put(stock)
+
+    with query_counter.counting():
+        response = await client.delete(f"/stocks/{stock.id}", headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    assert not [statement for statement in query_counter.statements if "price_bars" in statement]
+    async with session_factory() as db:
+        assert await db.scalar(select(func.count()).select_from(PriceBar)) == 0
@@ -0,0 +1,88 @@
+"""The n-gram search index returns what a linear scan with rank_match would"""
+
+import random
+import string
+
+from stock_search import StockSearchIndex, rank_match
+
+STOCKS = {
+    1: ("AAPL", "Apple Inc."),
+    2: ("APP", "AppLovin Corp"),
+    3: ("MSFT", "Microsoft Corporation"),
+    4: ("PYPL", "PayPal Holdings"),
+    5: ("A", "Agilent Technologies"),
+    6: ("AMAT", "Applied Materials"),
+    7: ("GOOGL", "Alphabet Inc. Class A"),
+}
+
+
+def build(stocks=STOCKS) -> StockSearchIndex:
+    index = StockSearchIndex()
+    for stock_id, (symbol, name) in stocks.items():
+        index.add(stock_id, symbol, name)
+    return index
+
+
+def linear_search(stocks, query: str, limit: int):
+    """Reference: rank every stock and keep the best `limit`"""
+    query = query.strip().upper()
+    if not query:
+        return []
+    ranked = sorted(
+        (rank, len(symbol.upper()), symbol.upper(), stock_id)
+        for stock_id, (symbol, name) in stocks.items()
+        for rank in [rank_match(query, symbol.upper(), name.upper())]
+        if rank is not None
+    )
+    return [stock_id for _, _, _, stock_id in ranked[:limit]]
+
+
+def test_ranking_tiers():
+    index = build()
+
+    assert index.search("app", 10) == [2, 1, 6]
+    assert index.search("a", 1) == [5]
+    assert index.search("inc", 10) == [1, 7]
+    assert index.search("class a", 10) == [7]
+
+
+def test_short_and_long_queries_match_the_linear_scan():
+    index = build()
+
+    for query in ["a", "pl", "app", "appl", "corp", "soft", "materials", "xyz", " Pay ", ""]:
+        for limit in (1, 3, 10):
+            assert index.search(query, limit) == linear_search(STOCKS, query, limit), (query, limit)
+
+
+def test_removed_and_renamed_stocks_leave_no_postings():
+    index = build()
+
+    index.remove(3)
+    index.add(1, "AAPL", "Pear Inc.")
+    index.remove(99)
+
+    assert len(index) == 6
+    assert index.search("micro", 10) == []
+    assert index.search("apple", 10) == []
+    assert index.search("pear", 10) == [1]
+    for postings in (index._postings, index._symbol_prefixes, index._word_prefixes):
+        assert all(postings.values())
+        assert not any(3 in ids for ids in postings.values())
+
+
+def test_random_catalogue_matches_the_linear_scan():
+    rng = random.Random(7)
+    alphabet = "ABCDE "
+    stocks = {
+        stock_id: (
+            "".join(rng.choice("ABCDE") for _ in range(rng.randint(1, 5))),
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(3, 20))).strip() or "A",
+        )
+        for stock_id in range(300)
+    }
+    index = build(stocks)
+
+    for _ in range(300):
+        query = "".join(rng.choice(string.ascii_uppercase[:5]) for _ in range(rng.randint(1, 6)))
+        limit = rng.choice([1, 5, 20])
+        assert index.search(query, limit) == linear_search(stocks, query, limit), (query, limit)
@@ -0,0 +1,142 @@
+"""match_fifo (used by rebuild_lots) and _consume (used per trade) agree with a naive FIFO"""
+
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from trade_lots import _consume, match_fifo
+
+
+def naive_fifo(trades):
+    """
+    Reference: trades are (group, is_buy, quantity, price) in order.
+    Returns per-trade cost basis (None on buys) and remaining lot size (None on sells).
+    """
+    lots = {}
+    cost_basis = [None] * len(trades)
+    remaining = [None] * len(trades)
+    for index, (group, is_buy, quantity, price) in enumerate(trades):
+        queue = lots.setdefault(group, [])
+        if is_buy:
+            remaining[index] = quantity
+            queue.append(index)
+            continue
+        unmatched, cost = quantity, 0.0
+        while queue and unmatched > 0:
+            lot = queue[0]
+            used = min(remaining[lot], unmatched)
+            remaining[lot] -= used
+            cost += used * trades[lot][3]
+            unmatched -= used
+            if remaining[lot] <= 1e-9:
+                remaining[lot] = 0.0
+                queue.pop(0)
+        cost_basis[index] = cost + unmatched * price
+    return cost_basis, remaining
+
+
+def vectorized(trades):
+    group, is_buy, quantity, price = (np.array(column) for column in zip(*trades))
+    return match_fifo(group, is_buy.astype(bool), quantity.astype(float), price.astype(float))
+
+
+def incremental(trades):
+    """Replay the trades through _consume, the way record_lots does"""
+    lots = {}
+    cost_basis = [None] * len(trades)
+    opened = []
+    for index, (group, is_buy, quantity, price) in enumerate(trades):
+        queue = lots.setdefault(group, [])
+        if is_buy:
+            lot = SimpleNamespace(remaining_quantity=quantity, price_per_share=price)
+            queue.append(lot)
+            opened.append((index, lot))
+            continue
+        trade = SimpleNamespace(quantity=quantity, price_per_share=price, total_amount=quantity * price)
+        _consume(queue, trade)
+        cost_basis[index] = trade.cost_basis
+    remaining = [None] * len(trades)
+    for index, lot in opened:
+        remaining[index] = lot.remaining_quantity
+    return cost_basis, remaining
+
+
+def assert_matches_reference(trades):
+    expected_cost, expected_remaining = naive_fifo(trades)
+    is_buy = [trade[1] for trade in trades]
+
+    matched = vectorized(trades)
+    assert np.isnan(matched["cost_basis"][is_buy]).all()
+    assert np.isnan(matched["remaining"][np.logical_not(is_buy)]).all()
+    for index, buy in enumerate(is_buy):
+        if buy:
+            assert matched["remaining"][index] == pytest.approx(expected_remaining[index], abs=1e-6), index
+        else:
+            assert matched["cost_basis"][index] == pytest.approx(expected_cost[index], abs=1e-6), index
+
+    cost_basis, remaining = incremental(trades)
+    assert cost_basis == pytest.approx(expected_cost, abs=1e-6)
+    assert remaining == pytest.approx(expected_remaining, abs=1e-6)
+
+
+def test_sell_spanning_lots():
+    trades = [
+        (0, True, 10, 100.0),
+        (0, True, 5, 130.0),
+        (0, False, 12, 150.0),
+        (0, False, 3, 150.0),
+    ]
+
+    matched = vectorized(trades)
+
+    assert matched["cost_basis"][2] == pytest.approx(10 * 100 + 2 * 130)
+    assert matched["cost_basis"][3] == pytest.approx(3 * 130)
+    assert matched["remaining"][:2].tolist() == [0.0, 0.0]
+    assert_matches_reference(trades)
+
+
+def test_oversold_shares_never_reach_later_buys():
+    trades = [
+        (0, True, 5, 10.0),
+        (0, False, 8, 20.0),
+        (0, True, 4, 30.0),
+        (0, False, 1, 40.0),
+    ]
+
+    matched = vectorized(trades)
+
+    # Three uncovered shares cost the sale price; the later buy is untouched until the next sell
+    assert matched["cost_basis"][1] == pytest.approx(5 * 10 + 3 * 20)
+    assert matched["cost_basis"][3] == pytest.approx(30)
+    assert matched["remaining"][2] == pytest.approx(3)
+    assert_matches_reference(trades)
+
+
+def test_groups_do_not_share_lots():
+    assert_matches_reference([
+        (0, True, 10, 1.0),
+        (1, False, 4, 9.0),
+        (1, True, 2, 5.0),
+        (1, False, 1, 9.0),
+        (2, True, 3, 7.0),
+    ])
+
+
+def test_empty_input():
+    matched = match_fifo(np.empty(0, dtype=np.int64), np.empty(0, dtype=bool), np.empty(0), np.empty(0))
+
+    assert len(matched["cost_basis"]) == 0 and len(matched["remaining"]) == 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_histories_match_the_naive_fifo(seed):
+    rng = random.Random(seed)
+    trades = []
+    for group in range(rng.randint(1, 8)):
+        for _ in range(rng.randint(1, 40)):
+            is_buy = rng.random() < 0.55
+            quantity = rng.choice([rng.randint(1, 50), round(rng.uniform(0.1, 20), 3)])
+            trades.append((group, is_buy, quantity, round(rng.uniform(1, 500), 2)))
+
+    assert_matches_reference(trades)
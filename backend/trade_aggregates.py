@@ -0,0 +1,115 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, insert as sql_insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import StockTradeTotals, TradeHistory, TradeTotals
+
+# Additive columns shared by trade_totals and stock_trade_totals
+TOTAL_COLUMNS = ("trade_count", "buy_count", "sell_count", "buy_quantity", "sell_quantity", "buy_amount", "sell_amount")
+
+
+def trade_deltas(trade: TradeHistory) -> Dict[str, float]:
+    """Contribution of one trade to each total column"""
+    is_buy = trade.trade_type == "BUY"
+    return {
+        "trade_count": 1,
+        "buy_count": 1 if is_buy else 0,
+        "sell_count": 0 if is_buy else 1,
+        "buy_quantity": trade.quantity if is_buy else 0,
+        "sell_quantity": 0 if is_buy else trade.quantity,
+        "buy_amount": trade.total_amount if is_buy else 0,
+        "sell_amount": 0 if is_buy else trade.total_amount,
+    }
+
+
+def _add(totals: Dict, key, deltas: Dict[str, float]) -> None:
+    current = totals.setdefault(key, dict.fromkeys(TOTAL_COLUMNS, 0))
+    for column, value in deltas.items():
+        current[column] += value
+
+
+def _upsert(model, key_columns: Tuple[str, ...], totals: Dict, now: datetime):
+    """INSERT ... ON CONFLICT DO UPDATE adding the deltas to the existing row"""
+    rows = [
+        {**dict(zip(key_columns, key)), **deltas, "updated_at": now}
+        # Sorted so concurrent transactions lock rows in the same order
+        for key, deltas in sorted(totals.items())
+    ]
+    statement = insert(model).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={
+            **{column: getattr(model, column) + statement.excluded[column] for column in TOTAL_COLUMNS},
+            "updated_at": statement.excluded.updated_at,
+        }
+    )
+
+
+async def record_trades(db: AsyncSession, trades: Iterable[TradeHistory]) -> None:
+    """
+    Add newly created trades to the per-user and per-user-per-stock totals.
+    Call after db.add(trade) and before commit, so the totals change in the same transaction.
+    """
+    user_totals: Dict[Tuple[int], Dict[str, float]] = {}
+    stock_totals: Dict[Tuple[int, int], Dict[str, float]] = {}
+    for trade in trades:
+        deltas = trade_deltas(trade)
+        _add(user_totals, (trade.user_id,), deltas)
+        _add(stock_totals, (trade.user_id, trade.stock_id), deltas)
+
+    if not user_totals:
+        return
+    now = datetime.utcnow()
+    await db.execute(_upsert(TradeTotals, ("user_id",), user_totals, now))
+    await db.execute(_upsert(StockTradeTotals, ("user_id", "stock_id"), stock_totals, now))
+
+
+async def remove_stock_totals(db: AsyncSession, stock_id: int) -> None:
+    """Take a stock's totals out of every user's totals; call in the transaction that deletes the stock"""
+    await db.execute(
+        update(TradeTotals)
+        .where(TradeTotals.user_id == StockTradeTotals.user_id, StockTradeTotals.stock_id == stock_id)
+        .values({
+            **{column: getattr(TradeTotals, column) - getattr(StockTradeTotals, column) for column in TOTAL_COLUMNS},
+            "updated_at": datetime.utcnow(),
+        })
+    )
+    await db.execute(delete(StockTradeTotals).where(StockTradeTotals.stock_id == stock_id))
+
+
+def _totals_from_history(*group_by) -> select:
+    """SELECT computing the total columns from trade_history, grouped by the given columns"""
+    is_buy = TradeHistory.trade_type == "BUY"
+    is_sell = TradeHistory.trade_type != "BUY"
+    return select(
+        *group_by,
+        func.count(),
+        func.count().filter(is_buy),
+        func.count().filter(is_sell),
+        func.coalesce(func.sum(TradeHistory.quantity).filter(is_buy), 0),
+        func.coalesce(func.sum(TradeHistory.quantity).filter(is_sell), 0),
+        func.coalesce(func.sum(TradeHistory.total_amount).filter(is_buy), 0),
+        func.coalesce(func.sum(TradeHistory.total_amount).filter(is_sell), 0),
+        literal(datetime.utcnow()),
+    ).group_by(*group_by)
+
+
+def rebuild_statements(user_id: Optional[int] = None) -> List:
+    """Statements that recompute the totals from trade_history, for all users or one user"""
+    user_history = _totals_from_history(TradeHistory.user_id)
+    stock_history = _totals_from_history(TradeHistory.user_id, TradeHistory.stock_id)
+    clear_users = delete(TradeTotals)
+    clear_stocks = delete(StockTradeTotals)
+    if user_id is not None:
+        user_history = user_history.where(TradeHistory.user_id == user_id)
+        stock_history = stock_history.where(TradeHistory.user_id == user_id)
+        clear_users = clear_users.where(TradeTotals.user_id == user_id)
+        clear_stocks = clear_stocks.where(StockTradeTotals.user_id == user_id)
+
+    return [
+        clear_users,
+        clear_stocks,
+        sql_insert(TradeTotals).from_select(["user_id", *TOTAL_COLUMNS, "updated_at"], user_history),
+        sql_insert(StockTradeTotals).from_select(["user_id", "stock_id", *TOTAL_COLUMNS, "updated_at"], stock_history),
+    ]
@@ -0,0 +1,213 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import delete, insert, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import TradeHistory, TradeLot
+
+# Remainders below this many shares are float noise and count as zero
+QUANTITY_EPSILON = 1e-9
+
+
+def _consume(lots: List[TradeLot], trade: TradeHistory) -> None:
+    """Take a SELL trade's shares from the front of its open lots and record its cost basis and realized P&L"""
+    unmatched = trade.quantity
+    cost = 0.0
+    while lots and unmatched > QUANTITY_EPSILON:
+        lot = lots[0]
+        used = min(lot.remaining_quantity, unmatched)
+        remaining = lot.remaining_quantity - used
+        lot.remaining_quantity = remaining if remaining > QUANTITY_EPSILON else 0.0
+        if not lot.remaining_quantity:
+            lots.pop(0)
+        cost += used * lot.price_per_share
+        unmatched -= used
+
+    # Shares no lot covers (positions edited by hand) are costed at the sale price, i.e. no P&L
+    if unmatched > QUANTITY_EPSILON:
+        cost += unmatched * trade.price_per_share
+
+    trade.cost_basis = cost
+    trade.realized_pnl = trade.total_amount - cost
+
+
+async def record_lots(db: AsyncSession, trades: Iterable[TradeHistory]) -> None:
+    """
+    Open a lot for each new BUY trade and, in trade order, consume the oldest open lots (FIFO)
+    for each new SELL, recording its cost basis and realized P&L on the trade.
+    Call after db.add(trade) and before commit; the open lots of every stock sold are locked in one query.
+    """
+    trades = list(trades)
+    open_lots: Dict[Tuple[int, int], List[TradeLot]] = {}
+    sold = {(trade.user_id, trade.stock_id) for trade in trades if trade.trade_type != "BUY"}
+    if sold:
+        for lot in (await db.scalars(
+            select(TradeLot).where(
+                tuple_(TradeLot.user_id, TradeLot.stock_id).in_(sold),
+                TradeLot.remaining_quantity > 0
+            ).order_by(TradeLot.user_id, TradeLot.stock_id, TradeLot.opened_at, TradeLot.id).with_for_update()
+        )).all():
+            open_lots.setdefault((lot.user_id, lot.stock_id), []).append(lot)
+
+    now = datetime.utcnow()
+    for trade in trades:
+        lots = open_lots.setdefault((trade.user_id, trade.stock_id), [])
+        if trade.trade_type != "BUY":
+            _consume(lots, trade)
+            continue
+        if trade.trade_date is None:
+            # Set now rather than at flush so the lot and the trade share the timestamp
+            trade.trade_date = now
+        lot = TradeLot(
+            user_id=trade.user_id,
+            stock_id=trade.stock_id,
+            buy_trade=trade,
+            quantity=trade.quantity,
+            remaining_quantity=trade.quantity,
+            price_per_share=trade.price_per_share,
+            opened_at=trade.trade_date,
+        )
+        db.add(lot)
+        lots.append(lot)
+
+
+def _group_starts(group: np.ndarray) -> np.ndarray:
+    """Index of the first row of each run of equal group ids"""
+    return np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+
+
+def _group_cumsum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Running sum that restarts at every group start"""
+    totals = np.cumsum(values)
+    before = np.r_[0.0, totals][starts]
+    return totals - np.repeat(before, np.diff(np.r_[starts, len(values)]))
+
+
+def match_fifo(group: np.ndarray, is_buy: np.ndarray, quantity: np.ndarray, price: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    FIFO-match every sell against earlier buys, without a per-trade loop.
+    Rows must be sorted by group (one group per user and stock), then trade order.
+
+    Within a group, the buys laid end to end form a share axis whose cumulative
+    cost is piecewise linear; a sell consuming axis positions [a, b] costs
+    cost(b) - cost(a). Positions consumed so far follow c[i] = min(c[i-1] + sold, bought),
+    so shares sold beyond what was held never reach later buys; that recurrence is
+    sold + running min(0, bought - sold), evaluated with numpy accumulates.
+
+    Returns per-row "cost_basis" (NaN on buys) and "remaining" (unconsumed shares of
+    each buy's lot, NaN on sells).
+    """
+    n = len(quantity)
+    if n == 0:
+        return {"cost_basis": np.empty(0), "remaining": np.empty(0)}
+
+    starts = _group_starts(group)
+    sizes = np.diff(np.r_[starts, n])
+    buy_quantity = np.where(is_buy, quantity, 0.0)
+    sell_quantity = quantity - buy_quantity
+    bought = _group_cumsum(buy_quantity, starts)
+    sold = _group_cumsum(sell_quantity, starts)
+
+    # Running min of (bought - sold) per group; only groups that ever oversold need it
+    shortfall = np.minimum(bought - sold, 0.0)
+    oversold = np.flatnonzero(np.minimum.reduceat(shortfall, starts) < -QUANTITY_EPSILON)
+    for index in oversold:
+        start = starts[index]
+        end = start + sizes[index]
+        shortfall[start:end] = np.minimum.accumulate(shortfall[start:end])
+    consumed = sold + shortfall
+    consumed_before = np.r_[0.0, consumed[:-1]]
+    consumed_before[starts] = 0.0
+
+    # One share axis over all groups; each group starts where the previous one's buys end
+    axis_quantity = np.r_[0.0, np.cumsum(quantity[is_buy])]
+    axis_cost = np.r_[0.0, np.cumsum(quantity[is_buy] * price[is_buy])]
+    group_base = np.repeat(np.r_[0.0, np.cumsum(buy_quantity)][starts], sizes)
+
+    matched_cost = (
+        np.interp(group_base + consumed, axis_quantity, axis_cost)
+        - np.interp(group_base + consumed_before, axis_quantity, axis_cost)
+    )
+    unmatched = sell_quantity - (consumed - consumed_before)
+    cost_basis = np.where(is_buy, np.nan, matched_cost + np.maximum(unmatched, 0.0) * price)
+
+    # A buy's lot covers group axis positions [bought - quantity, bought]
+    group_consumed = np.repeat(consumed[starts + sizes - 1], sizes)
+    used = np.clip(group_consumed - (bought - buy_quantity), 0.0, buy_quantity)
+    remaining = buy_quantity - used
+    remaining[remaining <= QUANTITY_EPSILON] = 0.0
+    remaining = np.where(is_buy, remaining, np.nan)
+
+    return {"cost_basis": cost_basis, "remaining": remaining}
+
+
+def rebuild_lots(db: Session, user_id: Optional[int] = None) -> Dict[str, int]:
+    """Recompute the lots and every sale's cost basis and realized P&L from trade_history, for all users or one user"""
+    query = select(
+        TradeHistory.id,
+        TradeHistory.user_id,
+        TradeHistory.stock_id,
+        TradeHistory.trade_type,
+        TradeHistory.quantity,
+        TradeHistory.price_per_share,
+        TradeHistory.total_amount,
+        TradeHistory.trade_date,
+    ).order_by(TradeHistory.user_id, TradeHistory.stock_id, TradeHistory.trade_date, TradeHistory.id)
+    clear_lots = delete(TradeLot)
+    if user_id is not None:
+        query = query.where(TradeHistory.user_id == user_id)
+        clear_lots = clear_lots.where(TradeLot.user_id == user_id)
+
+    rows = db.execute(query).all()
+    count = len(rows)
+    trade_id = np.fromiter((row.id for row in rows), dtype=np.int64, count=count)
+    users = np.fromiter((row.user_id for row in rows), dtype=np.int64, count=count)
+    stocks = np.fromiter((row.stock_id for row in rows), dtype=np.int64, count=count)
+    is_buy = np.fromiter((row.trade_type == "BUY" for row in rows), dtype=bool, count=count)
+    quantity = np.fromiter((row.quantity for row in rows), dtype=np.float64, count=count)
+    price = np.fromiter((row.price_per_share for row in rows), dtype=np.float64, count=count)
+    total_amount = np.fromiter((row.total_amount for row in rows), dtype=np.float64, count=count)
+
+    # Rows are sorted by (user_id, stock_id), so a change in either starts a new group
+    group = np.zeros(count, dtype=np.int64)
+    if count:
+        group[1:] = np.cumsum((users[1:] != users[:-1]) | (stocks[1:] != stocks[:-1]))
+    matched = match_fifo(group, is_buy, quantity, price)
+
+    db.execute(clear_lots)
+    buys = np.flatnonzero(is_buy)
+    if len(buys):
+        db.execute(insert(TradeLot), [
+            {
+                "user_id": rows[index].user_id,
+                "stock_id": rows[index].stock_id,
+                "buy_trade_id": rows[index].id,
+                "quantity": rows[index].quantity,
+                "remaining_quantity": remaining,
+                "price_per_share": rows[index].price_per_share,
+                "opened_at": rows[index].trade_date,
+            }
+            for index, remaining in zip(buys.tolist(), matched["remaining"][buys].tolist())
+        ])
+
+    sells = np.flatnonzero(~is_buy)
+    if len(sells):
+        cost_basis = matched["cost_basis"][sells]
+        # One statement for every sale instead of an UPDATE per row
+        db.execute(
+            text("""
+                UPDATE trade_history
+                SET cost_basis = matched.cost_basis, realized_pnl = matched.realized_pnl
+                FROM unnest(CAST(:ids AS integer[]), CAST(:cost_basis AS double precision[]),
+                            CAST(:realized_pnl AS double precision[])) AS matched(id, cost_basis, realized_pnl)
+                WHERE trade_history.id = matched.id
+            """),
+            {
+                "ids": trade_id[sells].tolist(),
+                "cost_basis": cost_basis.tolist(),
+                "realized_pnl": (total_amount[sells] - cost_basis).tolist(),
+            }
+        )
+
+    return {"trades": count, "lots": len(buys), "sells": len(sells)}
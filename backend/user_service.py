@@ -1,6 +1,8 @@
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from database import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import User
 from schemas import UserCreate, UserUpdate
 from auth import get_password_hash
 from datetime import datetime
@@ -8,13 +10,13 @@ from typing import Optional, List
 
 class UserService:
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         """Create a new user."""
         # Check if user already exists
-        existing_user = db.query(User).filter(
+        existing_user = await db.scalar(select(User).where(
             (User.email == user_data.email.lower()) | 
             (User.username == user_data.username.lower())
-        ).first()
+        ))
         
         if existing_user:
             if existing_user.email == user_data.email.lower():
@@ -23,7 +25,7 @@ class UserService:
                 raise ValueError("Username already taken")
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
         db_user = User(
             email=user_data.email.lower(),
             username=user_data.username.lower(),
@@ -35,60 +37,60 @@ class UserService:
         
         try:
             db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
+            await db.commit()
+            await db.refresh(db_user)
             print(f"✅ User created successfully: {db_user.email}")
             return db_user
         except IntegrityError as e:
-            db.rollback()
+            await db.rollback()
             print(f"❌ User creation failed: {e}")
             raise ValueError("User creation failed due to data conflict")
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"❌ Unexpected error during user creation: {e}")
             raise ValueError("User creation failed")
     
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email."""
         try:
-            return db.query(User).filter(User.email == email.lower()).first()
+            return await db.scalar(select(User).where(User.email == email.lower()))
         except Exception as e:
             print(f"❌ Error getting user by email: {e}")
             return None
     
     @staticmethod
-    def get_user_by_username(db: Session, username: str) -> Optional[User]:
+    async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
         """Get user by username."""
         try:
-            return db.query(User).filter(User.username == username.lower()).first()
+            return await db.scalar(select(User).where(User.username == username.lower()))
         except Exception as e:
             print(f"❌ Error getting user by username: {e}")
             return None
     
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID."""
         try:
-            return db.query(User).filter(User.id == user_id).first()
+            return await db.scalar(select(User).where(User.id == user_id))
         except Exception as e:
             print(f"❌ Error getting user by ID: {e}")
             return None
     
     @staticmethod
-    def get_all_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
+    async def get_all_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
         """Get all users with pagination."""
         try:
-            return db.query(User).offset(skip).limit(limit).all()
+            return list(await db.scalars(select(User).offset(skip).limit(limit)))
         except Exception as e:
             print(f"❌ Error getting all users: {e}")
             return []
     
     @staticmethod
-    def update_user(db: Session, user_id: int, user_data: UserUpdate) -> Optional[User]:
+    async def update_user(db: AsyncSession, user_id: int, user_data: UserUpdate) -> Optional[User]:
         """Update user information."""
         try:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.scalar(select(User).where(User.id == user_id))
             if not user:
                 return None
             
@@ -96,109 +98,109 @@ class UserService:
             
             # Check for email/username conflicts
             if "email" in update_data:
-                existing_user = db.query(User).filter(
+                existing_user = await db.scalar(select(User).where(
                     User.email == update_data["email"].lower(),
                     User.id != user_id
-                ).first()
+                ))
                 if existing_user:
                     raise ValueError("Email already in use by another user")
                 update_data["email"] = update_data["email"].lower()
             
             if "username" in update_data:
-                existing_user = db.query(User).filter(
+                existing_user = await db.scalar(select(User).where(
                     User.username == update_data["username"].lower(),
                     User.id != user_id
-                ).first()
+                ))
                 if existing_user:
                     raise ValueError("Username already in use by another user")
                 update_data["username"] = update_data["username"].lower()
             
             # Hash password if provided
             if "password" in update_data:
-                update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+                update_data["hashed_password"] = await run_in_threadpool(get_password_hash, update_data.pop("password"))
             
             for field, value in update_data.items():
                 setattr(user, field, value)
             
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
             print(f"✅ User updated successfully: {user.email}")
             return user
         except IntegrityError as e:
-            db.rollback()
+            await db.rollback()
             print(f"❌ User update failed: {e}")
             raise ValueError("Update failed due to data conflict")
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"❌ Unexpected error during user update: {e}")
             raise ValueError("User update failed")
     
     @staticmethod
-    def update_last_login(db: Session, user_id: int) -> None:
+    async def update_last_login(db: AsyncSession, user_id: int) -> None:
         """Update user's last login timestamp."""
         try:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.scalar(select(User).where(User.id == user_id))
             if user:
                 user.last_login = datetime.utcnow()
-                db.commit()
+                await db.commit()
                 print(f"✅ Last login updated for user: {user.email}")
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"❌ Error updating last login: {e}")
     
     @staticmethod
-    def deactivate_user(db: Session, user_id: int) -> bool:
+    async def deactivate_user(db: AsyncSession, user_id: int) -> bool:
         """Deactivate a user account."""
         try:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.scalar(select(User).where(User.id == user_id))
             if user:
                 user.is_active = False
-                db.commit()
+                await db.commit()
                 print(f"✅ User deactivated: {user.email}")
                 return True
             return False
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"❌ Error deactivating user: {e}")
             return False
     
     @staticmethod
-    def activate_user(db: Session, user_id: int) -> bool:
+    async def activate_user(db: AsyncSession, user_id: int) -> bool:
         """Activate a user account."""
         try:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.scalar(select(User).where(User.id == user_id))
             if user:
                 user.is_active = True
-                db.commit()
+                await db.commit()
                 print(f"✅ User activated: {user.email}")
                 return True
             return False
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"❌ Error activating user: {e}")
             return False
     
     @staticmethod
-    def verify_user(db: Session, user_id: int) -> bool:
+    async def verify_user(db: AsyncSession, user_id: int) -> bool:
         """Verify a user account."""
         try:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.scalar(select(User).where(User.id == user_id))
             if user:
                 user.is_verified = True
-                db.commit()
+                await db.commit()
                 print(f"✅ User verified: {user.email}")
                 return True
             return False
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"❌ Error verifying user: {e}")
             return False
     
     @staticmethod
-    def delete_user(db: Session, user_id: int) -> bool:
+    async def delete_user(db: AsyncSession, user_id: int) -> bool:
         """Delete a user account (soft delete by deactivating)."""
         try:
-            return UserService.deactivate_user(db, user_id)
+            return await UserService.deactivate_user(db, user_id)
         except Exception as e:
             print(f"❌ Error deleting user: {e}")
             return False
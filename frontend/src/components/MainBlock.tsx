@@ -150,7 +150,8 @@ const MainBlock: React.FC = () => {
 
         await positionsDispatch(sellShares({
           positionId: currentPosition.id,
-          quantity
+          quantity,
+          price: currentQuote?.current_price
         })).unwrap();
 
         if (quantity === currentPosition.quantity) {
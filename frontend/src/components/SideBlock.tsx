@@ -2,7 +2,7 @@ import React, { useEffect, useState, useMemo, useCallback } from 'react';
 import { usePositions, useWatchlist, useSelectedStock, useStocks, useMarket } from '../store/hooks';
 import { fetchPositions } from '../store/actions/positionActions';
 import { fetchWatchlistItems } from '../store/actions/watchlistActions';
-import { getStockChart } from '../store/actions/stockActions';
+import { getStockCharts } from '../store/actions/stockActions';
 import { setSelectedStock } from '../store/reducers/selectedStockReducer';
 import type { Position } from '../store/types/positionTypes';
 import type { WatchlistItem } from '../store/types/watchlistTypes';
@@ -33,32 +33,49 @@ const SideBlock: React.FC = () => {
   }, [positionsDispatch, watchlistDispatch]);
 
   const fetchChartData = useCallback(
-    async (symbol: string) => {
-      if (chartData[symbol] || isLoading[symbol]) return;
+    async (symbols: string[]) => {
+      // Symbols already requested once (even if they came back without a series) are not re-fetched
+      const missing = symbols.filter(symbol => !chartData[symbol] && !(symbol in isLoading));
+      if (missing.length === 0) return;
+
+      const markLoading = (loading: boolean) =>
+        setIsLoading(prev => ({
+          ...prev,
+          ...Object.fromEntries(missing.map(symbol => [symbol, loading]))
+        }));
 
       try {
-        setIsLoading(prev => ({ ...prev, [symbol]: true }));
-        const result = await stocksDispatch(getStockChart({ symbol, timeframe: '1Y' }));
+        markLoading(true);
+        const result = await stocksDispatch(
+          getStockCharts(missing.map(symbol => ({ symbol, timeframe: '1Y' })))
+        );
 
-        if (getStockChart.fulfilled.match(result)) {
-          setChartData(prev => ({
-            ...prev,
-            [symbol]: result.payload
-          }));
+        if (getStockCharts.fulfilled.match(result)) {
+          setChartData(prev => {
+            const next = { ...prev };
+            result.payload.forEach(series => {
+              if (series.y_values) {
+                next[series.symbol] = {
+                  symbol: series.symbol,
+                  timeframe: series.timeframe,
+                  y_values: series.y_values
+                };
+              }
+            });
+            return next;
+          });
         }
       } catch (error) {
-        console.error(`Failed to fetch chart for ${symbol}:`, error);
+        console.error('Failed to fetch charts:', error);
       } finally {
-        setIsLoading(prev => ({ ...prev, [symbol]: false }));
+        markLoading(false);
       }
     },
     [chartData, isLoading, stocksDispatch]
   );
 
   useEffect(() => {
-    allSymbols.forEach(symbol => {
-      fetchChartData(symbol);
-    });
+    fetchChartData(allSymbols);
   }, [allSymbols, fetchChartData]);
 
   const handlePositionClick = useCallback(
@@ -3,6 +3,8 @@ import { useStocks, useSelectedStock, useMarket } from '../store/hooks';
 import { fetchStocks } from '../store/actions/stockActions';
 import { fetchMarketQuotes } from '../store/actions/marketActions';
 import { setSelectedStock } from '../store/reducers/selectedStockReducer';
+import { applyQuoteUpdates } from '../store/reducers/marketReducer';
+import { openQuoteStream } from '../services/quoteStream';
 
 const Topbar: React.FC = () => {
   const { stocks, dispatch } = useStocks();
@@ -23,6 +25,15 @@ const Topbar: React.FC = () => {
     }
   }, [stocks, marketDispatch]);
 
+  // Keep quotes current with streamed price deltas instead of re-polling
+  useEffect(() => {
+    if (stocks.length === 0) {
+      return;
+    }
+    const symbols = stocks.map(stock => stock.symbol);
+    return openQuoteStream(symbols, (updates) => marketDispatch(applyQuoteUpdates(updates)));
+  }, [stocks, marketDispatch]);
+
   const formatPrice = (price: number) => `$${price.toFixed(2)}`;
   const formatChange = (change: number, percent: number) => {
     const sign = change >= 0 ? '+' : '';
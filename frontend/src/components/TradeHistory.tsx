@@ -1,14 +1,25 @@
 import React, { useEffect } from 'react';
 import { useTradeHistory } from '../store/hooks';
-import { fetchTradeHistory } from '../store/actions/tradeHistoryActions';
+import { fetchTradeHistory, fetchTradeHistorySummary } from '../store/actions/tradeHistoryActions';
 
 const TradeHistory: React.FC = () => {
-  const { trades, isLoading, error, dispatch } = useTradeHistory();
+  const { trades, nextCursor, summary, isLoading, error, dispatch } = useTradeHistory();
 
   useEffect(() => {
     dispatch(fetchTradeHistory());
+    dispatch(fetchTradeHistorySummary());
   }, [dispatch]);
 
+  // Whole-history totals come from the server; fall back to the pages loaded so far
+  const totalTrades = summary?.total_trades ?? trades.length;
+  const totalBought = summary?.total_buy_amount ?? trades
+    .filter(t => t.trade_type === 'BUY')
+    .reduce((sum, t) => sum + t.total_amount, 0);
+  const totalSold = summary?.total_sell_amount ?? trades
+    .filter(t => t.trade_type === 'SELL')
+    .reduce((sum, t) => sum + t.total_amount, 0);
+  const netGainLoss = totalSold - totalBought;
+
   const formatDate = (dateString: string) => {
     return new Date(dateString).toLocaleDateString('en-US', {
       year: 'numeric',
@@ -26,7 +37,8 @@ const TradeHistory: React.FC = () => {
     }).format(amount);
   };
 
-  if (isLoading) {
+  // Keep already loaded pages on screen while the next one is fetched
+  if (isLoading && trades.length === 0) {
     return (
       <div className="d-flex justify-content-center align-items-center h-100" style={{ minHeight: '400px' }}>
         <div className="spinner-border text-success" role="status">
@@ -116,6 +128,17 @@ const TradeHistory: React.FC = () => {
                       ))}
                     </tbody>
                   </table>
+                  {nextCursor && (
+                    <div className="text-center py-3">
+                      <button
+                        className="btn btn-sm btn-outline-primary"
+                        onClick={() => dispatch(fetchTradeHistory(nextCursor))}
+                        disabled={isLoading}
+                      >
+                        {isLoading ? 'Loading...' : 'Load more'}
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
@@ -125,52 +148,24 @@ const TradeHistory: React.FC = () => {
                 <div className="row text-center">
                   <div className="col-3">
                     <div className="text-muted small">Total Trades</div>
-                    <div className="fw-bold trade-summary-value">{trades.length}</div>
+                    <div className="fw-bold trade-summary-value">{totalTrades}</div>
                   </div>
                   <div className="col-3">
                     <div className="text-muted small">Total Bought</div>
                     <div className="fw-bold trade-amount-negative">
-                      {formatCurrency(
-                        trades
-                          .filter(t => t.trade_type === 'BUY')
-                          .reduce((sum, t) => sum + t.total_amount, 0)
-                      )}
+                      {formatCurrency(totalBought)}
                     </div>
                   </div>
                   <div className="col-3">
                     <div className="text-muted small">Total Sold</div>
                     <div className="fw-bold trade-amount-positive">
-                      {formatCurrency(
-                        trades
-                          .filter(t => t.trade_type === 'SELL')
-                          .reduce((sum, t) => sum + t.total_amount, 0)
-                      )}
+                      {formatCurrency(totalSold)}
                     </div>
                   </div>
                   <div className="col-3">
                     <div className="text-muted small">Net Gain/Loss</div>
-                    <div className={`fw-bold ${
-                      (() => {
-                        const totalBought = trades
-                          .filter(t => t.trade_type === 'BUY')
-                          .reduce((sum, t) => sum + t.total_amount, 0);
-                        const totalSold = trades
-                          .filter(t => t.trade_type === 'SELL')
-                          .reduce((sum, t) => sum + t.total_amount, 0);
-                        const netGainLoss = totalSold - totalBought;
-                        return netGainLoss >= 0 ? 'trade-amount-positive' : 'trade-amount-negative';
-                      })()
-                    }`}>
-                      {(() => {
-                        const totalBought = trades
-                          .filter(t => t.trade_type === 'BUY')
-                          .reduce((sum, t) => sum + t.total_amount, 0);
-                        const totalSold = trades
-                          .filter(t => t.trade_type === 'SELL')
-                          .reduce((sum, t) => sum + t.total_amount, 0);
-                        const netGainLoss = totalSold - totalBought;
-                        return `${netGainLoss >= 0 ? '+' : ''}${formatCurrency(netGainLoss)}`;
-                      })()}
+                    <div className={`fw-bold ${netGainLoss >= 0 ? 'trade-amount-positive' : 'trade-amount-negative'}`}>
+                      {`${netGainLoss >= 0 ? '+' : ''}${formatCurrency(netGainLoss)}`}
                     </div>
                   </div>
                 </div>
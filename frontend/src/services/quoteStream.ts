@@ -0,0 +1,44 @@
+// WebSocket client for /stocks/stream quote deltas
+import type { QuoteUpdates } from '../store/types/marketTypes';
+
+const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+
+interface QuoteStreamMessage {
+  type: 'quotes' | 'error';
+  data?: QuoteUpdates;
+  message?: string;
+}
+
+// Subscribe to symbols and call onUpdates for every batch of deltas.
+// Returns a function that closes the stream.
+export const openQuoteStream = (
+  symbols: string[],
+  onUpdates: (updates: QuoteUpdates) => void
+): (() => void) => {
+  const token = localStorage.getItem('token');
+  if (!token || symbols.length === 0) {
+    return () => {};
+  }
+
+  const wsUrl = `${API_BASE_URL.replace(/^http/, 'ws')}/stocks/stream?token=${encodeURIComponent(token)}`;
+  const socket = new WebSocket(wsUrl);
+
+  socket.onopen = () => {
+    socket.send(JSON.stringify({ action: 'subscribe', symbols }));
+  };
+
+  socket.onmessage = (event) => {
+    try {
+      const message: QuoteStreamMessage = JSON.parse(event.data);
+      if (message.type === 'quotes' && message.data) {
+        onUpdates(message.data);
+      } else if (message.type === 'error') {
+        console.error('Quote stream error:', message.message);
+      }
+    } catch (error) {
+      console.error('Invalid quote stream message:', error);
+    }
+  };
+
+  return () => socket.close();
+};
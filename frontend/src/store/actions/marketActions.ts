@@ -1,8 +1,11 @@
 import { createAsyncThunk } from '@reduxjs/toolkit';
-import type { StockQuote, FetchQuotesRequest } from '../types/marketTypes';
+import type { StockQuote, FetchQuotesRequest, BatchQuotesResponse } from '../types/marketTypes';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+// The batch quote endpoint accepts at most this many symbols per request
+const MAX_SYMBOLS_PER_REQUEST = 50;
+
 // Fetch market quotes for multiple stocks
 export const fetchMarketQuotes = createAsyncThunk<
   StockQuote[],
@@ -17,28 +20,39 @@ export const fetchMarketQuotes = createAsyncThunk<
         return rejectWithValue('No authentication token found');
       }
 
-      const quotePromises = symbols.map(async (symbol) => {
-        try {
-          const response = await fetch(`${API_BASE_URL}/stocks/${symbol}/quote`, {
-            headers: {
-              'Authorization': `Bearer ${token}`,
-              'Content-Type': 'application/json',
-            },
-          });
+      if (symbols.length === 0) {
+        return [];
+      }
+
+      // One batch request per MAX_SYMBOLS_PER_REQUEST symbols instead of one request per symbol
+      const batches: string[][] = [];
+      for (let start = 0; start < symbols.length; start += MAX_SYMBOLS_PER_REQUEST) {
+        batches.push(symbols.slice(start, start + MAX_SYMBOLS_PER_REQUEST));
+      }
+      const responses = await Promise.all(batches.map(batch => {
+        const params = new URLSearchParams({ symbols: batch.join(',') });
+        return fetch(`${API_BASE_URL}/stocks/quotes?${params.toString()}`, {
+          headers: {
+            'Authorization': `Bearer ${token}`,
+            'Content-Type': 'application/json',
+          },
+        });
+      }));
 
-          if (response.ok) {
-            const data = await response.json();
-            return { symbol, ...data };
-          }
-          return null;
-        } catch (error) {
-          console.error(`Error fetching quote for ${symbol}:`, error);
-          return null;
+      const failed = responses.find(response => !response.ok);
+      if (failed) {
+        return rejectWithValue(`Failed to fetch market quotes: HTTP ${failed.status}`);
+      }
+
+      const pages: BatchQuotesResponse[] = await Promise.all(responses.map(response => response.json()));
+      const validQuotes: StockQuote[] = [];
+      Object.entries(Object.assign({}, ...pages) as BatchQuotesResponse).forEach(([symbol, item]) => {
+        if (item.quote) {
+          validQuotes.push({ symbol, ...item.quote });
+        } else if (item.error) {
+          console.error(`Error fetching quote for ${symbol}:`, item.error);
         }
       });
-
-      const results = await Promise.all(quotePromises);
-      const validQuotes = results.filter((quote): quote is StockQuote => quote !== null);
       
       return validQuotes;
     } catch (error) {
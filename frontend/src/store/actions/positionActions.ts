@@ -5,8 +5,12 @@ import type {
   CreatePositionRequest, 
   UpdatePositionRequest, 
   BuySharesRequest,
-  SellSharesRequest
+  SellSharesRequest,
+  OrderLeg,
+  BatchOrderResponse
 } from '../types/positionTypes';
+import type { Page } from '../types/paginationTypes';
+import { fetchAllPages } from '../../utils/helpers/pagination';
 
 // API base URL - should match your backend
 const API_BASE_URL = import.meta.env.VITE_API_URL;
@@ -31,21 +35,27 @@ class ApiError extends Error {
   }
 }
 
+// Fetch one page of positions
+const fetchPositionsPage = async (path: string, cursor?: string): Promise<Page<Position>> => {
+  const response = await fetch(`${API_BASE_URL}${path}${cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''}`, {
+    headers: getAuthHeaders(),
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new ApiError(errorData.detail || 'Failed to fetch positions', response.status);
+  }
+
+  return await response.json();
+};
+
 // Async thunk actions for positions
-export const fetchPositions = createAsyncThunk<Position[]>(
+// Positions are looked up by stock across the UI, so every page is loaded (from the given cursor on)
+export const fetchPositions = createAsyncThunk<Page<Position>, string | undefined>(
   'positions/fetchPositions',
-  async (_, { rejectWithValue }) => {
+  async (cursor, { rejectWithValue }) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/positions`, {
-        headers: getAuthHeaders(),
-      });
-
-      if (!response.ok) {
-        const errorData = await response.json();
-        throw new ApiError(errorData.detail || 'Failed to fetch positions', response.status);
-      }
-
-      return await response.json();
+      return await fetchAllPages(pageCursor => fetchPositionsPage('/positions', pageCursor), cursor);
     } catch (error) {
       if (error instanceof ApiError) {
         return rejectWithValue(error.message);
@@ -59,7 +69,7 @@ export const fetchPortfolioSummary = createAsyncThunk<PortfolioSummary>(
   'positions/fetchPortfolioSummary',
   async (_, { rejectWithValue }) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/positions/portfolio-summary`, {
+      const response = await fetch(`${API_BASE_URL}/positions/portfolio`, {
         headers: getAuthHeaders(),
       });
 
@@ -105,16 +115,8 @@ export const getPositionsByUserId = createAsyncThunk<Position[], number>(
   'positions/getPositionsByUserId',
   async (userId, { rejectWithValue }) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/positions/user/${userId}`, {
-        headers: getAuthHeaders(),
-      });
-
-      if (!response.ok) {
-        const errorData = await response.json();
-        throw new ApiError(errorData.detail || 'Failed to get positions by user ID', response.status);
-      }
-
-      return await response.json();
+      const page = await fetchAllPages(pageCursor => fetchPositionsPage(`/positions/user/${userId}`, pageCursor));
+      return page.items;
     } catch (error) {
       if (error instanceof ApiError) {
         return rejectWithValue(error.message);
@@ -229,9 +231,10 @@ export const buyShares = createAsyncThunk<Position, BuySharesRequest>(
 
 export const sellShares = createAsyncThunk<{ positionId: number; remainingPosition?: Position }, SellSharesRequest>(
   'positions/sellShares',
-  async ({ positionId, quantity }, { rejectWithValue }) => {
+  async ({ positionId, quantity, price }, { rejectWithValue }) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/positions/${positionId}/sell?quantity=${quantity}`, {
+      const priceParam = price ? `&price=${price}` : '';
+      const response = await fetch(`${API_BASE_URL}/positions/${positionId}/sell?quantity=${quantity}${priceParam}`, {
         method: 'POST',
         headers: getAuthHeaders(),
       });
@@ -254,3 +257,28 @@ export const sellShares = createAsyncThunk<{ positionId: number; remainingPositi
     }
   }
 );
+
+export const executeBatchOrder = createAsyncThunk<BatchOrderResponse, OrderLeg[]>(
+  'positions/executeBatchOrder',
+  async (legs, { rejectWithValue }) => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/positions/batch`, {
+        method: 'POST',
+        headers: getAuthHeaders(),
+        body: JSON.stringify({ legs }),
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json();
+        throw new ApiError(errorData.detail || 'Failed to execute batch order', response.status);
+      }
+
+      return await response.json();
+    } catch (error) {
+      if (error instanceof ApiError) {
+        return rejectWithValue(error.message);
+      }
+      return rejectWithValue('Network error occurred');
+    }
+  }
+);
@@ -6,8 +6,12 @@ import type {
   SearchStocksRequest,
   StockQuote,
   StockProfile,
-  ChartData
+  ChartData,
+  ChartRequestItem,
+  ChartSeriesResult
 } from '../types/stockTypes';
+import type { Page } from '../types/paginationTypes';
+import { fetchAllPages } from '../../utils/helpers/pagination';
 
 // API base URL - should match your backend
 const API_BASE_URL = import.meta.env.VITE_API_URL;
@@ -32,21 +36,27 @@ class ApiError extends Error {
   }
 }
 
+// Fetch one page of the stock catalog
+const fetchStocksPage = async (cursor?: string): Promise<Page<Stock>> => {
+  const response = await fetch(`${API_BASE_URL}/stocks${cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''}`, {
+    headers: getAuthHeaders(),
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new ApiError(errorData.detail || 'Failed to fetch stocks', response.status);
+  }
+
+  return await response.json();
+};
+
 // Async thunk actions for stocks
-export const fetchStocks = createAsyncThunk<Stock[]>(
+// The topbar shows the whole catalog, so every page is loaded (from the given cursor on)
+export const fetchStocks = createAsyncThunk<Page<Stock>, string | undefined>(
   'stocks/fetchStocks',
-  async (_, { rejectWithValue }) => {
+  async (cursor, { rejectWithValue }) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/stocks`, {
-        headers: getAuthHeaders(),
-      });
-
-      if (!response.ok) {
-        const errorData = await response.json();
-        throw new ApiError(errorData.detail || 'Failed to fetch stocks', response.status);
-      }
-
-      return await response.json();
+      return await fetchAllPages(fetchStocksPage, cursor);
     } catch (error) {
       if (error instanceof ApiError) {
         return rejectWithValue(error.message);
@@ -271,3 +281,30 @@ export const getStockChart = createAsyncThunk<ChartData, { symbol: string; timef
     }
   }
 );
+
+export const getStockCharts = createAsyncThunk<ChartSeriesResult[], ChartRequestItem[]>(
+  'stocks/getStockCharts',
+  async (items, { rejectWithValue }) => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/stocks/charts`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ items }),
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json();
+        throw new ApiError(errorData.detail || 'Failed to get stock charts', response.status);
+      }
+
+      return await response.json();
+    } catch (error) {
+      if (error instanceof ApiError) {
+        return rejectWithValue(error.message);
+      }
+      return rejectWithValue('Network error occurred');
+    }
+  }
+);
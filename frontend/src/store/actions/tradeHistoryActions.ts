@@ -1,23 +1,24 @@
 import { createAsyncThunk } from '@reduxjs/toolkit';
-import type { TradeHistoryItem } from '../types/tradeHistoryTypes';
+import type { TradeHistoryItem, TradeHistorySummary } from '../types/tradeHistoryTypes';
+import type { Page } from '../types/paginationTypes';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
-// Fetch trade history
+// Fetch one page of trade history (newest first); pass the previous page's cursor to load the next one
 export const fetchTradeHistory = createAsyncThunk<
-  TradeHistoryItem[],
-  void,
+  Page<TradeHistoryItem>,
+  string | undefined,
   { rejectValue: string }
 >(
   'tradeHistory/fetchTradeHistory',
-  async (_, { rejectWithValue }) => {
+  async (cursor, { rejectWithValue }) => {
     try {
       const token = localStorage.getItem('token');
       if (!token) {
         return rejectWithValue('Authentication token not found. Please log in again.');
       }
 
-      const response = await fetch(`${API_BASE_URL}/trade-history/`, {
+      const response = await fetch(`${API_BASE_URL}/trade-history/${cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''}`, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json',
@@ -41,3 +42,41 @@ export const fetchTradeHistory = createAsyncThunk<
     }
   }
 );
+
+// Fetch totals over the whole trade history (without recent trades)
+export const fetchTradeHistorySummary = createAsyncThunk<
+  TradeHistorySummary,
+  void,
+  { rejectValue: string }
+>(
+  'tradeHistory/fetchTradeHistorySummary',
+  async (_, { rejectWithValue }) => {
+    try {
+      const token = localStorage.getItem('token');
+      if (!token) {
+        return rejectWithValue('Authentication token not found. Please log in again.');
+      }
+
+      const response = await fetch(`${API_BASE_URL}/trade-history/summary?recent=0`, {
+        headers: {
+          'Authorization': `Bearer ${token}`,
+          'Content-Type': 'application/json',
+        },
+      });
+
+      if (response.status === 401) {
+        localStorage.removeItem('token');
+        return rejectWithValue('Session expired. Please log in again.');
+      }
+
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        return rejectWithValue(errorData.detail || `Server error: ${response.status}`);
+      }
+
+      return await response.json();
+    } catch (error) {
+      return rejectWithValue(error instanceof Error ? error.message : 'An error occurred');
+    }
+  }
+);
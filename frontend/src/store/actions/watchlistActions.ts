@@ -5,6 +5,8 @@ import type {
   AddToWatchlistRequest, 
   UpdateWatchlistRequest
 } from '../types/watchlistTypes';
+import type { Page } from '../types/paginationTypes';
+import { fetchAllPages } from '../../utils/helpers/pagination';
 
 // API base URL - should match your backend
 const API_BASE_URL = import.meta.env.VITE_API_URL;
@@ -29,21 +31,27 @@ class ApiError extends Error {
   }
 }
 
+// Fetch one page of watchlist items
+const fetchWatchlistPage = async (cursor?: string): Promise<Page<WatchlistItem>> => {
+  const response = await fetch(`${API_BASE_URL}/watchlist${cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''}`, {
+    headers: getAuthHeaders(),
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new ApiError(errorData.detail || 'Failed to fetch watchlist items', response.status);
+  }
+
+  return await response.json();
+};
+
 // Async thunk actions for watchlist
-export const fetchWatchlistItems = createAsyncThunk<WatchlistItem[]>(
+// Watched stocks are looked up by stock across the UI, so every page is loaded (from the given cursor on)
+export const fetchWatchlistItems = createAsyncThunk<Page<WatchlistItem>, string | undefined>(
   'watchlist/fetchWatchlistItems',
-  async (_, { rejectWithValue }) => {
+  async (cursor, { rejectWithValue }) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/watchlist`, {
-        headers: getAuthHeaders(),
-      });
-
-      if (!response.ok) {
-        const errorData = await response.json();
-        throw new ApiError(errorData.detail || 'Failed to fetch watchlist items', response.status);
-      }
-
-      return await response.json();
+      return await fetchAllPages(fetchWatchlistPage, cursor);
     } catch (error) {
       if (error instanceof ApiError) {
         return rejectWithValue(error.message);
@@ -110,10 +110,12 @@ export const useMarket = () => {
 
 export const useTradeHistory = () => {
   const dispatch = useAppDispatch();
-  const { trades, isLoading, error } = useAppSelector((state) => state.tradeHistory);
+  const { trades, nextCursor, summary, isLoading, error } = useAppSelector((state) => state.tradeHistory);
 
   return {
     trades,
+    nextCursor,
+    summary,
     isLoading,
     error,
     dispatch,
@@ -1,5 +1,6 @@
 import { createSlice } from '@reduxjs/toolkit';
-import type { MarketState } from '../types/marketTypes';
+import type { PayloadAction } from '@reduxjs/toolkit';
+import type { MarketState, QuoteUpdates, StockQuote } from '../types/marketTypes';
 import { fetchMarketQuotes } from '../actions/marketActions';
 
 const initialState: MarketState = {
@@ -15,6 +16,17 @@ const marketSlice = createSlice({
     clearMarketError: (state) => {
       state.error = null;
     },
+    // Merge streamed quote deltas into the current quotes
+    applyQuoteUpdates: (state, action: PayloadAction<QuoteUpdates>) => {
+      Object.entries(action.payload).forEach(([symbol, fields]) => {
+        const existing = state.quotes.find(q => q.symbol === symbol);
+        if (existing) {
+          Object.assign(existing, fields);
+        } else if (fields.current_price !== undefined) {
+          state.quotes.push({ symbol, ...fields } as StockQuote);
+        }
+      });
+    },
   },
   extraReducers: (builder) => {
     builder
@@ -35,5 +47,5 @@ const marketSlice = createSlice({
   },
 });
 
-export const { clearMarketError } = marketSlice.actions;
+export const { clearMarketError, applyQuoteUpdates } = marketSlice.actions;
 export default marketSlice.reducer;
@@ -9,12 +9,14 @@ import {
   updatePosition,
   deletePosition,
   buyShares,
-  sellShares
+  sellShares,
+  executeBatchOrder
 } from '../actions/positionActions';
 
 // Initial state
 const initialState: PositionsState = {
   positions: [],
+  nextCursor: null,
   portfolioSummary: null,
   isLoading: false,
   error: null,
@@ -43,9 +45,11 @@ const positionsSlice = createSlice({
         state.isLoading = true;
         state.error = null;
       })
-      .addCase(fetchPositions.fulfilled, (state, action: PayloadAction<Position[]>) => {
+      .addCase(fetchPositions.fulfilled, (state, action) => {
         state.isLoading = false;
-        state.positions = action.payload;
+        // A cursor means this is a follow-up page
+        state.positions = action.meta.arg ? [...state.positions, ...action.payload.items] : action.payload.items;
+        state.nextCursor = action.payload.next_cursor;
         state.error = null;
       })
       .addCase(fetchPositions.rejected, (state, action) => {
@@ -100,6 +104,7 @@ const positionsSlice = createSlice({
       .addCase(getPositionsByUserId.fulfilled, (state, action: PayloadAction<Position[]>) => {
         state.isLoading = false;
         state.positions = action.payload;
+        state.nextCursor = null;
         state.error = null;
       })
       .addCase(getPositionsByUserId.rejected, (state, action) => {
@@ -210,6 +215,27 @@ const positionsSlice = createSlice({
         state.isLoading = false;
         state.error = action.payload as string;
       });
+
+    // Batch order
+    builder
+      .addCase(executeBatchOrder.pending, (state) => {
+        state.isLoading = true;
+        state.error = null;
+      })
+      .addCase(executeBatchOrder.fulfilled, (state, action) => {
+        state.isLoading = false;
+        action.payload.results.forEach(result => {
+          if (result.position_id === null) {
+            // The order closed this position
+            state.positions = state.positions.filter(pos => pos.stock_id !== result.stock_id);
+          }
+        });
+        state.error = null;
+      })
+      .addCase(executeBatchOrder.rejected, (state, action) => {
+        state.isLoading = false;
+        state.error = action.payload as string;
+      });
   },
 });
 
@@ -10,12 +10,14 @@ import {
   deleteStock,
   getStockQuote,
   getStockProfile,
-  getStockChart
+  getStockChart,
+  getStockCharts
 } from '../actions/stockActions';
 
 // Initial state
 const initialState: StocksState = {
   stocks: [],
+  nextCursor: null,
   currentStock: null,
   currentQuote: null,
   currentProfile: null,
@@ -59,9 +61,11 @@ const stocksSlice = createSlice({
         state.isLoading = true;
         state.error = null;
       })
-      .addCase(fetchStocks.fulfilled, (state, action: PayloadAction<Stock[]>) => {
+      .addCase(fetchStocks.fulfilled, (state, action) => {
         state.isLoading = false;
-        state.stocks = action.payload;
+        // A cursor means this is a follow-up page
+        state.stocks = action.meta.arg ? [...state.stocks, ...action.payload.items] : action.payload.items;
+        state.nextCursor = action.payload.next_cursor;
         state.error = null;
       })
       .addCase(fetchStocks.rejected, (state, action) => {
@@ -78,6 +82,7 @@ const stocksSlice = createSlice({
       .addCase(searchStocks.fulfilled, (state, action: PayloadAction<Stock[]>) => {
         state.isLoading = false;
         state.stocks = action.payload;
+        state.nextCursor = null;
         state.error = null;
       })
       .addCase(searchStocks.rejected, (state, action) => {
@@ -222,6 +227,24 @@ const stocksSlice = createSlice({
         state.isChartLoading = false;
         state.error = action.payload as string;
       });
+
+    // Get several stock charts in one request
+    builder
+      .addCase(getStockCharts.fulfilled, (state, action) => {
+        action.payload.forEach(result => {
+          if (result.y_values) {
+            const chartKey = `${result.symbol}-${result.timeframe}`;
+            state.chartData[chartKey] = {
+              symbol: result.symbol,
+              timeframe: result.timeframe,
+              y_values: result.y_values
+            };
+          }
+        });
+      })
+      .addCase(getStockCharts.rejected, (state, action) => {
+        state.error = action.payload as string;
+      });
   },
 });
 
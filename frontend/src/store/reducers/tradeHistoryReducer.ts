@@ -1,9 +1,11 @@
 import { createSlice } from '@reduxjs/toolkit';
 import type { TradeHistoryState } from '../types/tradeHistoryTypes';
-import { fetchTradeHistory } from '../actions/tradeHistoryActions';
+import { fetchTradeHistory, fetchTradeHistorySummary } from '../actions/tradeHistoryActions';
 
 const initialState: TradeHistoryState = {
   trades: [],
+  nextCursor: null,
+  summary: null,
   isLoading: false,
   error: null,
 };
@@ -25,12 +27,18 @@ const tradeHistorySlice = createSlice({
       })
       .addCase(fetchTradeHistory.fulfilled, (state, action) => {
         state.isLoading = false;
-        state.trades = action.payload;
+        // A cursor means this is a follow-up page
+        state.trades = action.meta.arg ? [...state.trades, ...action.payload.items] : action.payload.items;
+        state.nextCursor = action.payload.next_cursor;
         state.error = null;
       })
       .addCase(fetchTradeHistory.rejected, (state, action) => {
         state.isLoading = false;
         state.error = action.payload || 'Failed to fetch trade history';
+      })
+      // Fetch trade history summary; the footer falls back to loaded trades without it
+      .addCase(fetchTradeHistorySummary.fulfilled, (state, action) => {
+        state.summary = action.payload;
       });
   },
 });
@@ -12,6 +12,7 @@ import {
 // Initial state
 const initialState: WatchlistState = {
   watchlistItems: [],
+  nextCursor: null,
   watchlistSummary: null,
   isLoading: false,
   error: null,
@@ -40,9 +41,11 @@ const watchlistSlice = createSlice({
         state.isLoading = true;
         state.error = null;
       })
-      .addCase(fetchWatchlistItems.fulfilled, (state, action: PayloadAction<WatchlistItem[]>) => {
+      .addCase(fetchWatchlistItems.fulfilled, (state, action) => {
         state.isLoading = false;
-        state.watchlistItems = action.payload;
+        // A cursor means this is a follow-up page
+        state.watchlistItems = action.meta.arg ? [...state.watchlistItems, ...action.payload.items] : action.payload.items;
+        state.nextCursor = action.payload.next_cursor;
         state.error = null;
       })
       .addCase(fetchWatchlistItems.rejected, (state, action) => {
@@ -16,3 +16,14 @@ export interface MarketState {
 export interface FetchQuotesRequest {
   symbols: string[];
 }
+
+// Response of GET /stocks/quotes, keyed by symbol
+export interface BatchQuoteItem {
+  quote: Omit<StockQuote, 'symbol'> | null;
+  error: string | null;
+}
+
+export type BatchQuotesResponse = Record<string, BatchQuoteItem>;
+
+// Quote deltas pushed by /stocks/stream, keyed by symbol
+export type QuoteUpdates = Record<string, Partial<Omit<StockQuote, 'symbol'>>>;
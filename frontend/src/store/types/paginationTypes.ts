@@ -0,0 +1,5 @@
+// Keyset-paginated list response; pass next_cursor back as ?cursor= for the next page
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
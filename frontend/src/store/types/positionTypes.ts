@@ -17,9 +17,14 @@ export interface Position {
 // Portfolio summary type
 export interface PortfolioSummary {
   total_value: number;
+  cost_basis: number;
+  unrealized_pnl: number;
+  unrealized_pnl_percent: number;
+  day_change: number;
+  day_change_percent: number;
   total_positions: number;
   total_stocks: number;
-  positions: Position[];
+  quoted_stocks: number;
 }
 
 // API request/response types
@@ -43,6 +48,34 @@ export interface BuySharesRequest {
 export interface SellSharesRequest {
   positionId: number;
   quantity: number;
+  price?: number; // Sale price per share; the server uses its cached quote when omitted
+}
+
+// Batch order types: legs are applied in order, all or nothing
+export interface OrderLeg {
+  side: 'BUY' | 'SELL';
+  stock_id: number;
+  quantity: number;
+  price?: number; // Defaults to the server's cached quote
+}
+
+export interface OrderLegResult {
+  index: number;
+  side: 'BUY' | 'SELL';
+  stock_id: number;
+  symbol: string;
+  quantity: number;
+  price: number;
+  trade_id: number;
+  position_id: number | null; // null once the position is closed
+  position_quantity: number;
+  realized_pnl: number | null; // SELL only
+}
+
+export interface BatchOrderResponse {
+  success: boolean;
+  message: string;
+  results: OrderLegResult[];
 }
 
 export interface PositionResponse {
@@ -61,6 +94,7 @@ export interface PositionResponse {
 // Redux state type
 export interface PositionsState {
   positions: Position[];
+  nextCursor: string | null;
   portfolioSummary: PortfolioSummary | null;
   isLoading: boolean;
   error: string | null;
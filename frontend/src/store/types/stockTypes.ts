@@ -101,9 +101,22 @@ export interface ChartData {
   y_values: number[];
 }
 
+export interface ChartRequestItem {
+  symbol: string;
+  timeframe: string;
+}
+
+export interface ChartSeriesResult {
+  symbol: string;
+  timeframe: string;
+  y_values: number[] | null;
+  error: string | null;
+}
+
 // Redux state type
 export interface StocksState {
   stocks: Stock[];
+  nextCursor: string | null;
   currentStock: Stock | null;
   currentQuote: StockQuote | null;
   currentProfile: StockProfile | null;
@@ -7,14 +7,27 @@ export interface TradeHistoryItem {
   total_amount: number;
   trade_date: string;
   notes?: string;
+  cost_basis?: number | null; // SELL only: FIFO cost of the shares sold
+  realized_pnl?: number | null; // SELL only
   stock: {
     symbol: string;
     name: string;
   };
 }
 
+// Totals over the whole history, maintained server-side
+export interface TradeHistorySummary {
+  total_trades: number;
+  total_buy_amount: number;
+  total_sell_amount: number;
+  net_amount: number; // total_buy_amount - total_sell_amount
+  trades: TradeHistoryItem[];
+}
+
 export interface TradeHistoryState {
   trades: TradeHistoryItem[];
+  nextCursor: string | null;
+  summary: TradeHistorySummary | null;
   isLoading: boolean;
   error: string | null;
 }
@@ -43,6 +43,7 @@ export interface WatchlistItemResponse {
 // Redux state type
 export interface WatchlistState {
   watchlistItems: WatchlistItem[];
+  nextCursor: string | null;
   watchlistSummary: WatchlistSummary | null;
   isLoading: boolean;
   error: string | null;
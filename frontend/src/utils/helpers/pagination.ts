@@ -0,0 +1,25 @@
+/**
+ * Keyset pagination utilities
+ */
+
+import type { Page } from '../../store/types/paginationTypes';
+
+/**
+ * Follows next_cursor from the given cursor until the last page
+ * @param fetchPage - Fetches one page; called without a cursor for the first page
+ * @param cursor - Cursor to start from (omit to start at the first page)
+ * @returns Every remaining item, in order, as a single page with no next_cursor
+ */
+export const fetchAllPages = async <T>(
+  fetchPage: (cursor?: string) => Promise<Page<T>>,
+  cursor?: string
+): Promise<Page<T>> => {
+  const items: T[] = [];
+  let next: string | undefined = cursor;
+  do {
+    const page = await fetchPage(next);
+    items.push(...page.items);
+    next = page.next_cursor ?? undefined;
+  } while (next);
+  return { items, next_cursor: null };
+};